@@ -0,0 +1,3 @@
+"""
+Command extensions for start.py, loadable and reloadable in place.
+"""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Activity Commands
+Message rates per channel and top posters, from the bot's activity counters.
+"""
+
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.pagination import sparkline
+
+
+class Activity(commands.Cog):
+    """Channel activity commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command(name='activity')
+    @commands.guild_only()
+    async def activity(self, ctx, channel: discord.TextChannel = None):
+        """Messages per minute/hour per channel and top posters over the last 24 hours"""
+        tracker = self.bot.activity_tracker
+
+        embed = discord.Embed(
+            title=f"📈 Activity in {'#' + channel.name if channel else ctx.guild.name}",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+
+        if channel:
+            report = tracker.channel(channel.id)
+            if report is None:
+                await ctx.send(f"📭 No messages seen in {channel.mention} since the bot started.")
+                return
+            embed.add_field(name="⏱️ Last minute", value=report['last_minute'], inline=True)
+            embed.add_field(name="📊 Per minute (1h avg)", value=report['per_minute'], inline=True)
+            embed.add_field(name="🕐 Last hour", value=report['last_hour'], inline=True)
+            embed.add_field(name="📅 Last 24h", value=report['last_day'], inline=True)
+            embed.add_field(name="📉 Per hour (24h)", value=f"`{sparkline(tracker.hourly(channel.id))}`", inline=False)
+        else:
+            busiest = tracker.busiest_channels(ctx.guild.id)
+            if not busiest:
+                await ctx.send("📭 No messages seen in this server since the bot started.")
+                return
+            embed.add_field(
+                name="💬 Busiest channels (last hour)",
+                value="\n".join(
+                    f"<#{channel_id}>: {report['last_hour']}/h • {report['per_minute']}/min • {report['last_day']}/24h"
+                    for channel_id, report in busiest
+                ),
+                inline=False
+            )
+
+        posters = tracker.top_posters(ctx.guild.id)
+        if posters:
+            # Counts from the sketch can overestimate by up to the error shown
+            embed.add_field(
+                name="🏆 Top posters (24h)",
+                value="\n".join(
+                    f"<@{user_id}>: {count}" + (f" (±{error})" if error else "")
+                    for user_id, count, error in posters
+                ),
+                inline=False
+            )
+
+        embed.set_footer(text=f"Tracking {len(tracker.channels)} channels • ~{tracker.size_bytes() // 1024}KB")
+        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+
+async def setup(bot):
+    await bot.add_cog(Activity(bot))
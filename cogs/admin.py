@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Admin Commands
+Permission audits, history exports and memory introspection for server admins
+and the bot owner.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.export import HistoryExporter
+from utils.jobs import permission_audit, snapshot_guild_permissions
+from utils.memory import start_tracing, stop_tracing
+from utils.pagination import Paginator, field_pages, join_within
+from utils.workers import JobTimeout
+
+# Defaults to the bot's own data directory
+EXPORT_DIR = os.getenv('EXPORT_DIR')
+EXPORT_PROGRESS_INTERVAL = 5.0
+CLEAN_CONFIRMATION_SECONDS = 3
+
+
+class Admin(commands.Cog):
+    """Admin and owner commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.exports = set()
+        self.export_dir = EXPORT_DIR or os.path.join(bot.data_dir, 'exports')
+
+    async def cog_load(self):
+        self.bot.scheduler.register('delete_message', self.delete_message)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister('delete_message')
+
+    async def delete_message(self, payload):
+        try:
+            await self.bot.http.delete_message(payload['channel_id'], payload['message_id'])
+        except discord.NotFound:
+            pass
+
+    @commands.hybrid_command(name='audit', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def permission_audit_command(self, ctx):
+        """Audit dangerous role permissions and who can see hidden channels"""
+        await ctx.defer()
+
+        # Snapshot on the loop, compute in a worker process
+        snapshot = snapshot_guild_permissions(ctx.guild)
+        try:
+            report = await self.bot.worker_pool.submit(permission_audit, *snapshot)
+        except JobTimeout:
+            await ctx.send("❌ The permission audit took too long. Try again later.")
+            return
+
+        fields = [
+            (f"⚠️ {entry['role']}", ", ".join(entry['permissions']), True)
+            for entry in report['dangerous_roles']
+        ]
+        fields.extend(
+            (
+                f"🔒 #{entry['channel']}",
+                (join_within(entry['roles'], total=len(entry['roles'])) or "No roles")
+                + (f"\n👤 {entry['member_overwrites']} member overwrites" if entry['member_overwrites'] else ""),
+                False
+            )
+            for entry in report['hidden_channels']
+        )
+
+        pages = field_pages(
+            fields,
+            title=f"🛡️ Permission Audit: {ctx.guild.name}",
+            color=discord.Color.orange(),
+            per_page=10,
+            description=f"{len(report['dangerous_roles'])} roles with dangerous permissions • "
+                        f"{len(report['hidden_channels'])} hidden channels"
+        )
+        await Paginator(pages, author_id=ctx.author.id).start(ctx, empty_message="✅ Nothing to report.")
+
+    @commands.hybrid_command(name='clean', aliases=['purge'], extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_messages=True)
+    @commands.bot_has_permissions(manage_messages=True)
+    async def clean(self, ctx, amount: int = 5):
+        """Clean recent messages (requires Manage Messages permission)"""
+        if amount < 1 or amount > 100:
+            await ctx.send("❌ Amount must be between 1 and 100!")
+            return
+
+        embed = discord.Embed(title="🧹 Messages Cleaned", color=discord.Color.green())
+        if ctx.interaction:
+            await ctx.defer(ephemeral=True)
+            deleted = await ctx.channel.purge(limit=amount)
+            embed.description = f"Deleted {len(deleted)} messages."
+            await ctx.send(embed=embed, ephemeral=True)
+            return
+
+        deleted = await ctx.channel.purge(limit=amount + 1)  # +1 to include command message
+        embed.description = f"Deleted {len(deleted) - 1} messages."
+
+        # The scheduler removes the confirmation later, without keeping this command running
+        message = await ctx.send(embed=embed)
+        self.bot.scheduler.schedule('delete_message', CLEAN_CONFIRMATION_SECONDS, {
+            'channel_id': message.channel.id,
+            'message_id': message.id,
+        })
+
+    @commands.hybrid_command(name='export', extras={'priority': 'moderation', 'concurrency': 2})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def export_command(self, ctx, channel: discord.TextChannel = None):
+        """Archive channel history to compressed JSONL on the bot host (resumes where the last export stopped)"""
+        if ctx.guild.id in self.exports:
+            await ctx.send("⏳ An export for this server is already running.")
+            return
+
+        me = ctx.guild.me
+        targets = [channel] if channel else ctx.guild.text_channels
+        targets = [target for target in targets if target.permissions_for(me).read_message_history]
+        if not targets:
+            await ctx.send("❌ I can't read the history of any of those channels.")
+            return
+
+        if ctx.interaction:
+            await ctx.send(f"📦 Exporting {len(targets)} channels...", ephemeral=True)
+        # A plain channel message can be edited for longer than an interaction response
+        status = await ctx.channel.send(f"📦 Exporting {len(targets)} channels...")
+        last_edit = time.monotonic()
+
+        async def progress(exporter):
+            nonlocal last_edit
+            if time.monotonic() - last_edit < EXPORT_PROGRESS_INTERVAL:
+                return
+            last_edit = time.monotonic()
+            try:
+                await status.edit(content=f"📦 Exporting {len(targets)} channels... {exporter.exported:,} messages so far")
+            except discord.HTTPException:
+                pass
+
+        self.exports.add(ctx.guild.id)
+        started = time.perf_counter()
+        try:
+            exporter = HistoryExporter(self.bot.http, self.export_dir, self.bot.route_limiter, on_progress=progress)
+            results = await exporter.export([(ctx.guild.id, target.id, target.name) for target in targets])
+        finally:
+            self.exports.discard(ctx.guild.id)
+
+        failed = [result for result in results if result['error']]
+        embed = discord.Embed(
+            title=f"📦 Export finished: {ctx.guild.name}",
+            description=f"{exporter.exported:,} new messages from {len(results)} channels "
+                        f"in {time.perf_counter() - started:.0f}s",
+            color=discord.Color.orange() if failed else discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(
+            name="💬 Channels",
+            value=join_within(
+                (f"#{result['name']}: +{result['exported']:,} ({result['total']:,} total, {result['bytes'] // 1024:,}KB)"
+                 for result in sorted(results, key=lambda result: result['exported'], reverse=True)),
+                separator="\n", total=len(results)
+            ),
+            inline=False
+        )
+        if failed:
+            embed.add_field(
+                name="⚠️ Stopped early",
+                value=join_within((f"#{result['name']}: {result['error']}" for result in failed), separator="\n"),
+                inline=False
+            )
+        embed.set_footer(text=f"Saved under {self.export_dir} • run again to continue from here")
+        await status.edit(content=None, embed=embed)
+
+    @commands.hybrid_command(name='memory', extras={'priority': 'moderation', 'concurrency': 1})
+    @commands.is_owner()
+    async def memory_command(self, ctx, action: str = 'report'):
+        """Memory usage and cache sizes (owner only): report, snapshot, trace on/off"""
+        profiler = self.bot.memory_profiler
+
+        if action in ('trace', 'trace-on', 'on'):
+            start_tracing()
+            await ctx.send("🔬 tracemalloc enabled. Allocations are tracked from now on.")
+            return
+        if action in ('trace-off', 'off'):
+            stop_tracing()
+            await ctx.send("🔬 tracemalloc disabled.")
+            return
+
+        report = profiler.report(top=5)
+        totals = report['caches']['totals']
+
+        embed = discord.Embed(
+            title="💾 Memory Report",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="📈 RSS", value=f"{report['rss_mb']}MB", inline=True)
+        embed.add_field(
+            name="🔬 tracemalloc",
+            value=f"{report['traced_mb']}MB (peak {report['traced_peak_mb']}MB)" if report['tracing'] else "Off",
+            inline=True
+        )
+        embed.add_field(
+            name="🗃️ Caches",
+            value="\n".join(f"{key}: {value:,}" for key, value in totals.items()),
+            inline=True
+        )
+
+        if action == 'snapshot':
+            diff = profiler.snapshot()
+            if diff is None:
+                embed.add_field(name="📸 Snapshot", value="First snapshot taken. Run again to see what grew.", inline=False)
+            else:
+                changes = ", ".join(f"{key} {value:+,}" for key, value in diff['totals'].items() if value) or "No cache changes"
+                embed.add_field(
+                    name=f"📸 Since last snapshot ({diff['seconds']}s)",
+                    value=f"RSS {diff['rss_mb']:+}MB\n{changes}",
+                    inline=False
+                )
+                if diff['guilds']:
+                    embed.add_field(
+                        name="🏠 Growing servers",
+                        value=join_within(
+                            (f"{g['name']}: " + ", ".join(f"{k} {v:+}" for k, v in g.items() if k != 'name' and v)
+                             for g in diff['guilds']),
+                            separator="\n"
+                        ),
+                        inline=False
+                    )
+                if diff.get('top_growth'):
+                    embed.add_field(
+                        name="🔺 Top allocation growth",
+                        value=join_within(
+                            (f"`{os.path.basename(t['location'])}` {t['size_diff_kb']:+}KB" for t in diff['top_growth']),
+                            separator="\n"
+                        ),
+                        inline=False
+                    )
+        elif report.get('top_allocators'):
+            embed.add_field(
+                name="🔝 Top allocators",
+                value=join_within(
+                    (f"`{os.path.basename(t['location'])}` {t['size_kb']}KB" for t in report['top_allocators']),
+                    separator="\n"
+                ),
+                inline=False
+            )
+
+        biggest = sorted(report['caches']['guilds'].values(), key=lambda g: g['members'] + g['messages'], reverse=True)
+        if biggest:
+            embed.add_field(
+                name="🏠 Largest server caches",
+                value=join_within(
+                    (f"{g['name']}: {g['members']:,} members, {g['messages']:,} messages, {g['channels']} channels"
+                     for g in biggest[:10]),
+                    separator="\n"
+                ),
+                inline=False
+            )
+
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
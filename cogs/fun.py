@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Fun Commands
+Dice rolling and coin flipping.
+"""
+
+from collections import OrderedDict
+
+import discord
+from discord.ext import commands
+
+from utils import dice
+from utils.pagination import EMBED_DESCRIPTION_LIMIT, sparkline, truncate
+from utils.workers import JobTimeout
+
+# Recently computed !roll stats distributions
+DICE_STATS_CACHE_SIZE = 128
+
+
+class Fun(commands.Cog):
+    """Fun commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.stats_cache = OrderedDict()
+
+    @commands.hybrid_command(name='roll', extras={'stateless': True, 'priority': 'fun'})
+    async def roll_dice(self, ctx, *, expression: str = "d6"):
+        """Roll dice: !roll 20, !roll 4d6kh3+2, !roll 2d10!, !roll stats 4d6kh3"""
+        expression = expression.strip()
+
+        if expression.lower().startswith('stats'):
+            await self.dice_stats(ctx, expression[len('stats'):].strip() or "d6")
+            return
+
+        # A bare number keeps its old meaning: one die with that many sides
+        if expression.isdigit():
+            expression = f"d{expression}"
+
+        try:
+            total, details = dice.roll(expression)
+        except dice.DiceError as e:
+            await ctx.send(f"❌ {e}")
+            return
+
+        lines = [
+            f"`{term}` {dice.format_rolls(rolls, kept)} = {subtotal}"
+            for term, rolls, kept, subtotal in details
+        ]
+
+        embed = discord.Embed(
+            title="🎲 Dice Roll",
+            description=truncate(f"`{dice.normalize(expression)}` → **{total}**\n\n" + "\n".join(lines), EMBED_DESCRIPTION_LIMIT),
+            color=discord.Color.gold()
+        )
+
+        await ctx.send(embed=embed)
+
+    async def dice_stats(self, ctx, expression):
+        """Distribution summary for a dice expression, computed in the worker pool and cached"""
+        try:
+            key = dice.normalize(expression)
+        except dice.DiceError as e:
+            await ctx.send(f"❌ {e}")
+            return
+
+        stats = self.stats_cache.get(key)
+        if stats is None:
+            await ctx.defer()
+            try:
+                stats = await self.bot.worker_pool.submit(dice.distribution_stats, key, timeout=10)
+            except dice.DiceError as e:
+                await ctx.send(f"❌ {e}")
+                return
+            except JobTimeout:
+                await ctx.send("❌ That distribution took too long to compute.")
+                return
+            self.stats_cache[key] = stats
+            if len(self.stats_cache) > DICE_STATS_CACHE_SIZE:
+                self.stats_cache.popitem(last=False)
+        else:
+            self.stats_cache.move_to_end(key)
+
+        embed = discord.Embed(
+            title=f"📊 Roll Stats: {stats['expression']}",
+            description=f"`{stats['min']}` {sparkline(stats['histogram'])} `{stats['max']}`",
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="Mean", value=stats['mean'], inline=True)
+        embed.add_field(name="Std Dev", value=stats['stdev'], inline=True)
+        embed.add_field(name="Range", value=f"{stats['min']} – {stats['max']}", inline=True)
+        embed.add_field(
+            name="Percentiles",
+            value=" • ".join(f"{key}: {value}" for key, value in stats['percentiles'].items()),
+            inline=False
+        )
+        embed.set_footer(text=f"Method: {stats['method']}")
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='flip', extras={'stateless': True, 'priority': 'fun'})
+    async def flip_coin(self, ctx):
+        """Flip a coin"""
+        import random
+
+        result = random.choice(["Heads", "Tails"])
+
+        embed = discord.Embed(
+            title="🪙 Coin Flip",
+            description=f"The coin landed on: **{result}**!",
+            color=discord.Color.gold()
+        )
+
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Fun(bot))
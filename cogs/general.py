@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+General Commands
+Connectivity, status and server information commands.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.latency import format_latency
+from utils.pagination import sparkline
+from utils.scheduler import format_duration, parse_duration
+
+ENVIRONMENT = os.getenv('RAILWAY_ENVIRONMENT', 'development')
+STATS_POINTS = 40
+
+# series -> (label, unit)
+STATS_SERIES = {
+    'heartbeat_ms': ("💓 Heartbeat", "ms"),
+    'command_ms': ("⏱️ Command latency", "ms"),
+    'commands': ("⌨️ Commands per sample", ""),
+    'loop_lag_ms': ("🌀 Event loop lag", "ms"),
+    'guilds': ("🏠 Servers", ""),
+    'rss_mb': ("🧠 Memory (RSS)", "MB"),
+}
+
+
+class General(commands.Cog):
+    """Basic commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command(name='ping')
+    async def ping(self, ctx):
+        """Check bot latency"""
+        tracker = self.bot.latency_tracker
+
+        # The placeholder message doubles as a REST round-trip sample
+        started = time.perf_counter()
+        message = await ctx.send("🏓 Pinging...")
+        rest_latency = time.perf_counter() - started
+        tracker.record('rest', rest_latency)
+
+        end_to_end = tracker.latest('command')
+
+        embed = discord.Embed(
+            title="🏓 Pong!",
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="💓 Heartbeat", value=format_latency(self.bot.latency), inline=True)
+        embed.add_field(name="🌐 REST", value=f"{round(rest_latency * 1000, 1)}ms", inline=True)
+        embed.add_field(
+            name="⏱️ End-to-end",
+            value=f"{round(end_to_end, 1)}ms" if end_to_end is not None else "No samples yet",
+            inline=True
+        )
+        embed.add_field(name="💓 Heartbeat p50/p95/p99", value=tracker.summary('heartbeat'), inline=True)
+        embed.add_field(name="🌐 REST p50/p95/p99", value=tracker.summary('rest'), inline=True)
+        embed.add_field(name="⏱️ End-to-end p50/p95/p99", value=tracker.summary('command'), inline=True)
+        embed.set_footer(text=f"✅ Online (Railway) • {ENVIRONMENT}")
+
+        await message.edit(content=None, embed=embed)
+
+    @commands.hybrid_command(name='hello', aliases=['hi', 'hey'], extras={'stateless': True, 'priority': 'fun'})
+    async def hello(self, ctx):
+        """Simple greeting command"""
+        greetings = [
+            f"Hello {ctx.author.mention}! 👋 I'm running on Railway!",
+            f"Hey there, {ctx.author.display_name}! 😊 Deployed and ready!",
+            f"Hi {ctx.author.mention}! How can I help you today? 🚂",
+            f"Greetings, {ctx.author.display_name}! 🎉 Live from Railway!"
+        ]
+
+        import random
+        greeting = random.choice(greetings)
+
+        embed = discord.Embed(
+            title="👋 Greetings from Railway!",
+            description=greeting,
+            color=discord.Color.blue()
+        )
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='status', extras={'concurrency': 2})
+    @commands.guild_only()
+    async def status(self, ctx):
+        """Comprehensive bot status"""
+        embed = discord.Embed(
+            title="🤖 Bot Status (Railway Deployment)",
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+
+        embed.add_field(
+            name="📊 Connection",
+            value=f"✅ Online\n📡 {format_latency(self.bot.latency)}",
+            inline=True
+        )
+
+        embed.add_field(
+            name="🏠 Servers",
+            value=f"🎯 This Server: {ctx.guild.name}\n📈 Total: {len(self.bot.guilds)}",
+            inline=True
+        )
+
+        embed.add_field(
+            name="🚂 Platform",
+            value=f"Railway\nEnv: {ENVIRONMENT}",
+            inline=True
+        )
+
+        embed.add_field(
+            name="👥 Users",
+            value=f"👤 This Server: {ctx.guild.member_count}\n🌍 Total: {sum(g.member_count for g in self.bot.guilds)}",
+            inline=True
+        )
+
+        latency = {series: self.bot.latency_tracker.window(series, 15 * 60) for series in ('heartbeat', 'rest', 'command')}
+        embed.add_field(
+            name="📡 Latency p95 (15m)",
+            value="\n".join(
+                f"{label}: {latency[series]['p95']:.0f}ms" if latency[series]['count'] else f"{label}: n/a"
+                for series, label in (('heartbeat', '💓 Heartbeat'), ('rest', '🌐 REST'), ('command', '⏱️ End-to-end'))
+            ),
+            inline=True
+        )
+
+        embed.set_footer(text=f"Bot ID: {self.bot.user.id} • Deployed on Railway")
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='stats')
+    async def stats(self, ctx, period: str = '24h'):
+        """Bot metrics history, e.g. !stats 1h, !stats 24h, !stats 7d"""
+        store = self.bot.timeseries
+        if store is None:
+            await ctx.send("📭 Metrics history is turned off (METRICS_HISTORY=false).")
+            return
+        seconds = parse_duration(period)
+        if not seconds:
+            await ctx.send("❌ Give a period like `1h`, `24h` or `7d`.")
+            return
+
+        history = store.query(seconds, points=STATS_POINTS)
+        embed = discord.Embed(
+            title=f"📈 Bot Stats - last {format_duration(seconds)}",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        for name, (label, unit) in STATS_SERIES.items():
+            rows = history['series'].get(name)
+            if not rows:
+                continue
+            means = [mean for _, mean, _ in rows]
+            low = min(means)
+            embed.add_field(
+                name=label,
+                # Scaled from the minimum so small swings on a large baseline stay visible
+                value=f"`{sparkline([mean - low for mean in means])}`\n"
+                      f"min {low:,.1f}{unit} • avg {sum(means) / len(means):,.1f}{unit} • "
+                      f"peak {max(peak for _, _, peak in rows):,.1f}{unit}",
+                inline=False
+            )
+        if not embed.fields:
+            embed.description = "No samples recorded in this period yet."
+        embed.set_footer(text=f"{history['tier']} buckets • stored locally, cleared on redeploy")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='server', aliases=['serverinfo'], extras={'stateless': True, 'concurrency': 4})
+    @commands.guild_only()
+    async def server_info(self, ctx):
+        """Display server information"""
+        guild = ctx.guild
+
+        embed = discord.Embed(
+            title=f"🏠 {guild.name}",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+
+        embed.add_field(name="👑 Owner", value=guild.owner.mention, inline=True)
+        embed.add_field(name="👥 Members", value=guild.member_count, inline=True)
+        embed.add_field(name="💬 Channels", value=len(guild.channels), inline=True)
+        embed.add_field(name="🎭 Roles", value=len(guild.roles), inline=True)
+        embed.add_field(name="📅 Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
+        embed.add_field(name="🆔 Server ID", value=guild.id, inline=True)
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='railway', extras={'stateless': True})
+    async def railway_info(self, ctx):
+        """Display Railway deployment information"""
+        embed = discord.Embed(
+            title="🚂 Railway Deployment Info",
+            color=discord.Color.purple(),
+            timestamp=datetime.utcnow()
+        )
+
+        embed.add_field(name="🌍 Environment", value=ENVIRONMENT, inline=True)
+        embed.add_field(name="🔧 Platform", value="Railway", inline=True)
+        embed.add_field(name="⚡ Status", value="✅ Running", inline=True)
+
+        # Add Railway-specific environment info if available
+        railway_env = os.getenv('RAILWAY_ENVIRONMENT_NAME', 'production')
+        railway_service = os.getenv('RAILWAY_SERVICE_NAME', 'discord-bot')
+
+        embed.add_field(name="🏷️ Service", value=railway_service, inline=True)
+        embed.add_field(name="🎯 Environment", value=railway_env, inline=True)
+        embed.add_field(name="🕒 Uptime", value="Since last deployment", inline=True)
+
+        embed.set_footer(text="Powered by Railway.app")
+
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(General(bot))
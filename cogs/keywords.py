@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Keyword Trigger Commands
+Manages each server's autoresponses and blocked phrases; matching happens in on_message.
+"""
+
+import discord
+from discord.ext import commands
+
+from utils.pagination import Paginator, field_pages, truncate
+
+ACTION_ICONS = {'respond': "💬", 'block': "🚫"}
+
+
+class Keywords(commands.Cog):
+    """Keyword trigger commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def _add(self, ctx, pattern, action, response=None):
+        try:
+            pattern = self.bot.keywords.add(ctx.guild.id, pattern, action, response, created_by=ctx.author.id)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}.")
+            return
+        return pattern
+
+    @commands.hybrid_group(name='trigger', fallback='list', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def trigger(self, ctx):
+        """List this server's keyword triggers"""
+        triggers = self.bot.keywords.triggers(ctx.guild.id)
+        fields = (
+            (
+                f"{ACTION_ICONS[trigger.action]} {truncate(trigger.pattern, 200)}",
+                truncate(trigger.response, 200) if trigger.action == 'respond' else "Deleted on sight",
+                False
+            )
+            for trigger in triggers
+        )
+        pages = field_pages(
+            fields,
+            title=f"🔑 Keyword Triggers - {ctx.guild.name}",
+            color=discord.Color.blue(),
+            per_page=10,
+            description=f"{len(triggers)} triggers • whole words, case-insensitive"
+        )
+        await Paginator(pages, author_id=ctx.author.id).start(
+            ctx, empty_message=f"📭 No triggers yet. Add one with `{ctx.clean_prefix}trigger add \"phrase\" response`."
+        )
+
+    @trigger.command(name='add')
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def trigger_add(self, ctx, pattern: str, *, response: str):
+        """Reply with a response whenever a phrase is said, e.g. !trigger add "good morning" ☀️ Morning!"""
+        pattern = await self._add(ctx, pattern, 'respond', truncate(response, 2000))
+        if pattern:
+            await ctx.send(f"💬 I'll respond to `{pattern}` ({self.bot.keywords.count(ctx.guild.id)} triggers).")
+
+    @trigger.command(name='block')
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def trigger_block(self, ctx, *, pattern: str):
+        """Delete messages that contain a phrase (moderators are exempt)"""
+        pattern = await self._add(ctx, pattern, 'block')
+        if pattern:
+            note = "" if ctx.guild.me.guild_permissions.manage_messages else " I need **Manage Messages** to enforce it."
+            await ctx.send(f"🚫 Blocked `{pattern}` ({self.bot.keywords.count(ctx.guild.id)} triggers).{note}")
+
+    @trigger.command(name='remove')
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def trigger_remove(self, ctx, *, pattern: str):
+        """Remove a keyword trigger"""
+        if self.bot.keywords.remove(ctx.guild.id, pattern):
+            await ctx.send(f"🗑️ Removed the trigger for `{truncate(pattern, 100)}`.")
+        else:
+            await ctx.send(f"❌ No trigger for `{truncate(pattern, 100)}`.")
+
+
+async def setup(bot):
+    await bot.add_cog(Keywords(bot))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Raid Protection
+Feeds member joins to the raid detector, runs the lockdown when it trips and
+lifts it once joins have been quiet for a while.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.scheduler import format_duration, parse_duration
+
+RAID_PROTECTION = os.getenv('RAID_PROTECTION', 'true').lower() == 'true'
+RAID_QUIET_SECONDS = parse_duration(os.getenv('RAID_QUIET', '10m')) or 600
+
+
+class Raid(commands.Cog):
+    """Raid protection commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.scheduler.register('raid_check', self.raid_check)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister('raid_check')
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        if not RAID_PROTECTION or member.bot:
+            return
+        hit = self.bot.raid_detector.record(member.guild.id, member.id, member.created_at.timestamp())
+        if hit is None:
+            return
+        raid, member_ids, started = hit
+        self.bot.raid_responder.queue(member.guild, member_ids)
+        if started:
+            await self.begin(member.guild, raid)
+
+    async def begin(self, guild, raid):
+        responder = self.bot.raid_responder
+        done = await responder.lockdown(guild, raid)
+        self.bot.scheduler.schedule('raid_check', RAID_QUIET_SECONDS, {'guild_id': guild.id})
+        actions = [action for action in ('kick', 'timeout') if action in responder.actions][:1]
+        if actions:
+            done.insert(0, f"new joiners get a {actions[0]}")
+        await responder.alert(
+            guild, "🚨 Raid detected",
+            f"**{raid.reason}**\n" + "\n".join(f"• {line}" for line in done)
+            + f"\n\nLifts after {format_duration(RAID_QUIET_SECONDS)} without joins, or with `raid end`."
+        )
+
+    async def end(self, guild):
+        raid = self.bot.raid_detector.end(guild.id)
+        done = await self.bot.raid_responder.lift(guild)
+        members = f"{raid.members} joins handled. " if raid else ""
+        await self.bot.raid_responder.alert(
+            guild, "✅ Raid over",
+            members + ("; ".join(done) if done else "Nothing to restore."),
+            color=discord.Color.green()
+        )
+        return raid, done
+
+    async def raid_check(self, payload):
+        """Scheduler job: lift the lockdown once no one has joined for RAID_QUIET"""
+        guild = self.bot.get_guild(payload['guild_id'])
+        if guild is None:
+            return
+        raid = self.bot.raid_detector.raids.get(guild.id)
+        if raid is not None:
+            quiet_for = time.time() - raid.last_join
+            if quiet_for < RAID_QUIET_SECONDS:
+                self.bot.scheduler.schedule('raid_check', RAID_QUIET_SECONDS - quiet_for + 1, payload)
+                return
+        # Also reached after a restart, when the raid itself was forgotten but the lockdown was saved
+        if raid is not None or self.bot.raid_responder.is_locked(guild.id):
+            await self.end(guild)
+
+    @commands.hybrid_group(name='raid', fallback='status', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def raid(self, ctx):
+        """Show raid protection status for this server"""
+        detector = self.bot.raid_detector
+        raid = detector.raids.get(ctx.guild.id)
+        embed = discord.Embed(
+            title="🚨 Raid in progress" if raid else "🛡️ Raid Protection",
+            color=discord.Color.red() if raid else discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        if raid:
+            embed.add_field(name="📈 Trigger", value=raid.reason, inline=False)
+            embed.add_field(name="⏰ Started", value=f"<t:{int(raid.started)}:R>", inline=True)
+            embed.add_field(name="👥 Joins handled", value=raid.members, inline=True)
+        embed.add_field(
+            name="⚙️ Thresholds",
+            value=f"{detector.join_limit} joins or {detector.new_account_limit} accounts younger than "
+                  f"{format_duration(detector.account_age)} within {detector.window:.0f}s",
+            inline=False
+        )
+        embed.add_field(name="🔧 Actions", value=", ".join(sorted(self.bot.raid_responder.actions)) or "none", inline=True)
+        embed.add_field(name="🔒 Locked down", value="Yes" if self.bot.raid_responder.is_locked(ctx.guild.id) else "No", inline=True)
+        if not RAID_PROTECTION:
+            embed.set_footer(text="Automatic detection is off (RAID_PROTECTION=false)")
+        await ctx.send(embed=embed)
+
+    @raid.command(name='lockdown')
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def raid_lockdown(self, ctx):
+        """Start raid mode now: act on new joiners, raise verification, lock hidden channels"""
+        if ctx.guild.id in self.bot.raid_detector.raids:
+            await ctx.send("🚨 Raid mode is already on.")
+            return
+        await ctx.defer()
+        raid = self.bot.raid_detector.start(ctx.guild.id, f"Manual lockdown by {ctx.author}")
+        await self.begin(ctx.guild, raid)
+        await ctx.send(f"🚨 Raid mode on. End it with `{ctx.clean_prefix}raid end`.")
+
+    @raid.command(name='end')
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def raid_end(self, ctx):
+        """End raid mode and restore verification and channel permissions"""
+        if ctx.guild.id not in self.bot.raid_detector.raids and not self.bot.raid_responder.is_locked(ctx.guild.id):
+            await ctx.send("✅ No raid in progress.")
+            return
+        await ctx.defer()
+        _, done = await self.end(ctx.guild)
+        await ctx.send("✅ Raid mode off. " + ("; ".join(done) if done else "Nothing to restore."))
+
+
+async def setup(bot):
+    await bot.add_cog(Raid(bot))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Bulk Role Commands
+Adds or removes a role for a whole cohort of members as one resumable job,
+reported live in a single edited message.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.pagination import join_within
+from utils.roles import BulkRoleRunner, RoleJob, RoleJobStore, parse_member_filter, parse_member_ids, select_members
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 5.0
+MAX_ID_LIST_BYTES = 1024 * 1024
+PROGRESS_BAR_WIDTH = 20
+
+STATUS_ICONS = {'running': "⏳", 'done': "✅", 'cancelled': "🛑", 'failed': "❌"}
+
+
+def resolve_role(guild, value):
+    match = re.fullmatch(r"<@&(\d+)>|(\d{15,20})", value)
+    if match:
+        return guild.get_role(int(match.group(1) or match.group(2)))
+    return discord.utils.get(guild.roles, name=value.lstrip('@'))
+
+
+def progress_bar(done, total, width=PROGRESS_BAR_WIDTH):
+    filled = round(width * done / total) if total else width
+    return "█" * filled + "░" * (width - filled)
+
+
+class Roles(commands.Cog):
+    """Bulk role commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.store = RoleJobStore(os.path.join(bot.data_dir, 'role_jobs'))
+        self.jobs = {}   # job id -> RoleJob, for this session and unfinished ones from before
+        self.tasks = {}  # job id -> running asyncio.Task
+        self._resumer = None
+
+    async def cog_load(self):
+        self._resumer = asyncio.create_task(self.resume_jobs())
+
+    async def cog_unload(self):
+        # Stop at the last checkpoint; a reload or restart resumes from there
+        self._resumer.cancel()
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def resume_jobs(self):
+        await self.bot.wait_until_ready()
+        for job in await asyncio.to_thread(self.store.load_all):
+            self.jobs[job.id] = job
+            if job.done:
+                continue
+            guild = self.bot.get_guild(job.guild_id)
+            if guild is None:
+                job.status, job.error, job.finished = 'failed', "Server unavailable", time.time()
+                await self.store.save(job)
+                continue
+            if not guild.chunked:
+                await guild.chunk()
+            logger.info(f"👥 Resuming role job #{job.id} in {guild.name} at {job.position}/{job.total}")
+            self.start_job(job, guild)
+
+    def start_job(self, job, guild):
+        runner = BulkRoleRunner(self.bot.http, self.store, self.bot.route_limiter, on_progress=self.reporter(job))
+        task = self.tasks[job.id] = asyncio.create_task(runner.run(job, guild))
+        task.add_done_callback(lambda _: self.tasks.pop(job.id, None))
+
+    def describe(self, job):
+        guild = self.bot.get_guild(job.guild_id)
+        roles = ", ".join(
+            role.mention if role else f"`{role_id}`"
+            for role_id, role in ((role_id, guild and guild.get_role(role_id)) for role_id in job.role_ids)
+        )
+        verb = "Adding" if job.action == 'add' else "Removing"
+        return f"{verb} {roles} {'to' if job.action == 'add' else 'from'} {job.total:,} members"
+
+    def progress_embed(self, job, started=None):
+        color = {
+            'running': discord.Color.blue(), 'done': discord.Color.green(),
+            'cancelled': discord.Color.orange(), 'failed': discord.Color.red(),
+        }[job.status]
+        embed = discord.Embed(
+            title=f"{STATUS_ICONS[job.status]} Bulk role job #{job.id}",
+            description=f"{self.describe(job)}\n`{progress_bar(job.position, job.total)}` {job.position:,}/{job.total:,}",
+            color=color,
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="✅ Changed", value=f"{job.changed:,}", inline=True)
+        embed.add_field(name="⏭️ Skipped", value=f"{job.skipped:,}", inline=True)
+        embed.add_field(name="⚠️ Failed", value=f"{job.failed:,}", inline=True)
+        if job.status == 'running' and started and job.position:
+            elapsed = time.monotonic() - started[0]
+            done_here = job.position - started[1]
+            if done_here > 0:
+                remaining = (job.total - job.position) * elapsed / done_here
+                embed.add_field(name="⏱️ ETA", value=f"<t:{int(time.time() + remaining)}:R>", inline=True)
+        if job.error:
+            embed.add_field(name="❌ Stopped", value=job.error, inline=False)
+        embed.set_footer(text="Resumes automatically after a restart" if job.status == 'running' else f"Job #{job.id}")
+        return embed
+
+    def reporter(self, job):
+        """Progress callback that edits the job's status message at most every few seconds"""
+        started = (time.monotonic(), job.position)
+        last_edit = 0.0
+
+        async def report(job):
+            nonlocal last_edit
+            if job.status == 'running' and time.monotonic() - last_edit < PROGRESS_INTERVAL:
+                return
+            last_edit = time.monotonic()
+            channel = self.bot.get_channel(job.channel_id)
+            if channel is None:
+                return
+            try:
+                await channel.get_partial_message(job.message_id).edit(embed=self.progress_embed(job, started))
+            except discord.HTTPException:
+                pass
+
+        return report
+
+    async def _create(self, ctx, action, role, ids, members):
+        guild = ctx.guild
+        if role.is_default() or role.managed:
+            await ctx.send("❌ That role can't be assigned manually.")
+            return
+        if role >= guild.me.top_role:
+            await ctx.send(f"❌ {role.mention} is above my highest role.", allowed_mentions=discord.AllowedMentions.none())
+            return
+        if role >= ctx.author.top_role and ctx.author != guild.owner:
+            await ctx.send(f"❌ {role.mention} is above your highest role.", allowed_mentions=discord.AllowedMentions.none())
+            return
+        if any(job.guild_id == guild.id for job_id, job in self.jobs.items() if job_id in self.tasks):
+            await ctx.send(f"⏳ A bulk role job is already running here. See `{ctx.clean_prefix}bulkrole jobs`.")
+            return
+
+        names, within, before, error = parse_member_filter(members)
+        if error:
+            await ctx.send(f"❌ Filter error: {error}. Example: `has:@Members joined<7d`")
+            return
+        has_roles = [resolve_role(guild, name) for name in names]
+        if any(role is None for role in has_roles):
+            await ctx.send(f"❌ Unknown role in `{members}`.")
+            return
+
+        member_ids = None
+        if ids is not None:
+            if ids.size > MAX_ID_LIST_BYTES:
+                await ctx.send("❌ The ID list must be under 1MB.")
+                return
+            member_ids = parse_member_ids((await ids.read()).decode('utf-8', errors='ignore'))
+            if not member_ids:
+                await ctx.send("❌ No member IDs found in that file.")
+                return
+        elif not members:
+            await ctx.send("❌ Pick members with a filter (`has:@Role`, `joined<7d`, `joined>30d`, `all`) or attach a file of IDs.")
+            return
+
+        if not guild.chunked:
+            await guild.chunk()
+        selected = select_members(guild, has_roles, within, before, member_ids)
+        if not selected:
+            await ctx.send("📭 No members match.")
+            return
+
+        job = RoleJob(
+            id=self.store.next_id(), guild_id=guild.id, action=action, role_ids=[role.id],
+            member_ids=selected, channel_id=ctx.channel.id, created_by=ctx.author.id
+        )
+        if ctx.interaction:
+            await ctx.send(f"👥 Started bulk role job #{job.id}.", ephemeral=True)
+        # A plain channel message can be edited for longer than an interaction response
+        status = await ctx.channel.send(embed=self.progress_embed(job))
+        job.message_id = status.id
+        await self.store.save(job)
+
+        self.jobs[job.id] = job
+        self.start_job(job, guild)
+        logger.info(f"👥 {ctx.author} started role job #{job.id} in {guild.name}: {action} {role.name} for {job.total} members")
+
+    @commands.hybrid_group(name='bulkrole', fallback='jobs', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    async def bulkrole(self, ctx):
+        """Show this server's recent bulk role jobs"""
+        jobs = sorted((job for job in self.jobs.values() if job.guild_id == ctx.guild.id), key=lambda job: job.id, reverse=True)
+        if not jobs:
+            await ctx.send(f"📭 No bulk role jobs yet. Start one with `{ctx.clean_prefix}bulkrole add @Role has:@Members`.")
+            return
+        embed = discord.Embed(
+            title=f"👥 Bulk Role Jobs - {ctx.guild.name}",
+            description=join_within(
+                (f"{STATUS_ICONS[job.status]} **#{job.id}** {self.describe(job)} • {job.position:,}/{job.total:,}"
+                 for job in jobs),
+                limit=4000, separator="\n", total=len(jobs)
+            ),
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+    @bulkrole.command(name='add')
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    @commands.bot_has_permissions(manage_roles=True)
+    async def bulkrole_add(self, ctx, role: discord.Role, ids: discord.Attachment = None, *, members: str = None):
+        """Give a role to many members, e.g. !bulkrole add @Invisible has:@Members joined<7d"""
+        await self._create(ctx, 'add', role, ids, members)
+
+    @bulkrole.command(name='remove')
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    @commands.bot_has_permissions(manage_roles=True)
+    async def bulkrole_remove(self, ctx, role: discord.Role, ids: discord.Attachment = None, *, members: str = None):
+        """Take a role from many members; filters: has:@Role, joined<7d, joined>30d, all, or a file of IDs"""
+        await self._create(ctx, 'remove', role, ids, members)
+
+    @bulkrole.command(name='cancel')
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    async def bulkrole_cancel(self, ctx, job_id: int):
+        """Stop a running bulk role job after its current batch"""
+        job = self.jobs.get(job_id)
+        if job is None or job.guild_id != ctx.guild.id or job.done:
+            await ctx.send(f"❌ No running job #{job_id} in this server.")
+            return
+        job.status = 'cancelled'
+        await ctx.send(f"🛑 Job #{job_id} will stop after the current batch ({job.position:,}/{job.total:,} done).")
+
+
+async def setup(bot):
+    await bot.add_cog(Roles(bot))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Search Commands
+Searches recent messages from the bot's in-memory index instead of the history API.
+"""
+
+import re
+
+import discord
+from discord.ext import commands
+
+from utils.pagination import Paginator, field_pages, truncate
+from utils.search import Query, timed_search
+
+RESULT_LIMIT = 100
+SNIPPET_LENGTH = 200
+
+
+def parse_id(value):
+    """The snowflake in a mention like <@!123> / <#123>, or in a bare id"""
+    match = re.fullmatch(r"<[@#]!?(\d+)>|(\d{15,20})", value)
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+class Search(commands.Cog):
+    """Message search commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def _resolve(self, guild, query):
+        """Turn from:/in: values into ids; returns (authors, channels, error)"""
+        authors, channels = [], []
+        for value in query.authors:
+            member = guild.get_member(parse_id(value) or 0) or guild.get_member_named(value.lstrip('@'))
+            if member is None:
+                return None, None, f"❌ Unknown user `{value}`."
+            authors.append(member.id)
+        for value in query.channels:
+            channel = guild.get_channel_or_thread(parse_id(value) or 0) or discord.utils.get(
+                guild.text_channels, name=value.lstrip('#')
+            )
+            if channel is None:
+                return None, None, f"❌ Unknown channel `{value}`."
+            channels.append(channel.id)
+        return authors, channels, None
+
+    @commands.hybrid_command(name='search', extras={'concurrency': 4})
+    @commands.guild_only()
+    async def search(self, ctx, *, query: str):
+        """Search recent messages: words, "exact phrases", from:@user, in:#channel"""
+        parsed = Query.parse(query)
+        authors, channels, error = self._resolve(ctx.guild, parsed)
+        if error:
+            await ctx.send(error)
+            return
+        if not parsed.required_tokens() and not authors and not channels:
+            await ctx.send(f"❌ Nothing to search for. Example: `{ctx.clean_prefix}search deploy \"rolled back\" from:@someone`")
+            return
+
+        def visible(channel_id):
+            channel = ctx.guild.get_channel_or_thread(channel_id)
+            return channel is not None and channel.permissions_for(ctx.author).read_messages
+
+        index = self.bot.search_index
+        results, elapsed = timed_search(
+            index, parsed, ctx.guild.id, limit=RESULT_LIMIT,
+            author_ids=authors, channel_ids=channels, visible=visible
+        )
+
+        fields = []
+        for entry in results:
+            channel = ctx.guild.get_channel_or_thread(entry.channel_id)
+            member = ctx.guild.get_member(entry.author_id)
+            author = member.display_name if member else f"user {entry.author_id}"
+            created = discord.utils.snowflake_time(entry.id)
+            jump = f"https://discord.com/channels/{ctx.guild.id}/{entry.channel_id}/{entry.id}"
+            fields.append((
+                f"#{channel.name if channel else entry.channel_id} • {author} • {created:%Y-%m-%d %H:%M}",
+                f"{truncate(discord.utils.escape_markdown(entry.text), SNIPPET_LENGTH)}\n[Jump]({jump})",
+                False
+            ))
+
+        more = "+" if len(results) >= RESULT_LIMIT else ""
+        pages = field_pages(
+            fields,
+            title=f"🔍 Search: {query}",
+            color=discord.Color.blue(),
+            per_page=5,
+            description=f"{len(results)}{more} results in {elapsed:.1f}ms • "
+                        f"{len(index)} recent messages indexed"
+        )
+        await Paginator(pages, author_id=ctx.author.id).start(
+            ctx, empty_message=f"📭 No recent messages match `{truncate(query, 100)}`."
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Search(bot))
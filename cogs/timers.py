@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Timer Commands
+Reminders and timed access to hidden channels, run by the bot's job scheduler.
+"""
+
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+
+from utils.pagination import truncate
+from utils.scheduler import format_duration, parse_duration
+
+MAX_DELAY = 365 * 86400
+MAX_REMINDERS = 25
+
+
+class Timers(commands.Cog):
+    """Reminder and timed access commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        scheduler = self.bot.scheduler
+        scheduler.register('reminder', self.send_reminder)
+        scheduler.register('revoke_access', self.revoke_access)
+
+    async def cog_unload(self):
+        # Jobs that come due while unloaded are retried once the handlers are back
+        scheduler = self.bot.scheduler
+        scheduler.unregister('reminder')
+        scheduler.unregister('revoke_access')
+
+    async def send_reminder(self, payload):
+        text = f"⏰ <@{payload['user_id']}> reminder: {payload['text']}"
+        channel = self.bot.get_channel(payload['channel_id'])
+        if channel is not None:
+            try:
+                # The text is whatever the member typed; only ever ping the member themselves
+                await channel.send(text, allowed_mentions=discord.AllowedMentions(
+                    everyone=False, roles=False, users=[discord.Object(id=payload['user_id'])]
+                ))
+                return
+            except discord.Forbidden:
+                pass
+        # The channel is gone or closed to the bot; fall back to a DM
+        user = self.bot.get_user(payload['user_id']) or await self.bot.fetch_user(payload['user_id'])
+        await user.send(text, allowed_mentions=discord.AllowedMentions.none())
+
+    async def revoke_access(self, payload):
+        guild = self.bot.get_guild(payload['guild_id'])
+        channel = guild and guild.get_channel(payload['channel_id'])
+        if channel is None:
+            return
+        await self.restore_access(channel, discord.Object(id=payload['member_id']), payload, "Timed access expired")
+
+    @staticmethod
+    async def restore_access(channel, member, payload, reason):
+        """Put back the member's overwrite from before the grant, or remove it if there was none"""
+        previous = payload.get('previous')
+        if previous is None:
+            await channel.set_permissions(member, overwrite=None, reason=reason)
+            return
+        allow, deny = previous
+        overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+        await channel.set_permissions(member, overwrite=overwrite, reason=reason)
+
+    @commands.hybrid_command(name='remind')
+    async def remind(self, ctx, when: str, *, text: str):
+        """Remind you about something later, e.g. !remind 1h30m check the deploy"""
+        delay = parse_duration(when)
+        if not delay or delay > MAX_DELAY:
+            await ctx.send("❌ Give a duration like `10m`, `2h30m` or `3d` (up to 365d).")
+            return
+        if len(self.bot.scheduler.pending('reminder', ctx.author.id, MAX_REMINDERS)) >= MAX_REMINDERS:
+            await ctx.send(f"❌ You already have {MAX_REMINDERS} reminders pending.")
+            return
+
+        job_id = self.bot.scheduler.schedule('reminder', delay, {
+            'user_id': ctx.author.id,
+            'channel_id': ctx.channel.id,
+            'text': truncate(text, 1500),
+        }, owner_id=ctx.author.id)
+
+        due = int(time.time() + delay)
+        await ctx.send(f"⏰ Reminder #{job_id} set for <t:{due}:f> (<t:{due}:R>).")
+
+    @commands.hybrid_command(name='reminders')
+    async def reminders(self, ctx, cancel: int = None):
+        """List your pending reminders, or cancel one by number"""
+        scheduler = self.bot.scheduler
+        if cancel is not None:
+            if scheduler.cancel(cancel, kind='reminder', owner_id=ctx.author.id):
+                await ctx.send(f"🗑️ Reminder #{cancel} cancelled.")
+            else:
+                await ctx.send(f"❌ You have no pending reminder #{cancel}.")
+            return
+
+        pending = scheduler.pending('reminder', ctx.author.id, MAX_REMINDERS)
+        if not pending:
+            await ctx.send("📭 You have no pending reminders.")
+            return
+
+        embed = discord.Embed(
+            title="⏰ Your Reminders",
+            description="\n".join(
+                f"**#{job_id}** <t:{int(due)}:R> - {truncate(payload['text'], 80)}"
+                for job_id, due, payload in pending
+            ),
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text=f"Cancel with {ctx.clean_prefix}reminders <number>")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name='grant', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    @commands.bot_has_permissions(manage_roles=True)
+    async def grant(self, ctx, member: discord.Member, channel: discord.TextChannel, duration: str):
+        """Let a member into a hidden channel for a while, e.g. !grant @alice #secret-room 2h"""
+        delay = parse_duration(duration)
+        if not delay or delay > MAX_DELAY:
+            await ctx.send("❌ Give a duration like `30m`, `2h` or `7d` (up to 365d).")
+            return
+
+        # Remember the member's own overwrite so expiry puts it back; a re-grant keeps the original one
+        earlier = self.bot.scheduler.find_where('revoke_access', member.id, channel_id=channel.id)
+        if earlier:
+            previous = earlier[0][1].get('previous')
+        else:
+            existing = channel.overwrites.get(member)
+            previous = [permissions.value for permissions in existing.pair()] if existing is not None else None
+
+        overwrite = channel.overwrites_for(member)
+        overwrite.update(view_channel=True, read_message_history=True, send_messages=True)
+        await channel.set_permissions(
+            member, overwrite=overwrite, reason=f"Timed access for {format_duration(delay)} granted by {ctx.author}"
+        )
+        # A new grant replaces any earlier expiry for the same member and channel
+        self.bot.scheduler.cancel_where('revoke_access', member.id, channel_id=channel.id)
+        self.bot.scheduler.schedule('revoke_access', delay, {
+            'guild_id': ctx.guild.id,
+            'channel_id': channel.id,
+            'member_id': member.id,
+            'previous': previous,
+        }, owner_id=member.id)
+
+        due = int(time.time() + delay)
+        await ctx.send(
+            f"🔓 {member.mention} can access {channel.mention} until <t:{due}:f> (<t:{due}:R>).",
+            allowed_mentions=discord.AllowedMentions.none()
+        )
+
+    @commands.hybrid_command(name='revoke', extras={'priority': 'moderation'})
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    @commands.bot_has_permissions(manage_roles=True)
+    async def revoke(self, ctx, member: discord.Member, channel: discord.TextChannel):
+        """End a member's timed access to a channel now"""
+        grants = self.bot.scheduler.find_where('revoke_access', member.id, channel_id=channel.id)
+        if not grants:
+            await ctx.send(
+                f"❌ {member.mention} has no timed access to {channel.mention}.",
+                allowed_mentions=discord.AllowedMentions.none()
+            )
+            return
+        await self.restore_access(channel, member, grants[0][1], f"Access revoked by {ctx.author}")
+        self.bot.scheduler.cancel_where('revoke_access', member.id, channel_id=channel.id)
+        await ctx.send(
+            f"🔒 {member.mention} no longer has access to {channel.mention}.",
+            allowed_mentions=discord.AllowedMentions.none()
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Timers(bot))
@@ -6,10 +6,13 @@ A simple bot that responds to commands and demonstrates basic functionality.
 
 import discord
 from discord.ext import commands
-import asyncio
 import os
 import sys
+import time
 from datetime import datetime
+from utils.errors import ErrorAggregator
+from utils.latency import LatencyTracker, format_latency
+from utils.pagination import join_within
 
 # Bot configuration
 BOT_TOKEN = ""
@@ -28,6 +31,12 @@ bot = commands.Bot(
     help_command=commands.DefaultHelpCommand()
 )
 
+# Rolling heartbeat / REST / end-to-end latency history for !ping
+latency_tracker = LatencyTracker()
+
+# Groups repeated command errors: one reply per error and channel a minute, summaries in the log
+error_reports = ErrorAggregator()
+
 @bot.event
 async def on_ready():
     """Bot startup event"""
@@ -54,6 +63,7 @@ async def on_ready():
     print(f"  {COMMAND_PREFIX}help - Show all commands")
     print("\n🎯 Bot is ready for commands!")
     print("="*50)
+    error_reports.start()
 
 @bot.event
 async def on_message(message):
@@ -69,6 +79,11 @@ async def on_message(message):
     # Process commands
     await bot.process_commands(message)
 
+@bot.event
+async def on_command_completion(ctx):
+    """Record how long the user waited, from their message to the command finishing"""
+    latency_tracker.record('command', (discord.utils.utcnow() - ctx.message.created_at).total_seconds())
+
 @bot.event
 async def on_command_error(ctx, error):
     """Handle command errors"""
@@ -78,25 +93,41 @@ async def on_command_error(ctx, error):
         await ctx.send("❌ You don't have permission to use this command.")
     elif isinstance(error, commands.BotMissingPermissions):
         await ctx.send("❌ I don't have permission to perform this action.")
+    elif isinstance(error, commands.UserInputError):
+        await ctx.send(f"❌ {error}\nUsage: `{COMMAND_PREFIX}{ctx.command.qualified_name} {ctx.command.signature}`")
+    elif isinstance(error, commands.CommandOnCooldown):
+        await ctx.send(f"⏳ Slow down! Try that again in {error.retry_after:.0f}s.")
+    elif isinstance(error, commands.CheckFailure):
+        await ctx.send("❌ You can't use this command here.")
+    elif isinstance(error, commands.CommandInvokeError):
+        fingerprint, reply = error_reports.record(error, command=ctx.command and ctx.command.name, channel_id=ctx.channel.id)
+        if reply:
+            await ctx.send(f"❌ An error occurred: {str(error)} (ref `{fingerprint}`)")
     else:
         print(f"❌ Command error: {error}")
-        await ctx.send(f"❌ An error occurred: {str(error)}")
+        await ctx.send(f"❌ {error}")
 
 # Basic Commands
 @bot.command(name='ping')
 async def ping(ctx):
     """Check bot latency"""
-    latency = round(bot.latency * 1000, 1)
+    started = time.perf_counter()
+    message = await ctx.send("🏓 Pinging...")
+    rest_latency = time.perf_counter() - started
+    latency_tracker.record('rest', rest_latency)
 
     embed = discord.Embed(
         title="🏓 Pong!",
         color=discord.Color.green(),
         timestamp=datetime.utcnow()
     )
-    embed.add_field(name="Latency", value=f"{latency}ms", inline=True)
+    embed.add_field(name="💓 Heartbeat", value=format_latency(bot.latency), inline=True)
+    embed.add_field(name="🌐 REST", value=f"{round(rest_latency * 1000, 1)}ms", inline=True)
     embed.add_field(name="Status", value="✅ Online", inline=True)
+    embed.add_field(name="🌐 REST p50/p95/p99", value=latency_tracker.summary('rest'), inline=True)
+    embed.add_field(name="⏱️ End-to-end p50/p95/p99", value=latency_tracker.summary('command'), inline=True)
 
-    await ctx.send(embed=embed)
+    await message.edit(content=None, embed=embed)
 
 @bot.command(name='hello', aliases=['hi', 'hey'])
 async def hello(ctx):
@@ -132,7 +163,7 @@ async def status(ctx):
 
     embed.add_field(
         name="📊 Connection",
-        value=f"✅ Online\n📡 {round(bot.latency * 1000, 1)}ms",
+        value=f"✅ Online\n📡 {format_latency(bot.latency)}",
         inline=True
     )
 
@@ -196,8 +227,9 @@ async def user_info(ctx, member: discord.Member = None):
     embed.add_field(name="🤖 Bot", value="Yes" if member.bot else "No", inline=True)
 
     if member.roles[1:]:  # Exclude @everyone role
-        roles = ", ".join([role.mention for role in member.roles[1:]])
-        embed.add_field(name="🏷️ Role List", value=roles[:1024], inline=False)  # Discord field limit
+        # Highest roles first, stopping at the 1024 character field limit
+        roles = join_within((role.mention for role in reversed(member.roles[1:])), total=len(member.roles) - 1)
+        embed.add_field(name="🏷️ Role List", value=roles, inline=False)
 
     await ctx.send(embed=embed)
 
@@ -291,10 +323,8 @@ async def clean_messages(ctx, amount: int = 5):
         color=discord.Color.green()
     )
 
-    # Send confirmation message that auto-deletes
-    msg = await ctx.send(embed=embed)
-    await asyncio.sleep(3)
-    await msg.delete()
+    # Send confirmation message that auto-deletes without holding up the command
+    await ctx.send(embed=embed, delete_after=3)
 
 # Error handler for permission errors
 @clean_messages.error
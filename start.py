@@ -6,13 +6,39 @@ Automatically starts the bot when deployed to Railway.
 
 import os
 import sys
+import time
+import asyncio
 import logging
+import socket
 from datetime import datetime
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
+from utils.activity import ActivityTracker
+from utils.antispam import AntiSpam, SpamEnforcer
+from utils.audit_log import AuditLogSink
+from utils.circuit import CircuitOpen, RestCircuitBreaker, is_outage
+from utils.errors import ErrorAggregator
+from utils.command_queue import CommandQueue, CommandRejected, command_priority
+from utils.keywords import KeywordEngine
+from utils.latency import LatencyTracker
+from utils.memory import MemoryProfiler, rss_bytes, start_tracing
+from utils.multibot import SharedConnector, load_bots_config
+from utils.pagination import truncate
+from utils.raid import RaidDetector, RaidResponder
+from utils.ratelimit import RouteLimiter
+from utils.scheduler import Scheduler, parse_duration
+from utils.search import SearchIndex
+from utils.stream import StreamGateway, StreamWorker, open_stream
+from utils.telemetry import GatewayTelemetry
+from utils.timeseries import TimeSeriesStore
+from utils.workers import WorkerPool
 import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
+import hashlib
+from urllib.parse import urlsplit, parse_qs
+from itertools import islice
 
 # Configure logging for Railway
 logging.basicConfig(
@@ -29,316 +55,875 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.getenv('DISCORD_TOKEN')
 COMMAND_PREFIX = os.getenv('COMMAND_PREFIX', '!')
 ENVIRONMENT = os.getenv('RAILWAY_ENVIRONMENT', 'development')
-
-if not BOT_TOKEN:
+STARTUP_GUILD_LOG_LIMIT = int(os.getenv('STARTUP_GUILD_LOG_LIMIT', 10))
+DATA_DIR = os.getenv('BOT_DATA_DIR', 'data')
+
+# Slash command settings
+SLASH_ONLY = os.getenv('SLASH_COMMANDS_ONLY', 'false').lower() == 'true'
+SYNC_GUILD_ID = os.getenv('COMMAND_SYNC_GUILD_ID') or None
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', 'false').lower() == 'true'
+
+# Several bot applications in this one process, described by a JSON file (see README)
+BOTS_CONFIG = os.getenv('BOTS_CONFIG')
+
+# Worker pool settings for CPU-heavy commands
+WORKER_POOL_SIZE = int(os.getenv('WORKER_POOL_SIZE', 0)) or None
+WORKER_JOB_TIMEOUT = float(os.getenv('WORKER_JOB_TIMEOUT', 30))
+
+# Latency history settings
+LATENCY_SAMPLE_INTERVAL = float(os.getenv('LATENCY_SAMPLE_INTERVAL', 30))
+LATENCY_WARNING_MS = float(os.getenv('LATENCY_WARNING_MS', 500))
+
+# Debug endpoints expose guild names, so they are opt-in
+DEBUG_ENDPOINTS = os.getenv('DEBUG_ENDPOINTS', 'false').lower() == 'true'
+MEMORY_TRACEMALLOC = os.getenv('MEMORY_TRACEMALLOC', 'false').lower() == 'true'
+
+# Local metrics history (ring files under BOT_DATA_DIR), shown by !stats and /stats
+METRICS_HISTORY = os.getenv('METRICS_HISTORY', 'true').lower() == 'true'
+METRICS_SAMPLE_INTERVAL = float(os.getenv('METRICS_SAMPLE_INTERVAL', 1))
+
+# Command extensions, reloadable in place with !reload or the file watcher
+EXTENSIONS = [
+    name.strip() for name in os.getenv('BOT_EXTENSIONS', 'cogs.general,cogs.admin,cogs.fun,cogs.activity,cogs.search,cogs.timers,cogs.keywords,cogs.roles,cogs.raid').split(',')
+    if name.strip()
+]
+EXTENSION_WATCH = os.getenv('EXTENSION_WATCH', 'false').lower() == 'true'
+EXTENSION_WATCH_INTERVAL = float(os.getenv('EXTENSION_WATCH_INTERVAL', 2))
+
+# Gateway event-rate telemetry, reported on /metrics
+GATEWAY_TELEMETRY = os.getenv('GATEWAY_TELEMETRY', 'true').lower() == 'true'
+TELEMETRY_WINDOW = int(os.getenv('TELEMETRY_WINDOW', 60))
+TELEMETRY_TOP_GUILDS = int(os.getenv('TELEMETRY_TOP_GUILDS', 10))
+
+# Auto-moderation in on_message: "messages/seconds" thresholds and comma-separated actions
+ANTISPAM_ENABLED = os.getenv('ANTISPAM_ENABLED', 'true').lower() == 'true'
+ANTISPAM_RATE = os.getenv('ANTISPAM_RATE', '6/5')
+ANTISPAM_DUPLICATES = os.getenv('ANTISPAM_DUPLICATES', '4/30')
+ANTISPAM_CROWD = os.getenv('ANTISPAM_CROWD', '10/60')
+ANTISPAM_ACTIONS = [action.strip() for action in os.getenv('ANTISPAM_ACTIONS', 'delete,alert').split(',') if action.strip()]
+ANTISPAM_TIMEOUT_SECONDS = int(os.getenv('ANTISPAM_TIMEOUT_SECONDS', 300))
+ANTISPAM_ALERT_CHANNEL = os.getenv('ANTISPAM_ALERT_CHANNEL', 'mod-log')
+
+# Join-burst raid detection: "joins/seconds" window, new-account threshold and lockdown actions
+RAID_JOIN_RATE = os.getenv('RAID_JOIN_RATE', '20/60')
+RAID_NEW_ACCOUNTS = int(os.getenv('RAID_NEW_ACCOUNTS', 10))
+RAID_ACCOUNT_AGE = parse_duration(os.getenv('RAID_ACCOUNT_AGE', '7d')) or 0
+RAID_ACTIONS = [action.strip() for action in os.getenv('RAID_ACTIONS', 'timeout,verification,lock,alert').split(',') if action.strip()]
+RAID_TIMEOUT_SECONDS = int(os.getenv('RAID_TIMEOUT_SECONDS', 3600))
+RAID_ACTION_CONCURRENCY = int(os.getenv('RAID_ACTION_CONCURRENCY', 5))
+RAID_ALERT_CHANNEL = os.getenv('RAID_ALERT_CHANNEL', 'mod-log')
+
+# Moderation event log, posted in batches to a channel and optionally mirrored to JSONL
+AUDIT_LOG_ENABLED = os.getenv('AUDIT_LOG_ENABLED', 'true').lower() == 'true'
+AUDIT_LOG_CHANNEL = os.getenv('AUDIT_LOG_CHANNEL', 'mod-log')
+AUDIT_LOG_FLUSH_SECONDS = float(os.getenv('AUDIT_LOG_FLUSH_SECONDS', 5))
+AUDIT_LOG_BUFFER = int(os.getenv('AUDIT_LOG_BUFFER', 500))
+AUDIT_LOG_MIRROR = os.getenv('AUDIT_LOG_MIRROR', 'false').lower() == 'true'
+
+# Per-guild keyword autoresponses and blocked phrases (managed with !trigger)
+KEYWORD_MAX_TRIGGERS = int(os.getenv('KEYWORD_MAX_TRIGGERS', 10000))
+
+# Persistent job scheduler for reminders and timed actions
+SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', 500))
+
+# Pacing for bulk REST jobs (exports), kept below Discord's limits so commands stay responsive
+BULK_REST_RATE = float(os.getenv('BULK_REST_RATE', 10))
+BULK_REST_CONCURRENCY = int(os.getenv('BULK_REST_CONCURRENCY', 4))
+
+# Split mode: "gateway" forwards stateless commands over a stream to "worker" processes
+BOT_MODE = os.getenv('BOT_MODE', 'standalone').lower()
+STREAM_URL = os.getenv('STREAM_URL') or os.getenv('REDIS_URL') or 'memory://'
+STREAM_NAME = os.getenv('STREAM_NAME', 'secret-room:events')
+STREAM_MAX_LENGTH = int(os.getenv('STREAM_MAX_LENGTH', 10000))
+STREAM_BACKLOG_LIMIT = int(os.getenv('STREAM_BACKLOG_LIMIT', 200))
+STREAM_CONSUMER = os.getenv('STREAM_CONSUMER') or f"{socket.gethostname()}-{os.getpid()}"
+STREAM_WORKER_CONCURRENCY = int(os.getenv('STREAM_WORKER_CONCURRENCY', 16))
+STREAM_MAX_AGE = float(os.getenv('STREAM_MAX_AGE', 30))
+
+# Command error aggregation: one reply per error, channel and window; reports batched to the log and sinks
+ERROR_WINDOW = float(os.getenv('ERROR_WINDOW', 60))
+SENTRY_DSN = os.getenv('SENTRY_DSN')
+ERROR_REPORTS_LOCAL = os.getenv('ERROR_REPORTS_LOCAL', 'false').lower() == 'true'
+
+# Circuit breaker for outbound REST calls during Discord 5xx errors and rate limit storms
+REST_BREAKER_ENABLED = os.getenv('REST_BREAKER_ENABLED', 'true').lower() == 'true'
+REST_BREAKER_THRESHOLD = float(os.getenv('REST_BREAKER_THRESHOLD', 0.5))
+REST_BREAKER_MIN_FAILURES = int(os.getenv('REST_BREAKER_MIN_FAILURES', 5))
+REST_BREAKER_COOLDOWN = float(os.getenv('REST_BREAKER_COOLDOWN', 5))
+REST_BREAKER_QUEUE_SECONDS = float(os.getenv('REST_BREAKER_QUEUE_SECONDS', 30))
+
+# Command admission: concurrency caps, priority classes (moderation > info > fun) and load shedding
+COMMAND_MAX_RUNNING = int(os.getenv('COMMAND_MAX_RUNNING', 50))
+COMMAND_GUILD_CONCURRENCY = int(os.getenv('COMMAND_GUILD_CONCURRENCY', 5))
+COMMAND_QUEUE_LIMIT = int(os.getenv('COMMAND_QUEUE_LIMIT', 500))
+COMMAND_SHED_LAG_MS = float(os.getenv('COMMAND_SHED_LAG_MS', 250))
+
+# In-memory search index of recent messages
+SEARCH_CHANNEL_MESSAGES = int(os.getenv('SEARCH_CHANNEL_MESSAGES', 500))
+SEARCH_MAX_MESSAGES = int(os.getenv('SEARCH_MAX_MESSAGES', 50000))
+
+if not BOT_TOKEN and not BOTS_CONFIG:
     logger.error("DISCORD_TOKEN environment variable not found!")
     logger.error("Please set your Discord bot token in Railway environment variables.")
     sys.exit(1)
 
-# Setup intents
-intents = discord.Intents.default()
-intents.message_content = True  # Required for reading message content
-intents.guilds = True
-intents.members = True
-
-# Create bot instance
-bot = commands.Bot(
-    command_prefix=COMMAND_PREFIX,
-    intents=intents,
-    help_command=commands.DefaultHelpCommand()
-)
-
-# Health check server for Railway
-class HealthHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-
-            health_data = {
-                "status": "healthy" if bot.is_ready() else "starting",
-                "bot_name": bot.user.name if bot.user else None,
-                "bot_id": bot.user.id if bot.user else None,
-                "guilds": len(bot.guilds) if bot.is_ready() else 0,
-                "uptime": "online" if bot.is_ready() else "connecting"
-            }
-            self.wfile.write(json.dumps(health_data).encode())
+def bot_intents(slash_only=SLASH_ONLY):
+    intents = discord.Intents.default()
+    # Prefix commands need message content; slash-only mode drops the privileged intent
+    intents.message_content = not slash_only
+    intents.guilds = True
+    intents.members = True
+    return intents
 
-        elif self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b"Discord Secret Room Bot is running! 🤖")
-        else:
-            self.send_response(404)
-            self.end_headers()
 
-    def log_message(self, format, *args):
-        # Suppress default HTTP logging
-        pass
+def command_tree_hash(tree, guild=None):
+    """Hash the command signatures that would be sent to Discord on sync"""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: command['name']
+    )
+    scope = f"guild:{guild.id}" if guild else "global"
+    blob = json.dumps({"scope": scope, "commands": payload}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
 
-def start_health_server():
-    port = int(os.getenv('PORT', 3000))
-    server = HTTPServer(('0.0.0.0', port), HealthHandler)
 
-    def run_server():
-        logger.info(f"Health check server running on port {port}")
-        server.serve_forever()
+async def sync_command_tree(tree, hash_file, sync_guild_id=None, force=False):
+    """Sync application commands only when their signatures changed since the last sync"""
+    guild = discord.Object(id=int(sync_guild_id)) if sync_guild_id else None
+    if guild:
+        tree.copy_global_to(guild=guild)
 
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
-    return server
-
-@bot.event
-async def on_ready():
-    """Bot startup event"""
-    logger.info("="*50)
-    logger.info("🤖 DISCORD BOT DEPLOYED ON RAILWAY!")
-    logger.info("="*50)
-    logger.info(f"Bot Name: {bot.user.name}#{bot.user.discriminator}")
-    logger.info(f"Bot ID: {bot.user.id}")
-    logger.info(f"Connected to {len(bot.guilds)} servers")
-    logger.info(f"Command Prefix: {COMMAND_PREFIX}")
-    logger.info(f"Environment: {ENVIRONMENT}")
-    logger.info(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-    if bot.guilds:
-        logger.info("📋 Server List:")
-        for guild in bot.guilds:
-            logger.info(f"  • {guild.name} ({guild.member_count} members)")
-
-    logger.info("🎯 Bot is ready for commands!")
-    logger.info("="*50)
-
-    # Set bot status
-    await bot.change_presence(
-        activity=discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(bot.guilds)} servers | {COMMAND_PREFIX}help"
+    current = command_tree_hash(tree, guild)
+    try:
+        with open(hash_file) as f:
+            previous = f.read().strip()
+    except OSError:
+        previous = None
+
+    if current == previous and not force:
+        logger.info("🌲 Application commands unchanged, skipping sync")
+        return False
+
+    synced = await tree.sync(guild=guild)
+    os.makedirs(os.path.dirname(hash_file) or '.', exist_ok=True)
+    with open(hash_file, 'w') as f:
+        f.write(current)
+    logger.info(f"🌲 Synced {len(synced)} application commands ({f'guild {guild.id}' if guild else 'global'})")
+    return True
+
+
+def extension_mtime(name):
+    """Modification time of an extension's source file, or None if it can't be found"""
+    module = sys.modules.get(name)
+    path = getattr(module, '__file__', None)
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+
+def quote(text, limit=120):
+    return discord.utils.escape_markdown(truncate(text, limit)) if text else "*(no text)*"
+
+
+class SecretRoomBot(commands.Bot):
+    """One bot application; several can share a process (and its loop) under BOTS_CONFIG"""
+
+    def __init__(self, *args, name='main', display_prefix=COMMAND_PREFIX, data_dir=DATA_DIR, extensions=EXTENSIONS,
+                 sync_guild_id=SYNC_GUILD_ID, worker_pool=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = name
+        self.display_prefix = display_prefix
+        self.data_dir = data_dir
+        self.extension_names = extensions
+        self.sync_guild_id = sync_guild_id
+        # A pool handed in by the multi-bot runner is shared, so only the runner shuts it down
+        self._owns_worker_pool = worker_pool is None
+        self.worker_pool = worker_pool or WorkerPool(max_workers=WORKER_POOL_SIZE, default_timeout=WORKER_JOB_TIMEOUT)
+        self.latency_tracker = LatencyTracker(warning_ms=LATENCY_WARNING_MS)
+        self.memory_profiler = MemoryProfiler(self)
+        self.activity_tracker = ActivityTracker()
+        rate_limit, rate_window = ANTISPAM_RATE.split('/')
+        duplicate_limit, duplicate_window = ANTISPAM_DUPLICATES.split('/')
+        crowd_limit, crowd_window = ANTISPAM_CROWD.split('/')
+        self.antispam = AntiSpam(
+            rate_limit=int(rate_limit), rate_window=float(rate_window),
+            duplicate_limit=int(duplicate_limit), duplicate_window=float(duplicate_window),
+            crowd_limit=int(crowd_limit), crowd_window=float(crowd_window)
         )
-    )
-
-@bot.event
-async def on_guild_join(guild):
-    """Bot joins a new server"""
-    logger.info(f"🎉 Joined new server: {guild.name} ({guild.member_count} members)")
-
-    # Update presence
-    await bot.change_presence(
-        activity=discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(bot.guilds)} servers | {COMMAND_PREFIX}help"
+        self.spam_enforcer = SpamEnforcer(ANTISPAM_ACTIONS, ANTISPAM_TIMEOUT_SECONDS, ANTISPAM_ALERT_CHANNEL)
+        join_limit, join_window = RAID_JOIN_RATE.split('/')
+        self.raid_detector = RaidDetector(
+            join_limit=int(join_limit), window=float(join_window),
+            new_account_limit=RAID_NEW_ACCOUNTS, account_age=RAID_ACCOUNT_AGE
         )
-    )
-
-@bot.event
-async def on_guild_remove(guild):
-    """Bot leaves a server"""
-    logger.info(f"👋 Left server: {guild.name}")
-
-    # Update presence
-    await bot.change_presence(
-        activity=discord.Activity(
-            type=discord.ActivityType.watching,
-            name=f"{len(bot.guilds)} servers | {COMMAND_PREFIX}help"
+        # Raid responses get their own limiter so exports and bulk jobs can't hold them up
+        self.raid_responder = RaidResponder(
+            self, RouteLimiter(rate=20, route_rate=20, concurrency=RAID_ACTION_CONCURRENCY),
+            os.path.join(data_dir, 'raid_lockdowns.json'),
+            actions=RAID_ACTIONS, timeout_seconds=RAID_TIMEOUT_SECONDS, alert_channel=RAID_ALERT_CHANNEL
+        )
+        self.keywords = KeywordEngine(os.path.join(data_dir, 'keywords.sqlite3'), max_triggers=KEYWORD_MAX_TRIGGERS)
+        self.scheduler = Scheduler(os.path.join(data_dir, 'scheduler.sqlite3'), batch_size=SCHEDULER_BATCH_SIZE)
+        self.route_limiter = RouteLimiter(rate=BULK_REST_RATE, concurrency=BULK_REST_CONCURRENCY)
+        self.search_index = SearchIndex(per_channel=SEARCH_CHANNEL_MESSAGES, max_messages=SEARCH_MAX_MESSAGES)
+        self.audit_log = AuditLogSink(
+            self, self.route_limiter, channel_name=AUDIT_LOG_CHANNEL, flush_interval=AUDIT_LOG_FLUSH_SECONDS,
+            max_buffer=AUDIT_LOG_BUFFER, mirror_dir=os.path.join(data_dir, 'audit') if AUDIT_LOG_MIRROR else None
+        )
+        self.telemetry = GatewayTelemetry(window=TELEMETRY_WINDOW)
+        self.rest_breaker = RestCircuitBreaker(
+            threshold=REST_BREAKER_THRESHOLD, min_failures=REST_BREAKER_MIN_FAILURES,
+            cooldown=REST_BREAKER_COOLDOWN, queue_timeout=REST_BREAKER_QUEUE_SECONDS
+        )
+        if REST_BREAKER_ENABLED:
+            self.rest_breaker.install(self.http)
+        self.errors = ErrorAggregator(
+            window=ERROR_WINDOW, sentry_dsn=SENTRY_DSN, environment=ENVIRONMENT, tags={'bot': name},
+            report_dir=os.path.join(data_dir, 'errors') if ERROR_REPORTS_LOCAL else None
+        )
+        self.command_queue = CommandQueue(
+            max_running=COMMAND_MAX_RUNNING, guild_limit=COMMAND_GUILD_CONCURRENCY,
+            max_queued=COMMAND_QUEUE_LIMIT, shed_lag=COMMAND_SHED_LAG_MS / 1000
+        )
+        # Every command passes through the queue after its checks and arguments, right before it runs
+        self.before_invoke(self.admit_command)
+        self.after_invoke(self.release_command)
+        self.stream = self.stream_gateway = self.stream_worker = None
+        self._stream_worker_task = None
+        if BOT_MODE in ('gateway', 'worker'):
+            stream = self.stream = open_stream(STREAM_URL, STREAM_NAME, max_length=STREAM_MAX_LENGTH)
+            if BOT_MODE == 'gateway':
+                self.stream_gateway = StreamGateway(self, stream, backlog_limit=STREAM_BACKLOG_LIMIT)
+            # The in-memory stream is invisible to other processes, so a gateway using it consumes it itself
+            if BOT_MODE == 'worker' or STREAM_URL.startswith('memory://'):
+                self.stream_worker = StreamWorker(
+                    self, stream, STREAM_CONSUMER, concurrency=STREAM_WORKER_CONCURRENCY, max_age=STREAM_MAX_AGE
+                )
+        self.timeseries = TimeSeriesStore(os.path.join(data_dir, 'metrics')) if METRICS_HISTORY else None
+        self._last_metrics_sample = time.time()
+        if GATEWAY_TELEMETRY:
+            self.telemetry.install(self._connection)
+        self._extension_mtimes = {}
+
+    async def setup_hook(self):
+        await self.add_cog(Core(self))
+        await self.load_extensions()
+        if self.timeseries is not None:
+            self.timeseries.start(self.collect_metrics, interval=METRICS_SAMPLE_INTERVAL)
+        self.command_queue.start()
+        self.errors.start()
+        if BOT_MODE == 'worker':
+            # Workers never connect to the gateway: command sync and background jobs belong to the gateway process
+            return
+        await self.sync_commands(force=FORCE_COMMAND_SYNC)
+        self.latency_sampler.start()
+        self.scheduler.start()
+        if AUDIT_LOG_ENABLED:
+            self.audit_log.start()
+        if self.stream_gateway is not None:
+            await self.stream_gateway.start()
+            if self.stream_worker is not None:
+                logger.warning("🔀 STREAM_URL is memory://, so forwarded commands run in this process")
+                self._stream_worker_task = asyncio.create_task(self.stream_worker.run())
+        if EXTENSION_WATCH:
+            self.extension_watcher.start()
+
+    async def process_commands(self, message):
+        """Run the command here, or hand it to a worker when it is stateless and split mode is on"""
+        if self.stream_gateway is None or message.author.bot:
+            return await super().process_commands(message)
+        ctx = await self.get_context(message)
+        if not await self.stream_gateway.forward_message(ctx):
+            await self.invoke(ctx)
+
+    async def admit_command(self, ctx):
+        """Wait for a slot in the command queue; raises CommandRejected if the command is dropped"""
+        command = ctx.command
+        interaction = ctx.interaction
+
+        async def defer():
+            # A queued slash command would otherwise miss Discord's 3 second reply window
+            if not interaction.response.is_done():
+                await ctx.defer()
+
+        await self.command_queue.acquire(
+            ctx, command.qualified_name, ctx.guild.id if ctx.guild else None,
+            priority=command_priority(command), limit=command.extras.get('concurrency'),
+            on_wait=defer if interaction else None
         )
-    )
-
-@bot.event
-async def on_message(message):
-    """Handle incoming messages"""
-    if message.author == bot.user:
-        return
-
-    # Log commands for debugging
-    if message.content.startswith(COMMAND_PREFIX):
-        logger.info(f"📝 Command: {message.content} from {message.author} in #{message.channel} ({message.guild.name})")
-
-    await bot.process_commands(message)
-
-@bot.event
-async def on_command_error(ctx, error):
-    """Handle command errors"""
-    if isinstance(error, commands.CommandNotFound):
-        await ctx.send(f"❌ Unknown command. Type `{COMMAND_PREFIX}help` for available commands.")
-    elif isinstance(error, commands.MissingPermissions):
-        await ctx.send("❌ You don't have permission to use this command.")
-    elif isinstance(error, commands.BotMissingPermissions):
-        await ctx.send("❌ I don't have permission to perform this action.")
-    else:
-        logger.error(f"Command error: {error}")
-        await ctx.send(f"❌ An error occurred: {str(error)}")
-
-# Basic Commands
-@bot.command(name='ping')
-async def ping(ctx):
-    """Check bot latency"""
-    latency = round(bot.latency * 1000, 1)
-
-    embed = discord.Embed(
-        title="🏓 Pong!",
-        color=discord.Color.green(),
-        timestamp=datetime.utcnow()
-    )
-    embed.add_field(name="Latency", value=f"{latency}ms", inline=True)
-    embed.add_field(name="Status", value="✅ Online (Railway)", inline=True)
-    embed.add_field(name="Environment", value=ENVIRONMENT, inline=True)
-
-    await ctx.send(embed=embed)
-
-@bot.command(name='hello', aliases=['hi', 'hey'])
-async def hello(ctx):
-    """Simple greeting command"""
-    greetings = [
-        f"Hello {ctx.author.mention}! 👋 I'm running on Railway!",
-        f"Hey there, {ctx.author.display_name}! 😊 Deployed and ready!",
-        f"Hi {ctx.author.mention}! How can I help you today? 🚂",
-        f"Greetings, {ctx.author.display_name}! 🎉 Live from Railway!"
-    ]
-
-    import random
-    greeting = random.choice(greetings)
-
-    embed = discord.Embed(
-        title="👋 Greetings from Railway!",
-        description=greeting,
-        color=discord.Color.blue()
-    )
 
-    await ctx.send(embed=embed)
+    async def release_command(self, ctx):
+        self.command_queue.release(ctx)
+
+    async def load_extensions(self):
+        for name in self.extension_names:
+            await self.load_extension(name)
+            self._extension_mtimes[name] = extension_mtime(name)
+        logger.info(f"🧩 Loaded extensions: {', '.join(self.extension_names)}")
+
+    async def sync_commands(self, force=False):
+        try:
+            await sync_command_tree(
+                self.tree, os.path.join(self.data_dir, 'command_tree.sha256'), self.sync_guild_id, force=force
+            )
+        except discord.HTTPException as e:
+            logger.error(f"❌ Failed to sync application commands: {e}")
+
+    async def reload_extension_timed(self, name):
+        """Reload one extension in place; returns (ok, milliseconds, error).
+
+        discord.py restores the previous module if the new one fails to import
+        or set up, so a broken edit leaves the running commands untouched.
+        """
+        started = time.perf_counter()
+        try:
+            await self.reload_extension(name)
+        except commands.ExtensionError as e:
+            elapsed = (time.perf_counter() - started) * 1000
+            logger.error(f"🧩 Reload of {name} failed after {elapsed:.1f}ms, kept previous version: {e}")
+            return False, elapsed, e
+        finally:
+            self._extension_mtimes[name] = extension_mtime(name)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"🧩 Reloaded {name} in {elapsed:.1f}ms")
+        return True, elapsed, None
+
+    @tasks.loop(seconds=EXTENSION_WATCH_INTERVAL)
+    async def extension_watcher(self):
+        """Reload extensions whose source file changed on disk"""
+        changed = [
+            name for name in list(self.extensions)
+            if extension_mtime(name) != self._extension_mtimes.get(name)
+        ]
+        for name in changed:
+            await self.reload_extension_timed(name)
+        if changed:
+            await self.sync_commands()
+
+    @tasks.loop(seconds=LATENCY_SAMPLE_INTERVAL)
+    async def latency_sampler(self):
+        """Sample the gateway heartbeat and a lightweight REST round trip"""
+        self.latency_tracker.record('heartbeat', self.latency)
+
+        started = time.perf_counter()
+        try:
+            await self.http.request(discord.http.Route('GET', '/users/@me'))
+        except discord.HTTPException as e:
+            logger.warning(f"REST latency probe failed: {e}")
+            return
+        self.latency_tracker.record('rest', time.perf_counter() - started)
+
+    @latency_sampler.before_loop
+    async def before_latency_sampler(self):
+        await self.wait_until_ready()
+
+    def collect_metrics(self):
+        """One sample for the metrics history; the store adds loop lag itself"""
+        now = time.time()
+        commands_ms = list(self.latency_tracker.series['command'].since(self._last_metrics_sample))
+        self._last_metrics_sample = now
+        ready = self.is_ready()
+        return {
+            'heartbeat_ms': self.latency * 1000 if ready else None,
+            'command_ms': sum(commands_ms) / len(commands_ms) if commands_ms else None,
+            'commands': len(commands_ms),
+            'guilds': len(self.guilds) if ready else None,
+            'rss_mb': rss_bytes() / 1024 / 1024,
+        }
+
+    async def close(self):
+        if self.stream_gateway is not None:
+            await self.stream_gateway.stop()
+        if self._stream_worker_task is not None:
+            self._stream_worker_task.cancel()
+        if self.stream is not None:
+            await self.stream.close()
+        await self.command_queue.stop()
+        await self.errors.stop()
+        await self.scheduler.stop()
+        await self.audit_log.stop()
+        if self.timeseries is not None:
+            await self.timeseries.stop()
+        self.keywords.close()
+        if self._owns_worker_pool:
+            self.worker_pool.shutdown()
+        await super().close()
+
+    async def on_ready(self):
+        """Bot startup event"""
+        logger.info("="*50)
+        logger.info("🤖 DISCORD BOT DEPLOYED ON RAILWAY!")
+        logger.info("="*50)
+        if BOTS_CONFIG:
+            logger.info(f"Instance: {self.name}")
+        logger.info(f"Bot Name: {self.user.name}#{self.user.discriminator}")
+        logger.info(f"Bot ID: {self.user.id}")
+        logger.info(f"Connected to {len(self.guilds)} servers")
+        logger.info(f"Command Prefix: {self.display_prefix}")
+        logger.info(f"Slash Only: {not self.intents.message_content}")
+        logger.info(f"Environment: {ENVIRONMENT}")
+        logger.info(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        if self.guilds:
+            logger.info("📋 Server List:")
+            for guild in islice(self.guilds, STARTUP_GUILD_LOG_LIMIT):
+                logger.info(f"  • {guild.name} ({guild.member_count} members)")
+            if len(self.guilds) > STARTUP_GUILD_LOG_LIMIT:
+                logger.info(f"  ... and {len(self.guilds) - STARTUP_GUILD_LOG_LIMIT} more servers")
+
+        logger.info("🎯 Bot is ready for commands!")
+        logger.info("="*50)
+
+        # Set bot status
+        await self.change_presence(
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name=f"{len(self.guilds)} servers | {self.display_prefix}help"
+            )
+        )
 
-@bot.command(name='status')
-async def status(ctx):
-    """Comprehensive bot status"""
-    embed = discord.Embed(
-        title="🤖 Bot Status (Railway Deployment)",
-        color=discord.Color.green(),
-        timestamp=datetime.utcnow()
-    )
+    async def on_guild_join(self, guild):
+        """Bot joins a new server"""
+        logger.info(f"🎉 Joined new server: {guild.name} ({guild.member_count} members)")
 
-    embed.add_field(
-        name="📊 Connection",
-        value=f"✅ Online\n📡 {round(bot.latency * 1000, 1)}ms",
-        inline=True
-    )
+        # Update presence
+        await self.change_presence(
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name=f"{len(self.guilds)} servers | {self.display_prefix}help"
+            )
+        )
 
-    embed.add_field(
-        name="🏠 Servers",
-        value=f"🎯 This Server: {ctx.guild.name}\n📈 Total: {len(bot.guilds)}",
-        inline=True
-    )
+    async def on_guild_remove(self, guild):
+        """Bot leaves a server"""
+        logger.info(f"👋 Left server: {guild.name}")
 
-    embed.add_field(
-        name="🚂 Platform",
-        value=f"Railway\nEnv: {ENVIRONMENT}",
-        inline=True
-    )
+        # Update presence
+        await self.change_presence(
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name=f"{len(self.guilds)} servers | {self.display_prefix}help"
+            )
+        )
 
-    embed.add_field(
-        name="👥 Users",
-        value=f"👤 This Server: {ctx.guild.member_count}\n🌍 Total: {sum(g.member_count for g in bot.guilds)}",
-        inline=True
-    )
+    async def on_message(self, message):
+        """Handle incoming messages"""
+        if message.author == self.user:
+            return
+
+        # Moderators are neither tracked nor actioned
+        if (ANTISPAM_ENABLED and message.guild and not message.author.bot
+                and not getattr(message.author, 'guild_permissions', discord.Permissions.none()).manage_messages):
+            verdict = self.antispam.check_message(message)
+            if verdict:
+                await self.spam_enforcer.enforce(message, verdict)
+                return
+
+        if message.guild and not message.author.bot and not message.content.startswith(self.display_prefix):
+            if await self.keywords.dispatch(message):
+                return
+
+        self.activity_tracker.record_message(message)
+
+        # Log commands for debugging
+        if message.content.startswith(self.display_prefix):
+            logger.info(f"📝 Command: {message.content} from {message.author} in #{message.channel} ({message.guild.name})")
+        elif message.guild:
+            self.search_index.add_message(message)
+
+        await self.process_commands(message)
+
+    def audit_loggable(self, guild_id, channel_id, author_id=None):
+        """Skip DMs, the bot's own messages and the log channel itself"""
+        if not AUDIT_LOG_ENABLED or guild_id is None or author_id == self.user.id:
+            return False
+        return channel_id is None or channel_id != self.audit_log.channels.get(guild_id)
+
+    async def on_raw_message_edit(self, payload):
+        """Re-index edited messages so search matches what is on screen, and log the change"""
+        entry = self.search_index.messages.get(payload.message_id)
+        before = payload.cached_message.content if payload.cached_message else entry and entry.text
+        after = payload.data.get('content')
+        author = payload.data.get('author', {})
+
+        if entry is not None and after is not None:
+            self.search_index.add(entry.id, entry.guild_id, entry.channel_id, entry.author_id, after)
+
+        # Embed unfurls also arrive as edits; only log real content changes by people
+        if after is not None and before is not None and after != before and not author.get('bot'):
+            if self.audit_loggable(payload.guild_id, payload.channel_id, int(author.get('id', 0))):
+                self.audit_log.log(
+                    payload.guild_id, 'message_edit',
+                    f"✏️ <@{author['id']}> edited a message in <#{payload.channel_id}>: ~~{quote(before)}~~ → {quote(after)}",
+                    channel_id=payload.channel_id, message_id=payload.message_id, author_id=int(author['id']),
+                    before=before, after=after
+                )
+
+    async def on_raw_message_delete(self, payload):
+        entry = self.search_index.messages.get(payload.message_id)
+        message = payload.cached_message
+        author_id = message.author.id if message else entry and entry.author_id
+        if self.audit_loggable(payload.guild_id, payload.channel_id, author_id):
+            content = message.content if message else entry and entry.text
+            who = f"<@{author_id}>" if author_id else "an uncached message"
+            self.audit_log.log(
+                payload.guild_id, 'message_delete',
+                f"🗑️ Deleted in <#{payload.channel_id}> from {who}: {quote(content)}",
+                channel_id=payload.channel_id, message_id=payload.message_id, author_id=author_id, content=content
+            )
+        self.search_index.remove(payload.message_id)
+
+    async def on_raw_bulk_message_delete(self, payload):
+        if self.audit_loggable(payload.guild_id, payload.channel_id):
+            self.audit_log.log(
+                payload.guild_id, 'bulk_delete',
+                f"🧹 {len(payload.message_ids)} messages bulk-deleted in <#{payload.channel_id}>",
+                channel_id=payload.channel_id, message_ids=sorted(payload.message_ids)
+            )
+        for message_id in payload.message_ids:
+            self.search_index.remove(message_id)
+
+    async def on_member_join(self, member):
+        if self.audit_loggable(member.guild.id, None):
+            self.audit_log.log(
+                member.guild.id, 'member_join',
+                f"📥 {member.mention} ({member}) joined • account created <t:{int(member.created_at.timestamp())}:R>",
+                user_id=member.id, created_at=member.created_at.isoformat()
+            )
+
+    async def on_raw_member_remove(self, payload):
+        if self.audit_loggable(payload.guild_id, None):
+            self.audit_log.log(
+                payload.guild_id, 'member_leave', f"📤 {payload.user.mention} ({payload.user}) left",
+                user_id=payload.user.id
+            )
+
+    async def on_member_update(self, before, after):
+        """Log role changes; other member updates (nicknames, avatars) are ignored"""
+        if before.roles == after.roles or not self.audit_loggable(after.guild.id, None):
+            return
+        added = [role for role in after.roles if role not in before.roles]
+        removed = [role for role in before.roles if role not in after.roles]
+        changes = [f"+{role.mention}" for role in added] + [f"-{role.mention}" for role in removed]
+        self.audit_log.log(
+            after.guild.id, 'member_roles', f"🎭 {after.mention} roles: {' '.join(changes)}",
+            user_id=after.id, added=[role.id for role in added], removed=[role.id for role in removed]
+        )
 
-    embed.set_footer(text=f"Bot ID: {bot.user.id} • Deployed on Railway")
+    async def on_guild_channel_delete(self, channel):
+        self.search_index.remove_channel(channel.id)
+
+    async def on_command_completion(self, ctx):
+        """Record how long the user waited, from their message to the command finishing"""
+        invoked_at = (ctx.interaction or ctx.message).created_at
+        self.latency_tracker.record('command', (discord.utils.utcnow() - invoked_at).total_seconds())
+
+    async def on_command_error(self, ctx, error):
+        """Handle command errors"""
+        # Slash commands that raise skip the after-invoke hook, so free their queue slot here too
+        self.command_queue.release(ctx)
+        cause = getattr(error, 'original', error)
+        if isinstance(cause, CircuitOpen) or is_outage(cause):
+            # Discord isn't taking requests; an error reply would only add to the failing traffic
+            self.errors.record(cause, command=ctx.command and ctx.command.qualified_name, channel_id=ctx.channel.id)
+            return
+        if isinstance(error, commands.CommandNotFound):
+            await ctx.send(f"❌ Unknown command. Type `{self.display_prefix}help` for available commands.")
+        elif isinstance(error, commands.MissingPermissions):
+            await ctx.send("❌ You don't have permission to use this command.")
+        elif isinstance(error, commands.BotMissingPermissions):
+            await ctx.send("❌ I don't have permission to perform this action.")
+        elif isinstance(error, commands.NoPrivateMessage):
+            await ctx.send("❌ This command can only be used in a server.")
+        elif isinstance(error, CommandRejected):
+            logger.warning(f"🚦 {error.command} from {ctx.author} dropped ({error.reason})")
+            await ctx.send("⏳ I'm busy right now, so that command was dropped. Please try again in a moment.")
+        elif isinstance(error, commands.UserInputError) or isinstance(cause, app_commands.TransformerError):
+            await ctx.send(f"❌ {error}\nUsage: `{self.display_prefix}{ctx.command.qualified_name} {ctx.command.signature}`")
+        elif isinstance(error, commands.CommandOnCooldown):
+            await ctx.send(f"⏳ Slow down! Try that again in {error.retry_after:.0f}s.")
+        elif isinstance(error, commands.CheckFailure) or isinstance(cause, app_commands.CheckFailure):
+            await ctx.send("❌ You can't use this command here.")
+        elif isinstance(error, (commands.CommandInvokeError, commands.HybridCommandError)):
+            # A bug in the command: grouped by fingerprint so a failing command can't flood channels or the log
+            fingerprint, reply = self.errors.record(
+                error, command=ctx.command and ctx.command.qualified_name, channel_id=ctx.channel.id
+            )
+            # Slash commands still get an (ephemeral) answer, or Discord shows the interaction as failed
+            if reply or ctx.interaction:
+                await ctx.send(f"❌ An error occurred: {str(error)} (ref `{fingerprint}`)", ephemeral=True)
+        else:
+            logger.warning(f"Command {ctx.command} failed: {error}")
+            await ctx.send(f"❌ {error}")
 
-    await ctx.send(embed=embed)
 
-@bot.command(name='server', aliases=['serverinfo'])
-async def server_info(ctx):
-    """Display server information"""
-    guild = ctx.guild
+class Core(commands.Cog):
+    """Commands every bot instance gets, whatever extensions it loads"""
 
-    embed = discord.Embed(
-        title=f"🏠 {guild.name}",
-        color=discord.Color.blue(),
-        timestamp=datetime.utcnow()
-    )
+    def __init__(self, bot):
+        self.bot = bot
 
-    if guild.icon:
-        embed.set_thumbnail(url=guild.icon.url)
-
-    embed.add_field(name="👑 Owner", value=guild.owner.mention, inline=True)
-    embed.add_field(name="👥 Members", value=guild.member_count, inline=True)
-    embed.add_field(name="💬 Channels", value=len(guild.channels), inline=True)
-    embed.add_field(name="🎭 Roles", value=len(guild.roles), inline=True)
-    embed.add_field(name="📅 Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
-    embed.add_field(name="🆔 Server ID", value=guild.id, inline=True)
-
-    await ctx.send(embed=embed)
-
-@bot.command(name='railway')
-async def railway_info(ctx):
-    """Display Railway deployment information"""
-    embed = discord.Embed(
-        title="🚂 Railway Deployment Info",
-        color=discord.Color.purple(),
-        timestamp=datetime.utcnow()
+    @commands.hybrid_command(name='reload', extras={'priority': 'moderation'})
+    @commands.is_owner()
+    async def reload_command(self, ctx, extension: str = 'all'):
+        """Reload command extensions in place without reconnecting (owner only)"""
+        bot = self.bot
+        if extension == 'all':
+            names = list(bot.extensions)
+        else:
+            names = [extension if extension.startswith('cogs.') else f'cogs.{extension}']
+            if names[0] not in bot.extensions:
+                await ctx.send(f"❌ Extension `{names[0]}` is not loaded. Loaded: {', '.join(bot.extensions)}")
+                return
+
+        lines = []
+        for name in names:
+            ok, elapsed, error = await bot.reload_extension_timed(name)
+            if ok:
+                lines.append(f"✅ `{name}` reloaded in {elapsed:.1f}ms")
+            else:
+                lines.append(f"❌ `{name}` failed ({type(error).__name__}), previous version kept")
+
+        await bot.sync_commands()
+
+        embed = discord.Embed(
+            title="🧩 Extension Reload",
+            description="\n".join(lines),
+            color=discord.Color.green() if all(line.startswith("✅") for line in lines) else discord.Color.red()
+        )
+        await ctx.send(embed=embed)
+
+
+def create_bot(name='main', prefix=COMMAND_PREFIX, slash_only=SLASH_ONLY, **kwargs):
+    return SecretRoomBot(
+        # Mentions still work as a prefix when message content is unavailable
+        command_prefix=commands.when_mentioned_or(prefix),
+        intents=bot_intents(slash_only),
+        help_command=commands.DefaultHelpCommand(),
+        name=name,
+        display_prefix=prefix,
+        **kwargs
     )
 
-    embed.add_field(name="🌍 Environment", value=ENVIRONMENT, inline=True)
-    embed.add_field(name="🔧 Platform", value="Railway", inline=True)
-    embed.add_field(name="⚡ Status", value="✅ Running", inline=True)
-
-    # Add Railway-specific environment info if available
-    railway_env = os.getenv('RAILWAY_ENVIRONMENT_NAME', 'production')
-    railway_service = os.getenv('RAILWAY_SERVICE_NAME', 'discord-bot')
+# Create bot instance (the multi-bot runner creates its own inside the event loop)
+bot = None if BOTS_CONFIG else create_bot()
+
+def call_on_bot_loop(bot, func, timeout=10):
+    """Run a function on the bot's event loop (from the health server thread) and return its result"""
+    async def runner():
+        return func()
+    return asyncio.run_coroutine_threadsafe(runner(), bot.loop).result(timeout)
+
+def health_report(bot):
+    # Split-mode workers never connect to the gateway; consuming the stream is their ready state
+    ready = bot.is_ready() or (BOT_MODE == 'worker' and bot.stream_worker.running)
+    rest = bot.rest_breaker.health()
+    # Still a 200: Railway should leave a bot alone while it is waiting out a Discord outage
+    backing_off = rest["open"] or rest["global_rate_limited"]
+    return {
+        "status": ("backing_off" if backing_off else "healthy") if ready else "starting",
+        "mode": BOT_MODE,
+        "bot_name": bot.user.name if bot.user else None,
+        "bot_id": bot.user.id if bot.user else None,
+        "guilds": len(bot.guilds) if bot.is_ready() else 0,
+        "uptime": "online" if bot.is_ready() else "connecting",
+        "latency_ms": bot.latency_tracker.report(),
+        "rest": rest
+    }
+
+def metrics_report(bot, top):
+    metrics_data = {
+        "workers": bot.worker_pool.metrics(),
+        "bulk_rest": bot.route_limiter.metrics(),
+        "antispam": bot.antispam.stats(),
+        "keywords": bot.keywords.metrics(),
+        "audit_log": bot.audit_log.metrics(),
+        "raid": {**bot.raid_detector.stats(), **bot.raid_responder.metrics()},
+        "commands": bot.command_queue.metrics(),
+        "rest_breaker": bot.rest_breaker.metrics(),
+        "errors": bot.errors.metrics()
+    }
+    if bot.timeseries is not None:
+        metrics_data["timeseries"] = bot.timeseries.metrics()
+    if bot.stream is not None:
+        metrics_data["stream"] = {
+            **(bot.stream_gateway.metrics() if bot.stream_gateway else {}),
+            **({"worker": bot.stream_worker.metrics()} if bot.stream_worker else {})
+        }
+    if bot.is_ready():
+        # SQLite connections can only be used from the thread that opened them
+        metrics_data["scheduler"] = call_on_bot_loop(bot, bot.scheduler.metrics)
+    if GATEWAY_TELEMETRY and bot.is_ready():
+        # The counters are updated on the bot loop, so read them there too
+        metrics_data["gateway"] = call_on_bot_loop(bot, lambda: bot.telemetry.report(
+            top, names=lambda guild_id: getattr(bot.get_guild(guild_id), 'name', None)
+        ))
+    return metrics_data
 
-    embed.add_field(name="🏷️ Service", value=railway_service, inline=True)
-    embed.add_field(name="🎯 Environment", value=railway_env, inline=True)
-    embed.add_field(name="🕒 Uptime", value="Since last deployment", inline=True)
-
-    embed.set_footer(text="Powered by Railway.app")
-
-    await ctx.send(embed=embed)
+class HealthHandler(BaseHTTPRequestHandler):
+    """Serves every bot in the process; with several, reports are keyed by bot name and ?bot= picks one"""
 
-# Fun Commands
-@bot.command(name='roll')
-async def roll_dice(ctx, sides: int = 6):
-    """Roll a dice (default 6 sides)"""
-    import random
+    def send_json(self, data, status=200):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(data, default=str).encode())
 
-    if sides < 2 or sides > 100:
-        await ctx.send("❌ Dice must have between 2 and 100 sides!")
-        return
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        bots = self.server.bots
+        bot = bots.get(query.get('bot', [next(iter(bots))])[0])
+
+        if url.path == '/health':
+            if len(bots) == 1:
+                self.send_json(health_report(bot))
+            else:
+                reports = {name: health_report(bot) for name, bot in bots.items()}
+                statuses = {report["status"] for report in reports.values()}
+                status = next((name for name in ("starting", "backing_off") if name in statuses), "healthy")
+                self.send_json({"status": status, "bots": reports})
+
+        elif url.path == '/metrics':
+            top = int(query.get('top', [str(TELEMETRY_TOP_GUILDS)])[0])
+            if len(bots) == 1:
+                self.send_json(metrics_report(bot, top))
+            else:
+                self.send_json({"bots": {name: metrics_report(bot, top) for name, bot in bots.items()}})
+
+        elif bot is None and url.path in ('/stats', '/debug/memory'):
+            self.send_json({"error": "unknown bot", "bots": list(bots)}, status=404)
+
+        elif url.path == '/stats' and bot.timeseries is not None:
+            seconds = parse_duration(query.get('range', ['24h'])[0])
+            points = query.get('points', ['120'])[0]
+            if not seconds or not points.isdecimal() or int(points) < 1:
+                self.send_response(400)
+                self.end_headers()
+                return
+            points = int(points)
+            series = [name for name in query.get('series', [''])[0].split(',') if name in bot.timeseries.series]
+            # The ring files are written on the bot loop, so read them there as well
+            self.send_json(call_on_bot_loop(bot, lambda: bot.timeseries.query(seconds, series=series or None, points=points)))
+
+        elif url.path == '/debug/memory' and DEBUG_ENDPOINTS:
+            if not bot.is_ready():
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            # Caches are only safe to walk from the loop that mutates them
+            top = int(query.get('top', ['10'])[0])
+            if query.get('snapshot'):
+                memory_data = call_on_bot_loop(bot, lambda: {
+                    "diff": bot.memory_profiler.snapshot(),
+                    "report": bot.memory_profiler.report(top)
+                })
+            else:
+                memory_data = call_on_bot_loop(bot, lambda: bot.memory_profiler.report(top))
+            self.send_json(memory_data)
 
-    result = random.randint(1, sides)
+        elif self.path == '/':
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain')
+            self.end_headers()
+            self.wfile.write("Discord Secret Room Bot is running! 🤖".encode())
+        else:
+            self.send_response(404)
+            self.end_headers()
 
-    embed = discord.Embed(
-        title="🎲 Dice Roll",
-        description=f"You rolled a **{result}** on a {sides}-sided dice!",
-        color=discord.Color.gold()
-    )
+    def log_message(self, format, *args):
+        # Suppress default HTTP logging
+        pass
 
-    await ctx.send(embed=embed)
+def start_health_server(bots):
+    port = int(os.getenv('PORT', 3000))
+    server = HTTPServer(('0.0.0.0', port), HealthHandler)
+    server.bots = bots
 
-@bot.command(name='flip')
-async def flip_coin(ctx):
-    """Flip a coin"""
-    import random
+    def run_server():
+        logger.info(f"Health check server running on port {port}")
+        server.serve_forever()
 
-    result = random.choice(["Heads", "Tails"])
+    server_thread = threading.Thread(target=run_server, daemon=True)
+    server_thread.start()
+    return server
 
-    embed = discord.Embed(
-        title="🪙 Coin Flip",
-        description=f"The coin landed on: **{result}**!",
-        color=discord.Color.gold()
-    )
+async def run_worker():
+    """Split-mode worker: log in for REST only and run forwarded commands until stopped"""
+    async with bot:
+        await bot.login(BOT_TOKEN)
+        await bot.stream_worker.run()
+
+async def run_bots(configs):
+    """Run every configured bot on this loop, sharing one HTTP pool, one worker pool and one health server"""
+    # Both must be created on the running loop; the connector binds to it
+    connector = SharedConnector(limit=0)
+    worker_pool = WorkerPool(max_workers=WORKER_POOL_SIZE, default_timeout=WORKER_JOB_TIMEOUT)
+    bots = {}
+    tokens = {}
+    for config in configs:
+        tokens[config['name']] = config.pop('token')
+        bots[config['name']] = create_bot(connector=connector, worker_pool=worker_pool, **config)
+    logger.info(f"🤖 Running {len(bots)} bots in one process: {', '.join(bots)}")
+    start_health_server(bots)
+
+    async def run_one(name, bot):
+        try:
+            async with bot:
+                await bot.start(tokens[name])
+        except discord.LoginFailure:
+            # One bad token shouldn't take the other bots down with it
+            logger.error(f"❌ Invalid token for bot {name!r}; the other bots keep running")
 
-    await ctx.send(embed=embed)
+    try:
+        await asyncio.gather(*(run_one(name, bot) for name, bot in bots.items()))
+    finally:
+        worker_pool.shutdown()
+        await connector.shutdown()
 
 def main():
     """Main function to run the bot"""
     logger.info("🚀 Starting Discord Bot on Railway...")
     logger.info("Environment: " + ENVIRONMENT)
+    if BOT_MODE != 'standalone':
+        logger.info(f"🔀 Split mode: {BOT_MODE} on {STREAM_NAME}")
+    if BOTS_CONFIG and BOT_MODE != 'standalone':
+        logger.error("❌ BOTS_CONFIG runs every bot in this process and can't be combined with BOT_MODE")
+        sys.exit(1)
+    if BOT_MODE == 'worker' and STREAM_URL.startswith('memory://'):
+        # An in-process stream can't be reached by any gateway, so the worker would sit idle forever
+        logger.error("❌ BOT_MODE=worker needs a shared stream: set STREAM_URL or REDIS_URL to a Redis URL")
+        sys.exit(1)
+
+    if MEMORY_TRACEMALLOC:
+        start_tracing()
+
+    if BOTS_CONFIG:
+        try:
+            configs = load_bots_config(BOTS_CONFIG, {
+                'prefix': COMMAND_PREFIX, 'data_dir': DATA_DIR, 'extensions': EXTENSIONS,
+                'sync_guild_id': SYNC_GUILD_ID, 'slash_only': SLASH_ONLY,
+            })
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Could not load BOTS_CONFIG: {e}")
+            sys.exit(1)
 
     try:
+        if BOTS_CONFIG:
+            asyncio.run(run_bots(configs))
+            return
+
         # Start health check server
-        start_health_server()
+        start_health_server({bot.name: bot})
 
         # Run the bot
-        bot.run(BOT_TOKEN)
+        if BOT_MODE == 'worker':
+            asyncio.run(run_worker())
+        else:
+            bot.run(BOT_TOKEN)
     except discord.LoginFailure:
         logger.error("❌ Invalid bot token! Check DISCORD_TOKEN environment variable.")
         sys.exit(1)
@@ -3,17 +3,28 @@ from discord.ext import commands
 import asyncio
 import time
 import os
+import sys
 from dotenv import load_dotenv
 
+# Allow importing the shared helpers when run from the tests directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.latency import LatencyTracker
+from utils.pagination import Paginator, field_pages
+
 # Load environment variables from .env file
 load_dotenv()
 
+def format_ms(milliseconds):
+    """'42ms', or 'n/a' when there is no sample (e.g. before the first heartbeat ACK)"""
+    return "n/a" if milliseconds is None else f"{round(milliseconds)}ms"
+
 class BotStatusChecker:
     def __init__(self, token):
         self.token = token
         intents = discord.Intents.default()
         intents.message_content = True
         self.bot = commands.Bot(command_prefix='!', intents=intents)
+        self.latency = LatencyTracker()
         self.setup_events()
         self.setup_commands()
 
@@ -37,16 +48,15 @@ class BotStatusChecker:
         @self.bot.command(name='ping')
         async def ping_command(ctx):
             """Check bot latency and responsiveness"""
-            start_time = time.time()
+            start_time = time.perf_counter()
             message = await ctx.send("🏓 Pinging...")
-            end_time = time.time()
-
-            api_latency = round(self.bot.latency * 1000)
-            response_time = round((end_time - start_time) * 1000)
+            self.latency.record('rest', time.perf_counter() - start_time)
+            self.latency.record('heartbeat', self.bot.latency)
 
             await message.edit(content=f"🏓 Pong!\n"
-                                     f"📡 API Latency: {api_latency}ms\n"
-                                     f"⚡ Response Time: {response_time}ms")
+                                     f"📡 API Latency: {format_ms(self.latency.latest('heartbeat'))}\n"
+                                     f"⚡ Response Time: {format_ms(self.latency.latest('rest'))}\n"
+                                     f"📈 Response p50/p95/p99:\n{self.latency.summary('rest')}")
 
         @self.bot.command(name='status')
         async def status_command(ctx):
@@ -127,19 +137,13 @@ class BotStatusChecker:
                 await ctx.send("❌ Bot is not in any servers.")
                 return
 
-            embed = discord.Embed(
-                title=f"🏠 Servers ({len(self.bot.guilds)})",
-                color=discord.Color.blue()
+            # Pages are built on demand, so only the pages actually viewed cost anything
+            fields = (
+                (guild.name, f"ID: {guild.id}\nMembers: {guild.member_count}", True)
+                for guild in self.bot.guilds
             )
-
-            for guild in self.bot.guilds:
-                embed.add_field(
-                    name=guild.name,
-                    value=f"ID: {guild.id}\nMembers: {guild.member_count}",
-                    inline=True
-                )
-
-            await ctx.send(embed=embed)
+            pages = field_pages(fields, title=f"🏠 Servers ({len(self.bot.guilds)})", per_page=12)
+            await Paginator(pages, author_id=ctx.author.id).start(ctx)
 
     async def run_tests(self):
         """Run automated connectivity tests"""
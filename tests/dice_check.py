@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Dice Stats Check
+Times `!roll stats` for expressions near the exact/sampled boundary and fails if
+any of them takes longer than the worker timeout allows.
+
+Each expression runs in a fresh worker process, the same way cogs/fun.py runs it,
+so a runaway exact enumeration is killed instead of hanging the check.
+
+Usage:
+    python3 tests/dice_check.py
+    python3 tests/dice_check.py --budget 2 "10000d2kh1" "40d6kh3"
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool, TimeoutError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dice import distribution_stats  # noqa: E402
+
+EXPRESSIONS = [
+    "4d6kh3", "2d20kh1", "8d10dl2", "15d6kh3", "20d6kh3",
+    "500d2kh1", "10000d2kh1", "100d100kh1", "1000d6", "10000d1000",
+    "3d6!+2d8", "(2d6+3)*2",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that dice stats stay within their time budget")
+    parser.add_argument('expressions', nargs='*', default=EXPRESSIONS)
+    parser.add_argument('--budget', type=float, default=3.0, help="seconds each expression may take")
+    args = parser.parse_args()
+
+    failed = 0
+    for expression in args.expressions:
+        pool = Pool(1)
+        started = time.perf_counter()
+        try:
+            stats = pool.apply_async(distribution_stats, (expression, 1)).get(timeout=args.budget)
+        except TimeoutError:
+            print(f"❌ {expression:<14} over {args.budget:.0f}s budget")
+            failed += 1
+            continue
+        finally:
+            pool.terminate()
+        elapsed = time.perf_counter() - started
+        print(f"✅ {expression:<14} {elapsed * 1000:8.1f}ms  {stats['method']:<22} mean {stats['mean']:.2f}")
+
+    print(f"\n{len(args.expressions) - failed}/{len(args.expressions)} within budget")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Discord Bot Fleet Checker
+Checks every bot application in a fleet concurrently and prints one consolidated report.
+
+Each bot is checked with three lightweight REST calls (/users/@me,
+/applications/@me and /gateway/bot) instead of a full gateway login; pass
+--gateway to also run status_check.py's MinimalBotChecker for bots whose
+REST check passed.
+
+The fleet file has one bot per line: `name token [application_id]`.
+Blank lines and lines starting with # are ignored.
+
+Usage:
+    python3 tests/fleet_check.py --file fleet.txt
+    python3 tests/fleet_check.py --file fleet.txt --concurrency 10 --timeout 5 --json
+    FLEET_TOKENS="main=TOKEN_A,staging=TOKEN_B" python3 tests/fleet_check.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from status_check import MinimalBotChecker  # noqa: E402
+
+API_BASE = "https://discord.com/api/v10"
+
+# Full gateway logins at the same time, whatever --concurrency is; each one spends a session start
+GATEWAY_CONCURRENCY = 2
+
+ENDPOINTS = {
+    'user': '/users/@me',
+    'application': '/applications/@me',
+    'gateway': '/gateway/bot',
+}
+
+
+class QuietChecker(MinimalBotChecker):
+    """MinimalBotChecker without the per-bot report; the fleet report replaces it.
+
+    Progress lines go to stderr so stdout stays a clean report (or JSON).
+    """
+
+    def print_results(self):
+        pass
+
+    def log(self, message):
+        print(message, file=sys.stderr)
+
+
+def load_fleet(path=None):
+    """Read (name, token, application_id) entries from a fleet file or FLEET_TOKENS"""
+    load_dotenv()
+    fleet = []
+
+    if path:
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split()
+                if len(parts) < 2:
+                    raise ValueError(f"{path}:{number}: expected 'name token [application_id]'")
+                fleet.append((parts[0], parts[1], parts[2] if len(parts) > 2 else None))
+        return fleet
+
+    for index, entry in enumerate(filter(None, os.getenv('FLEET_TOKENS', '').split(','))):
+        name, _, token = entry.strip().rpartition('=')
+        fleet.append((name or f"bot-{index + 1}", token, None))
+
+    if not fleet and os.getenv('DISCORD_TOKEN'):
+        fleet.append(('default', os.getenv('DISCORD_TOKEN'), None))
+    return fleet
+
+
+async def timed_get(session, token, path):
+    """GET one endpoint; returns (status, json body or None, milliseconds)"""
+    started = time.perf_counter()
+    async with session.get(API_BASE + path, headers={'Authorization': f"Bot {token}"}) as response:
+        try:
+            body = await response.json(content_type=None) if response.content_length != 0 else None
+        except ValueError:
+            # An HTML error page from Discord's edge (502/503, Cloudflare); the status says enough
+            body = None
+        return response.status, body, (time.perf_counter() - started) * 1000
+
+
+async def check_bot(session, semaphore, gateway_semaphore, name, token, application_id, timeout, gateway):
+    """Run every REST check for one bot under the shared semaphore, then the optional gateway login"""
+    result = {
+        'name': name,
+        'ok': False,
+        'bot': None,
+        'application_id': None,
+        'shards': None,
+        'session_starts_remaining': None,
+        'latency_ms': {},
+        'gateway_latency_ms': None,
+        'error': None,
+    }
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            responses = await asyncio.wait_for(
+                asyncio.gather(*(timed_get(session, token, path) for path in ENDPOINTS.values())),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            result['error'] = f"Timed out after {timeout}s"
+            return result
+        except aiohttp.ClientError as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+            return result
+        finally:
+            result['latency_ms']['total'] = round((time.perf_counter() - started) * 1000, 1)
+
+        for key, (status, body, milliseconds) in zip(ENDPOINTS, responses):
+            result['latency_ms'][key] = round(milliseconds, 1)
+            if status == 401:
+                result['error'] = "Invalid token"
+                return result
+            if status == 429:
+                retry = (body or {}).get('retry_after')
+                result['error'] = f"Rate limited on {ENDPOINTS[key]} (retry after {retry}s)"
+                return result
+            if status != 200:
+                result['error'] = f"HTTP {status} from {ENDPOINTS[key]}"
+                return result
+            if not isinstance(body, dict):
+                result['error'] = f"Unreadable response from {ENDPOINTS[key]}"
+                return result
+
+        user, application, gateway_info = (body for _, body, _ in responses)
+        result['bot'] = f"{user['username']}#{user.get('discriminator', '0')}"
+        result['application_id'] = application['id']
+        result['shards'] = gateway_info.get('shards')
+        result['session_starts_remaining'] = gateway_info.get('session_start_limit', {}).get('remaining')
+
+        if application_id and application['id'] != str(application_id):
+            result['error'] = f"Token belongs to application {application['id']}, expected {application_id}"
+            return result
+
+        result['ok'] = True
+
+    # Full logins are slow and spend session starts, so they take their own, smaller slot
+    if gateway:
+        checker = QuietChecker(token)
+        async with gateway_semaphore:
+            try:
+                # check_status bounds the login itself; this also bounds its cleanup
+                await asyncio.wait_for(checker.check_status(timeout), timeout + 2)
+            except asyncio.TimeoutError:
+                checker.results['error'] = f"Timed out after {timeout}s"
+        if checker.results['connected']:
+            result['gateway_latency_ms'] = checker.results['latency']
+        else:
+            result['ok'] = False
+            result['error'] = f"Gateway: {checker.results['error']}"
+
+    return result
+
+
+async def check_fleet(fleet, concurrency=5, timeout=5.0, gateway=False):
+    """Check every bot concurrently, at most `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    gateway_semaphore = asyncio.Semaphore(min(concurrency, GATEWAY_CONCURRENCY))
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        return await asyncio.gather(*(
+            check_bot(session, semaphore, gateway_semaphore, name, token, application_id, timeout, gateway)
+            for name, token, application_id in fleet
+        ))
+
+
+def print_table(results, elapsed):
+    print("\n" + "="*78)
+    print("📊 FLEET STATUS REPORT")
+    print("="*78)
+    print(f"{'':2} {'Name':<16} {'Bot':<24} {'Shards':>6} {'Starts':>6} {'REST ms':>8} {'WS ms':>6}")
+    print("-"*78)
+    for result in results:
+        icon = "✅" if result['ok'] else "❌"
+        rest = result['latency_ms'].get('total')
+        print(
+            f"{icon} {result['name'][:16]:<16} {(result['bot'] or '-')[:24]:<24} "
+            f"{result['shards'] if result['shards'] is not None else '-':>6} "
+            f"{result['session_starts_remaining'] if result['session_starts_remaining'] is not None else '-':>6} "
+            f"{rest if rest is not None else '-':>8} "
+            f"{result['gateway_latency_ms'] if result['gateway_latency_ms'] is not None else '-':>6}"
+        )
+        if result['error']:
+            print(f"   🔥 {result['error']}")
+
+    healthy = sum(1 for result in results if result['ok'])
+    print("-"*78)
+    print(f"🤖 Healthy: {healthy}/{len(results)} • ⏱️ {elapsed:.2f}s")
+    print(f"⏰ Check time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*78)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check every bot in a fleet concurrently")
+    parser.add_argument('--file', help="fleet file: one 'name token [application_id]' per line")
+    parser.add_argument('--concurrency', type=int, default=5, help="bots checked at the same time")
+    parser.add_argument('--timeout', type=float, default=5.0, help="seconds allowed per bot")
+    parser.add_argument('--gateway', action='store_true', help="also do a full gateway login per bot")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    fleet = load_fleet(args.file)
+    if not fleet:
+        print("❌ No bots to check - pass --file or set FLEET_TOKENS / DISCORD_TOKEN")
+        sys.exit(2)
+
+    started = time.perf_counter()
+    results = await check_fleet(fleet, args.concurrency, args.timeout, args.gateway)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps({
+            'checked_at': datetime.now().isoformat(),
+            'elapsed_s': round(elapsed, 2),
+            'healthy': sum(1 for result in results if result['ok']),
+            'bots': results,
+        }, indent=2))
+    else:
+        print_table(results, elapsed)
+
+    if not all(result['ok'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Synthetic Message Load Generator
+Feeds fake messages through start.py's on_message in-process to measure command throughput.
+
+No Discord connection is made: guilds, channels, members and messages are built
+from synthetic payloads, and every outbound REST call is answered by a stub.
+
+Usage:
+    python3 tests/load_generator.py --rate 200 --duration 30
+    python3 tests/load_generator.py --rate 0 --concurrency 50 --mix "ping=5,roll 20=3,status=1,chat=10"
+    python3 tests/load_generator.py --rate 0 --split 4 --mix "roll 20=5,flip=2,status=1"
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# start.py refuses to import without a token and keeps local state in BOT_DATA_DIR
+os.environ.setdefault('DISCORD_TOKEN', 'load-generator')
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='load-generator-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+import start  # noqa: E402
+from utils.latency import percentiles  # noqa: E402
+from utils.memory import rss_bytes  # noqa: E402
+from utils.stream import MemoryStream, StreamGateway, StreamWorker  # noqa: E402
+
+DEFAULT_MIX = "ping=4,status=2,server=2,roll=3,roll 20=2,flip=2,hello=2,nosuchcommand=1,chat=10"
+
+BOT_USER_ID = 900000000000000000
+
+
+class FakeWorld:
+    """Synthetic guilds, channels and members registered in the bot's connection state"""
+
+    def __init__(self, bot, guild_count, channels_per_guild, members_per_guild):
+        self.bot = bot
+        self.state = bot._connection
+        self._ids = itertools.count(1)
+        self.targets = []  # (channel, member) pairs messages can come from
+
+        self.bot_user = {
+            'id': str(BOT_USER_ID),
+            'username': 'secret_room',
+            'discriminator': '7956',
+            'global_name': None,
+            'avatar': None,
+            'bot': True,
+        }
+        self.state.user = discord.ClientUser(state=self.state, data=self.bot_user)
+
+        for _ in range(guild_count):
+            self._add_guild(channels_per_guild, members_per_guild)
+
+    def snowflake(self):
+        return discord.utils.time_snowflake(datetime.now(timezone.utc)) + next(self._ids) % 4096
+
+    def _user(self, user_id):
+        return {
+            'id': str(user_id),
+            'username': f'user{user_id % 100000}',
+            'discriminator': '0',
+            'global_name': None,
+            'avatar': None,
+        }
+
+    def _add_guild(self, channel_count, member_count):
+        guild_id = 100000000000000000 + next(self._ids)
+        owner_id = 200000000000000000 + next(self._ids)
+        member_ids = [owner_id] + [200000000000000000 + next(self._ids) for _ in range(member_count - 1)]
+        joined = datetime.now(timezone.utc).isoformat()
+
+        members = [
+            {'user': self._user(user_id), 'roles': [], 'joined_at': joined, 'deaf': False, 'mute': False, 'flags': 0}
+            for user_id in member_ids
+        ]
+        members.append({'user': self.bot_user, 'roles': [], 'joined_at': joined, 'deaf': False, 'mute': False, 'flags': 0})
+
+        payload = {
+            'id': str(guild_id),
+            'name': f'Load Test Guild {guild_id % 10000}',
+            'owner_id': str(owner_id),
+            'member_count': len(members),
+            'roles': [{
+                'id': str(guild_id), 'name': '@everyone', 'permissions': str(discord.Permissions.general().value),
+                'position': 0, 'color': 0, 'hoist': False, 'managed': False, 'mentionable': False,
+            }],
+            'channels': [
+                {'id': str(300000000000000000 + next(self._ids)), 'type': 0, 'name': f'channel-{index}',
+                 'position': index, 'permission_overwrites': []}
+                for index in range(channel_count)
+            ],
+            'members': members,
+            'emojis': [],
+            'stickers': [],
+            'features': [],
+        }
+        guild = discord.Guild(data=payload, state=self.state)
+        self.state._add_guild(guild)
+
+        for channel in guild.text_channels:
+            for member in guild.members:
+                if not member.bot:
+                    self.targets.append((channel, member))
+
+    def message(self, content):
+        channel, payload = self.payload(content)
+        return discord.Message(state=self.state, channel=channel, data=payload)
+
+    def payload(self, content):
+        """A random channel and a raw MESSAGE_CREATE payload sent there"""
+        channel, member = random.choice(self.targets)
+        payload = {
+            'id': str(self.snowflake()),
+            'channel_id': str(channel.id),
+            'guild_id': str(channel.guild.id),
+            'author': self._user(member.id),
+            'member': {'roles': [], 'joined_at': member.joined_at.isoformat(), 'deaf': False, 'mute': False, 'flags': 0},
+            'content': content,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False,
+            'type': 0,
+        }
+        return channel, payload
+
+
+class ServerErrorResponse:
+    """Just enough of an aiohttp response for discord.DiscordServerError"""
+    status = 503
+    reason = 'Service Unavailable'
+    headers = {}
+
+
+class StubHTTP:
+    """Answers the bot's REST calls locally, optionally after a simulated round trip"""
+
+    def __init__(self, world, delay=0.0, error_rate=0.0):
+        self.world = world
+        self.delay = delay
+        self.error_rate = error_rate
+        self.calls = Counter()
+
+    async def request(self, route, **kwargs):
+        self.calls[f"{route.method} {route.path}"] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise discord.DiscordServerError(ServerErrorResponse(), 'simulated outage')
+
+        if route.method in ('POST', 'PATCH') and '/messages' in route.path:
+            body = kwargs.get('json') or {}
+            return {
+                'id': str(self.world.snowflake()),
+                'channel_id': str(route.channel_id),
+                'author': self.world.bot_user,
+                'content': body.get('content') or '',
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'edited_timestamp': None,
+                'tts': False,
+                'mention_everyone': False,
+                'mentions': [],
+                'mention_roles': [],
+                'attachments': [],
+                'embeds': body.get('embeds') or [],
+                'components': body.get('components') or [],
+                'pinned': False,
+                'type': 0,
+            }
+        if route.path == '/users/@me':
+            return self.world.bot_user
+        return {} if route.method != 'DELETE' else None
+
+
+def parse_mix(text):
+    """'ping=5,roll 20=3,chat=10' -> (contents, weights)"""
+    contents, weights = [], []
+    for entry in text.split(','):
+        name, _, weight = entry.strip().rpartition('=')
+        if not name:
+            name, weight = weight, '1'
+        contents.append(None if name == 'chat' else f"{start.COMMAND_PREFIX}{name}")
+        weights.append(float(weight))
+    return contents, weights
+
+
+async def run_load(args):
+    bot = start.bot
+    await bot._async_setup_hook()
+    await bot.load_extensions()
+    bot.command_queue.start()
+
+    print(f"🏗️ Building {args.guilds} guilds × {args.channels} channels × {args.members} members...")
+    world = FakeWorld(bot, args.guilds, args.channels, args.members)
+    http = StubHTTP(world, delay=args.http_delay / 1000, error_rate=args.http_errors)
+    # Keep the REST circuit breaker in front of the stub, as it is in front of Discord
+    bot.rest_breaker.uninstall()
+    bot.http.request = http.request
+    bot.rest_breaker.install(bot.http)
+
+    contents, weights = parse_mix(args.mix)
+    latencies = []
+    outcomes = Counter()
+    inflight = set()
+
+    # Command failures are swallowed by on_command_error, so count them from the events
+    async def count_completion(ctx):
+        outcomes[f"{ctx.command.name}: ok"] += 1
+
+    async def count_error(ctx, error):
+        command = ctx.command.name if ctx.command else "unknown"
+        outcomes[f"{command}: {type(error).__name__}"] += 1
+
+    bot.add_listener(count_completion, 'on_command_completion')
+    bot.add_listener(count_error, 'on_command_error')
+
+    workers = []
+    if args.split:
+        # Split mode in one process: stateless commands go through an in-memory stream to N consumers
+        stream = MemoryStream(start.STREAM_NAME)
+        consumers = [StreamWorker(bot, stream, f"load-{index}") for index in range(args.split)]
+        workers = [asyncio.create_task(consumer.run()) for consumer in consumers]
+        await asyncio.sleep(0)  # Let the workers register their heartbeats before the gateway looks
+        bot.stream_gateway = StreamGateway(bot, stream)
+        await bot.stream_gateway.start()
+
+    async def feed(content):
+        channel, payload = world.payload(content or f"just chatting {random.randint(0, 10**6)}")
+        if bot.stream_gateway is not None:
+            bot.stream_gateway.remember(payload)
+        message = discord.Message(state=world.state, channel=channel, data=payload)
+        started = time.perf_counter()
+        try:
+            await bot.on_message(message)
+        except Exception as e:
+            outcomes[f"on_message: {type(e).__name__}"] += 1
+        latencies.append(time.perf_counter() - started)
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    if args.rate > 0:
+        # Open loop: messages arrive on schedule whether or not earlier ones finished
+        interval = 1 / args.rate
+        next_at = started
+        while next_at < deadline:
+            content = random.choices(contents, weights)[0]
+            task = asyncio.create_task(feed(content))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+            next_at += interval
+            await asyncio.sleep(max(0, next_at - time.perf_counter()))
+        await asyncio.gather(*inflight)
+    else:
+        # Closed loop: a fixed number of senders, each waiting for its previous command
+        async def sender():
+            while time.perf_counter() < deadline:
+                await feed(random.choices(contents, weights)[0])
+                await asyncio.sleep(0)  # The stub never suspends; let the other senders run
+
+        await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+
+    if workers:
+        # Forwarded commands finish after on_message returns; wait for the consumers to catch up
+        drain_deadline = time.perf_counter() + 30
+        while await stream.backlog('workers') and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    rss_after = rss_bytes()
+    if workers:
+        split = bot.stream_gateway.metrics()
+        await bot.stream_gateway.stop()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        print(f"🔀 Split: {split['forwarded']} forwarded, {split['local']} local, {split['fallback']} fallback • "
+              + ", ".join(f"{consumer.consumer} {consumer.stats['handled']}" for consumer in consumers))
+    await bot.command_queue.stop()
+    await bot.errors.stop()  # Logs one summary line per distinct command error
+    queue = bot.command_queue.metrics()
+    if queue['waited'] or queue['rejected']:
+        waited = f"{sum(queue['waited'].values())} waited" + (f" (p95 {queue['wait_ms']['p95']}ms)" if queue['wait_ms'] else "")
+        print(f"🚦 Command queue: {waited}, "
+              + (", ".join(f"{count} {reason}" for reason, count in queue['rejected'].items()) or "none") + " dropped")
+    breaker = bot.rest_breaker.metrics()
+    if breaker['failures']:
+        print(f"🔌 REST breaker: {breaker['failures']} failures, {breaker['trips']} trips, "
+              f"{breaker['queued']} held, {breaker['rejected'] + breaker['expired']} failed fast")
+    bot.worker_pool.shutdown()
+
+    print_report(args, latencies, outcomes, http.calls, elapsed, rss_before, rss_after)
+
+
+def print_report(args, latencies, outcomes, calls, elapsed, rss_before, rss_after):
+    print("\n" + "="*50)
+    print("📊 LOAD TEST REPORT")
+    print("="*50)
+    mode = f"open loop @ {args.rate}/s" if args.rate > 0 else f"closed loop, {args.concurrency} senders"
+    print(f"⚙️ Mode: {mode}, simulated REST delay {args.http_delay}ms")
+    print(f"⏱️ Duration: {elapsed:.1f}s")
+    print(f"📨 Messages: {len(latencies)} ({len(latencies) / elapsed:.1f}/s sustained)")
+    print("✅ Outcomes:")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  • {outcome}: {count}")
+
+    stats = percentiles(latencies, points=(50, 90, 95, 99, 100))
+    if stats:
+        print("📡 Latency: " + " • ".join(f"{key} {value * 1000:.2f}ms" for key, value in stats.items()))
+
+    print(f"🌐 REST calls: {sum(calls.values())}")
+    for route, count in calls.most_common(5):
+        print(f"  • {route}: {count}")
+
+    growth = (rss_after - rss_before) / 1024 / 1024
+    print(f"💾 RSS: {rss_before / 1024 / 1024:.1f}MB → {rss_after / 1024 / 1024:.1f}MB ({growth:+.1f}MB)")
+    print("="*50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic command load for start.py")
+    parser.add_argument('--rate', type=float, default=100, help="messages per second (0 = as fast as possible)")
+    parser.add_argument('--duration', type=float, default=10, help="seconds to generate load")
+    parser.add_argument('--concurrency', type=int, default=20, help="senders in closed-loop mode (--rate 0)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="weighted command mix; 'chat' is a non-command message")
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--channels', type=int, default=5, help="text channels per guild")
+    parser.add_argument('--members', type=int, default=50, help="members per guild")
+    parser.add_argument('--http-delay', type=float, default=0, help="simulated REST round trip in ms")
+    parser.add_argument('--http-errors', type=float, default=0, help="fraction of REST calls answered with a 503")
+    parser.add_argument('--split', type=int, default=0, help="forward stateless commands to N in-process stream workers")
+    parser.add_argument('--verbose', action='store_true', help="keep the bot's per-command INFO logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,9 +27,13 @@ class MinimalBotChecker:
             'error': None
         }
 
-    async def check_status(self):
+    def log(self, message):
+        """Progress and error lines while checking"""
+        print(message)
+
+    async def check_status(self, timeout=8.0):
         """Quick status check with automatic cleanup"""
-        print("🔍 Checking Discord bot status...")
+        self.log("🔍 Checking Discord bot status...")
 
         # Create minimal client
         intents = discord.Intents.default()
@@ -56,7 +60,7 @@ class MinimalBotChecker:
 
             except Exception as e:
                 self.results['error'] = str(e)
-                print(f"❌ Error gathering info: {e}")
+                self.log(f"❌ Error gathering info: {e}")
 
             finally:
                 # Close connection quickly
@@ -64,19 +68,19 @@ class MinimalBotChecker:
 
         try:
             # Connect with timeout
-            await asyncio.wait_for(client.start(self.token), timeout=8.0)
+            await asyncio.wait_for(client.start(self.token), timeout=timeout)
 
         except asyncio.TimeoutError:
             self.results['error'] = "Connection timeout"
-            print("❌ Connection timeout (8 seconds)")
+            self.log(f"❌ Connection timeout ({timeout:g} seconds)")
 
         except discord.LoginFailure:
             self.results['error'] = "Invalid token"
-            print("❌ Authentication failed - Check your bot token")
+            self.log("❌ Authentication failed - Check your bot token")
 
         except Exception as e:
             self.results['error'] = str(e)
-            print(f"❌ Connection error: {e}")
+            self.log(f"❌ Connection error: {e}")
 
         finally:
             if not client.is_closed():
@@ -0,0 +1,3 @@
+"""
+Shared helpers for the Discord Secret Room bots.
+"""
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Channel Activity Counters
+Per-channel message counts in fixed-size minute/hour rings, and bounded
+Space-Saving sketches for the top posters of each guild over the last day.
+"""
+
+import time
+from array import array
+from collections import Counter
+
+MINUTES = 60
+HOURS = 24
+SKETCH_SIZE = 32
+SKETCH_HOURS = 4  # Hours covered by each top-poster sketch
+
+
+class CountRing:
+    """Counts per time bucket for the last `size` buckets.
+
+    Only the newest bucket number is stored; buckets skipped since the last
+    write are zeroed when the ring is advanced, so each ring is one array.
+    """
+
+    __slots__ = ('counts', 'newest')
+
+    def __init__(self, size):
+        self.counts = array('I', bytes(4 * size))
+        self.newest = None
+
+    def _advance(self, bucket):
+        size = len(self.counts)
+        if self.newest is None or bucket - self.newest >= size:
+            for index in range(size):
+                self.counts[index] = 0
+        else:
+            for skipped in range(self.newest + 1, bucket + 1):
+                self.counts[skipped % size] = 0
+        self.newest = bucket
+
+    def add(self, bucket, count=1):
+        if self.newest is None or bucket > self.newest:
+            self._advance(bucket)
+        elif self.newest - bucket >= len(self.counts):
+            return  # Older than anything the ring still holds
+        self.counts[bucket % len(self.counts)] += count
+
+    def total(self, bucket, buckets):
+        """Counts in the `buckets` buckets up to and including `bucket`"""
+        if self.newest is None:
+            return 0
+        size = len(self.counts)
+        first = max(bucket - buckets + 1, self.newest - size + 1)
+        return sum(self.counts[b % size] for b in range(first, min(bucket, self.newest) + 1))
+
+    def series(self, bucket, buckets):
+        """Per-bucket counts, oldest first, ending at `bucket`"""
+        size = len(self.counts)
+        return [
+            self.counts[b % size] if self.newest is not None and self.newest - size < b <= self.newest else 0
+            for b in range(bucket - buckets + 1, bucket + 1)
+        ]
+
+
+class ChannelActivity:
+    """Messages per minute for the last hour and per hour for the last day"""
+
+    __slots__ = ('guild_id', 'minutes', 'hours')
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.minutes = CountRing(MINUTES)
+        self.hours = CountRing(HOURS)
+
+    def add(self, now):
+        minute = int(now // 60)
+        self.minutes.add(minute)
+        self.hours.add(minute // 60)
+
+    def report(self, now):
+        minute = int(now // 60)
+        last_hour = self.minutes.total(minute, MINUTES)
+        return {
+            'last_minute': self.minutes.total(minute, 1),
+            'per_minute': round(last_hour / MINUTES, 2),
+            'last_hour': last_hour,
+            'last_day': self.hours.total(minute // 60, HOURS),
+        }
+
+
+class SpaceSaving:
+    """Bounded heavy-hitter sketch (Metwally et al.).
+
+    Keeps at most `size` counters. An untracked key takes over the smallest
+    counter, so every reported count overestimates by at most that counter's
+    value at takeover time, which is kept as the key's error (keys that never
+    took over a counter are exact and have no entry in `errors`).
+    """
+
+    __slots__ = ('size', 'counts', 'errors')
+
+    def __init__(self, size=SKETCH_SIZE):
+        self.size = size
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, key, count=1):
+        if key in self.counts:
+            self.counts[key] += count
+            return
+        if len(self.counts) < self.size:
+            self.counts[key] = count
+            return
+        smallest = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(smallest)
+        self.errors.pop(smallest, None)
+        self.counts[key] = floor + count
+        self.errors[key] = floor
+
+
+class DailyTopK:
+    """One Space-Saving sketch per few hours, merged on demand for the whole day"""
+
+    __slots__ = ('sketches', 'stamps')
+
+    def __init__(self):
+        slots = HOURS // SKETCH_HOURS
+        self.sketches = [None] * slots
+        self.stamps = [None] * slots
+
+    def add(self, key, now):
+        period = int(now // (3600 * SKETCH_HOURS))
+        slot = period % len(self.stamps)
+        if self.stamps[slot] != period:
+            self.stamps[slot] = period
+            self.sketches[slot] = SpaceSaving()
+        self.sketches[slot].add(key)
+
+    def top(self, limit, now):
+        """[(key, count, error)] over the last day, largest count first"""
+        period = int(now // (3600 * SKETCH_HOURS))
+        counts, errors = Counter(), Counter()
+        for stamp, sketch in zip(self.stamps, self.sketches):
+            if stamp is not None and period - len(self.stamps) < stamp <= period:
+                counts.update(sketch.counts)
+                errors.update(sketch.errors)
+        return [(key, count, errors[key]) for key, count in counts.most_common(limit)]
+
+
+class ActivityTracker:
+    """Message activity for every channel and guild the bot sees"""
+
+    def __init__(self):
+        self.channels = {}
+        self.posters = {}
+
+    def record(self, guild_id, channel_id, author_id, now=None):
+        now = time.time() if now is None else now
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = ChannelActivity(guild_id)
+        channel.add(now)
+
+        if guild_id is not None:
+            posters = self.posters.get(guild_id)
+            if posters is None:
+                posters = self.posters[guild_id] = DailyTopK()
+            posters.add(author_id, now)
+
+    def record_message(self, message):
+        self.record(message.guild.id if message.guild else None, message.channel.id, message.author.id,
+                    message.created_at.timestamp())
+
+    def channel(self, channel_id, now=None):
+        """Counts for one channel, or None if it has had no messages"""
+        channel = self.channels.get(channel_id)
+        return channel.report(time.time() if now is None else now) if channel else None
+
+    def hourly(self, channel_id, now=None):
+        """Messages per hour over the last day, oldest first"""
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            return [0] * HOURS
+        return channel.hours.series(int((time.time() if now is None else now) // 3600), HOURS)
+
+    def busiest_channels(self, guild_id, limit=5, now=None):
+        """[(channel_id, report)] for a guild, busiest over the last hour first"""
+        now = time.time() if now is None else now
+        reports = [
+            (channel_id, channel.report(now))
+            for channel_id, channel in self.channels.items()
+            if channel.guild_id == guild_id
+        ]
+        reports.sort(key=lambda item: (item[1]['last_hour'], item[1]['last_day']), reverse=True)
+        return [item for item in reports[:limit] if item[1]['last_day']]
+
+    def top_posters(self, guild_id, limit=5, now=None):
+        posters = self.posters.get(guild_id)
+        return posters.top(limit, time.time() if now is None else now) if posters else []
+
+    def size_bytes(self):
+        """Rough memory footprint of the counters and sketches"""
+        per_channel = 4 * (MINUTES + HOURS) + 300
+        entries = sum(
+            len(sketch.counts) + len(sketch.errors)
+            for posters in self.posters.values() for sketch in posters.sketches if sketch
+        )
+        return len(self.channels) * per_channel + entries * 80 + len(self.posters) * 300
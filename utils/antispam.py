@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Anti-Spam
+Per-user sliding-window rate checks and duplicate detection across channels and users,
+with every piece of state held in bounded, self-evicting tables.
+"""
+
+import logging
+import re
+import string
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import timedelta
+
+import discord
+
+from utils.pagination import truncate
+
+logger = logging.getLogger(__name__)
+
+# Stripped before hashing so "buy now 123" and "BUY NOW 456!!" count as copies
+MENTION_URL_PATTERN = re.compile(r"<[@#&!:\w]*\d+>|https?://\S+")
+STRIP_TABLE = str.maketrans({char: " " for char in string.digits + string.punctuation + string.whitespace})
+
+ACTIONS = ('delete', 'timeout', 'alert')
+ALERT_COOLDOWN = 60.0
+
+
+def fingerprint(content):
+    """Hash of the content with case, digits, punctuation, spacing, mentions and URLs removed.
+
+    Only str methods (which run in C) touch every character; the regex runs
+    only when the message can contain a mention or URL.
+    """
+    text = content.lower()
+    if '<' in text or '://' in text:
+        text = MENTION_URL_PATTERN.sub(" ", text)
+    normalized = "".join(text.translate(STRIP_TABLE).split())
+    return hash(normalized), len(normalized)
+
+
+class SpamVerdict:
+    __slots__ = ('reason', 'guild_id', 'user_id', 'members', 'messages', 'first')
+
+    def __init__(self, reason, guild_id, user_id, messages, first, members=None):
+        self.reason = reason      # 'rate', 'duplicate' or 'crowd'
+        self.guild_id = guild_id
+        self.user_id = user_id    # Author of the message being checked
+        self.members = members if members is not None else [user_id]  # Members to act on
+        self.messages = messages  # [(channel_id, message_id)] to remove, all by `members`
+        self.first = first        # True for the message that tripped the rule
+
+
+class AntiSpam:
+    """Decides whether a message is spam; acting on the verdict is up to the caller.
+
+    Rate: more than `rate_limit` messages from one member within
+    `rate_window` seconds. Duplicates: more than `duplicate_limit` copies of
+    the same normalized content from one member within `duplicate_window`
+    seconds, in any channels of the guild. Crowd: the same content from
+    more than `crowd_limit` different members within `crowd_window` seconds,
+    which catches many accounts pasting a message once each; the verdict
+    names every poster involved and only their messages. Callers leave
+    moderators out entirely. All tables evict least-recently-used entries
+    past their caps, and duplicate entries also expire in time order.
+    """
+
+    def __init__(self, rate_limit=6, rate_window=5.0, duplicate_limit=4, duplicate_window=30.0,
+                 crowd_limit=10, crowd_window=60.0, min_duplicate_length=12, max_users=100000,
+                 max_fingerprints=50000):
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.duplicate_limit = duplicate_limit
+        self.duplicate_window = duplicate_window
+        self.crowd_limit = crowd_limit
+        self.crowd_window = crowd_window
+        self.min_duplicate_length = min_duplicate_length
+        self.max_users = max_users
+        self.max_fingerprints = max_fingerprints
+        self.users = OrderedDict()         # (guild, user) -> [recent (time, channel, message), flagged until]
+        self.fingerprints = OrderedDict()  # (guild, user, hash) -> [first seen, count, [(channel, message)], flagged]
+        self.crowds = OrderedDict()        # (guild, hash) -> [first seen, {user: [(channel, message)]}, flagged]
+        self.checked = 0
+        self.flagged = Counter()
+        self._next_sweep = 0.0
+
+    def check(self, guild_id, channel_id, user_id, message_id, content, now=None):
+        """Record one message; returns a SpamVerdict or None"""
+        now = time.monotonic() if now is None else now
+        self.checked += 1
+        return (
+            self._check_rate(guild_id, channel_id, user_id, message_id, now)
+            or self._check_duplicate(guild_id, channel_id, user_id, message_id, content, now)
+        )
+
+    def check_message(self, message):
+        return self.check(message.guild.id, message.channel.id, message.author.id, message.id, message.content)
+
+    def _check_rate(self, guild_id, channel_id, user_id, message_id, now):
+        key = (guild_id, user_id)
+        state = self.users.get(key)
+        if state is None:
+            # One more than the limit, so the message that goes over it is the one that trips
+            state = self.users[key] = [deque(maxlen=self.rate_limit + 1), 0.0]
+            if len(self.users) > self.max_users:
+                self.users.popitem(last=False)
+        else:
+            self.users.move_to_end(key)
+
+        recent = state[0]
+        recent.append((now, channel_id, message_id))
+        if now < state[1]:
+            # Still flooding: extend the flag and catch each new message
+            state[1] = now + self.rate_window
+            self.flagged['rate'] += 1
+            return SpamVerdict('rate', guild_id, user_id, [(channel_id, message_id)], False)
+        if len(recent) > self.rate_limit and now - recent[0][0] < self.rate_window:
+            state[1] = now + self.rate_window
+            self.flagged['rate'] += 1
+            return SpamVerdict('rate', guild_id, user_id, [(c, m) for _, c, m in recent], True)
+        return None
+
+    @staticmethod
+    def _expire(table, window, cap, now):
+        # Entries are in first-seen order, so expired ones are always at the front
+        cutoff = now - window
+        while table:
+            oldest = next(iter(table.values()))
+            if oldest[0] >= cutoff and len(table) < cap:
+                break
+            table.popitem(last=False)
+
+    def _check_duplicate(self, guild_id, channel_id, user_id, message_id, content, now):
+        if len(content) < self.min_duplicate_length:
+            return None
+        digest, length = fingerprint(content)
+        if length < self.min_duplicate_length:
+            return None
+
+        table, crowds = self.fingerprints, self.crowds
+        if now >= self._next_sweep or len(table) >= self.max_fingerprints or len(crowds) >= self.max_fingerprints:
+            self._next_sweep = now + 1.0
+            self._expire(table, self.duplicate_window, self.max_fingerprints, now)
+            self._expire(crowds, self.crowd_window, self.max_fingerprints, now)
+
+        key = (guild_id, user_id, digest)
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [now, 1, [(channel_id, message_id)], False]
+        else:
+            entry[1] += 1
+            if entry[3]:
+                self.flagged['duplicate'] += 1
+                return SpamVerdict('duplicate', guild_id, user_id, [(channel_id, message_id)], False)
+            entry[2].append((channel_id, message_id))
+            if entry[1] > self.duplicate_limit:
+                entry[3] = True
+                self.flagged['duplicate'] += 1
+                return SpamVerdict('duplicate', guild_id, user_id, entry[2], True)
+
+        return self._check_crowd(guild_id, channel_id, user_id, message_id, digest, now)
+
+    def _check_crowd(self, guild_id, channel_id, user_id, message_id, digest, now):
+        key = (guild_id, digest)
+        entry = self.crowds.get(key)
+        if entry is None:
+            self.crowds[key] = [now, {user_id: [(channel_id, message_id)]}, False]
+            return None
+
+        posters = entry[1]
+        joined = user_id not in posters
+        posted = posters.setdefault(user_id, [])
+        if entry[2]:
+            # Already flagged: each later copy goes, and a newcomer to the wave is acted on too
+            self.flagged['crowd'] += 1
+            return SpamVerdict('crowd', guild_id, user_id, [(channel_id, message_id)], joined)
+        posted.append((channel_id, message_id))
+        if len(posters) > self.crowd_limit:
+            entry[2] = True
+            self.flagged['crowd'] += 1
+            messages = [message for posts in posters.values() for message in posts]
+            return SpamVerdict('crowd', guild_id, user_id, messages, True, members=list(posters))
+        return None
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'flagged': dict(self.flagged),
+            'tracked_users': len(self.users),
+            'tracked_fingerprints': len(self.fingerprints),
+            'tracked_crowds': len(self.crowds),
+        }
+
+
+class SpamEnforcer:
+    """Applies the configured actions to a SpamVerdict"""
+
+    def __init__(self, actions=('delete', 'alert'), timeout_seconds=300, alert_channel='mod-log'):
+        self.actions = set(actions)
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self.alert_channel = alert_channel
+        self._last_alert = OrderedDict()
+
+    async def enforce(self, message, verdict):
+        guild = message.guild
+        me = guild.me
+
+        if 'delete' in self.actions:
+            await self._delete(guild, verdict.messages)
+
+        if 'timeout' in self.actions and verdict.first and me.guild_permissions.moderate_members:
+            for member_id in verdict.members:
+                member = guild.get_member(member_id)
+                if member is None or member.top_role >= me.top_role:
+                    continue
+                try:
+                    await member.timeout(self.timeout, reason=f"Anti-spam: {verdict.reason}")
+                except discord.HTTPException as e:
+                    logger.warning(f"🛡️ Could not time out {member}: {e}")
+
+        if 'alert' in self.actions:
+            await self._alert(message, verdict)
+
+    async def _delete(self, guild, messages):
+        by_channel = {}
+        for channel_id, message_id in messages:
+            by_channel.setdefault(channel_id, []).append(message_id)
+
+        for channel_id, message_ids in by_channel.items():
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel is None or not channel.permissions_for(guild.me).manage_messages:
+                continue
+            # Bulk delete takes at most 100 messages per call
+            for start in range(0, len(message_ids), 100):
+                chunk = message_ids[start:start + 100]
+                try:
+                    if len(chunk) == 1:
+                        await channel.get_partial_message(chunk[0]).delete()
+                    else:
+                        await channel.delete_messages([discord.Object(id=message_id) for message_id in chunk])
+                except discord.HTTPException as e:
+                    logger.warning(f"🛡️ Could not delete spam in #{channel}: {e}")
+
+    async def _alert(self, message, verdict):
+        key = (verdict.guild_id, verdict.user_id)
+        now = time.monotonic()
+        if now - self._last_alert.get(key, 0) < ALERT_COOLDOWN:
+            return
+        self._last_alert[key] = now
+        self._last_alert.move_to_end(key)
+        if len(self._last_alert) > 10000:
+            self._last_alert.popitem(last=False)
+
+        description = {
+            'rate': "is sending messages too fast",
+            'duplicate': "keeps posting the same message",
+            'crowd': "is posting a message that many members are copy-pasting",
+        }[verdict.reason]
+        logger.warning(f"🛡️ Anti-spam ({verdict.reason}): {message.author} in {message.guild.name} #{message.channel}")
+
+        channel = discord.utils.get(message.guild.text_channels, name=self.alert_channel)
+        if channel is None or not channel.permissions_for(message.guild.me).send_messages:
+            return
+        embed = discord.Embed(
+            title="🛡️ Anti-spam",
+            description=f"{message.author.mention} {description} in {message.channel.mention}.",
+            color=discord.Color.red(),
+            timestamp=message.created_at
+        )
+        embed.add_field(name="📝 Sample", value=discord.utils.escape_markdown(message.content[:500]) or "(empty)", inline=False)
+        embed.add_field(name="⚙️ Actions", value=", ".join(sorted(self.actions)), inline=True)
+        embed.add_field(name="🧹 Messages", value=len(verdict.messages), inline=True)
+        if len(verdict.members) > 1:
+            embed.add_field(name="👥 Members", value=truncate(" ".join(f"<@{member_id}>" for member_id in verdict.members), 1024), inline=False)
+        await channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Audit Log Sink
+Buffers moderation events per guild and posts them to a mod-log channel as packed
+embeds on a size or time trigger, with an optional JSONL mirror on disk.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+import discord
+
+from utils.pagination import EMBED_DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT, truncate
+
+logger = logging.getLogger(__name__)
+
+LINE_LIMIT = 300
+EMBEDS_PER_MESSAGE = 10
+# Room kept for the title and the dropped-events footer
+MESSAGE_CHARS = EMBED_TOTAL_LIMIT - 300
+MESSAGES_PER_FLUSH = 3       # Per guild per tick, so one busy guild can't starve the rest
+TICK = 1.0
+
+
+class AuditLogSink:
+    """Per-guild event buffers drained by one background task.
+
+    log() never blocks or awaits: it appends to a bounded buffer and returns.
+    A guild's buffer is flushed once it holds a message's worth of text or
+    its oldest event is `flush_interval` seconds old. Each flush sends at
+    most a few messages through the RouteLimiter; anything left waits for
+    the next tick. When sending can't keep up, the buffer fills and new
+    events are dropped and counted, and the count is reported in the next
+    message that does get through. The JSONL mirror, when enabled, receives
+    every event, including ones dropped from the channel.
+    """
+
+    def __init__(self, client, limiter, channel_name='mod-log', flush_interval=5.0, max_buffer=500, mirror_dir=None):
+        self.client = client
+        self.limiter = limiter
+        self.channel_name = channel_name
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.mirror_dir = mirror_dir
+        self.buffers = {}      # guild -> deque of formatted lines
+        self.sizes = Counter()  # guild -> buffered characters
+        self.oldest = {}       # guild -> monotonic time of the oldest unsent line
+        self.dropped = Counter()  # guild -> events dropped since the last message
+        self.channels = {}     # guild -> mod-log channel id
+        self.mirror = []       # (guild, record) waiting to be written
+        self.logged = 0
+        self.sent = 0
+        self.dropped_total = 0
+        self.undeliverable = 0
+        self.mirror_dropped = 0
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def log(self, guild_id, kind, line, **data):
+        """Queue one event; `line` is what the channel shows, `data` extra fields for the mirror"""
+        now = time.time()
+        self.logged += 1
+        if self.mirror_dir:
+            if len(self.mirror) < self.max_buffer * 10:
+                self.mirror.append((guild_id, {'time': now, 'kind': kind, 'line': line, **data}))
+            else:
+                self.mirror_dropped += 1
+
+        buffer = self.buffers.get(guild_id)
+        if buffer is None:
+            buffer = self.buffers[guild_id] = deque()
+        if len(buffer) >= self.max_buffer:
+            self.dropped[guild_id] += 1
+            self.dropped_total += 1
+            return
+
+        line = f"<t:{int(now)}:T> {truncate(' '.join(line.split()), LINE_LIMIT)}"
+        if not buffer:
+            self.oldest[guild_id] = time.monotonic()
+        buffer.append(line)
+        self.sizes[guild_id] += len(line) + 1
+        if self.sizes[guild_id] >= MESSAGE_CHARS:
+            self._wake.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_mirror()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self.flush(guild_id, limit=None) for guild_id in list(self.buffers))), timeout=5
+            )
+        except asyncio.TimeoutError:
+            logger.warning("📋 Audit log buffers not fully flushed before shutdown")
+
+    def metrics(self):
+        return {
+            'logged': self.logged,
+            'messages_sent': self.sent,
+            'buffered': sum(len(buffer) for buffer in self.buffers.values()),
+            'dropped': self.dropped_total,
+            'undeliverable': self.undeliverable,
+            'mirror_pending': len(self.mirror),
+            'mirror_dropped': self.mirror_dropped,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=TICK)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                now = time.monotonic()
+                for guild_id, buffer in list(self.buffers.items()):
+                    if buffer and (self.sizes[guild_id] >= MESSAGE_CHARS or now - self.oldest[guild_id] >= self.flush_interval):
+                        await self.flush(guild_id)
+                await self.flush_mirror()
+            except Exception:
+                logger.exception("📋 Audit log flush failed")
+
+    def _channel(self, guild_id):
+        guild = self.client.get_guild(guild_id)
+        if guild is None:
+            return None
+        channel = guild.get_channel(self.channels.get(guild_id, 0))
+        if channel is None:
+            channel = discord.utils.get(guild.text_channels, name=self.channel_name)
+            if channel is None:
+                return None
+            self.channels[guild_id] = channel.id
+        permissions = channel.permissions_for(guild.me)
+        return channel if permissions.send_messages and permissions.embed_links else None
+
+    def _pack(self, guild_id):
+        """Pop as many lines as fit in one message and turn them into embeds"""
+        buffer = self.buffers[guild_id]
+        embeds, lines, chunk, total = [], [], 0, 0
+        while buffer and len(embeds) < EMBEDS_PER_MESSAGE:
+            size = len(buffer[0]) + 1
+            if total + size > MESSAGE_CHARS:
+                break
+            if chunk + size > EMBED_DESCRIPTION_LIMIT:
+                embeds.append(discord.Embed(description="\n".join(lines), color=discord.Color.dark_grey()))
+                lines, chunk = [], 0
+                continue
+            lines.append(buffer.popleft())
+            chunk += size
+            total += size
+            self.sizes[guild_id] -= size
+        if lines and len(embeds) < EMBEDS_PER_MESSAGE:
+            embeds.append(discord.Embed(description="\n".join(lines), color=discord.Color.dark_grey()))
+        return embeds
+
+    async def flush(self, guild_id, limit=MESSAGES_PER_FLUSH):
+        """Send up to `limit` messages of a guild's buffered events"""
+        buffer = self.buffers.get(guild_id)
+        channel = self._channel(guild_id)
+        if channel is None:
+            # No mod-log channel (or no access): the mirror still has everything
+            if buffer:
+                self.undeliverable += len(buffer)
+                buffer.clear()
+            self.sizes.pop(guild_id, None)
+            return
+
+        sent = 0
+        while buffer and (limit is None or sent < limit):
+            embeds = self._pack(guild_id)
+            count = sum(embed.description.count("\n") + 1 for embed in embeds)
+            embeds[0].title = f"📋 Audit log • {count} events"
+            dropped = self.dropped.pop(guild_id, 0)
+            if dropped:
+                embeds[-1].set_footer(text=f"⚠️ {dropped} events dropped while the log was backed up")
+            embeds[-1].timestamp = datetime.now(timezone.utc)
+            try:
+                await self.limiter.call(('messages', channel.id), channel.send, embeds=embeds)
+            except discord.HTTPException as e:
+                logger.warning(f"📋 Could not post audit log to #{channel} in {channel.guild.name}: {e}")
+                self.undeliverable += count
+                break
+            sent += 1
+            self.sent += 1
+        # Whatever is left is already due, so it goes out on the next tick
+        self.oldest[guild_id] = time.monotonic() - self.flush_interval
+
+    def _write_mirror(self, records):
+        files = {}
+        for guild_id, record in records:
+            day = datetime.fromtimestamp(record['time'], timezone.utc).strftime('%Y-%m-%d')
+            files.setdefault((guild_id, day), []).append(json.dumps(record, default=str, separators=(',', ':')))
+        for (guild_id, day), lines in files.items():
+            directory = os.path.join(self.mirror_dir, str(guild_id))
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"{day}.jsonl"), 'a') as f:
+                f.write("\n".join(lines) + "\n")
+
+    async def flush_mirror(self):
+        if not self.mirror:
+            return
+        records, self.mirror = self.mirror, []
+        await asyncio.to_thread(self._write_mirror, records)
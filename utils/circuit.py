@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+REST Circuit Breaker
+Tracks Discord REST failures per route and overall, and while a circuit is open fails
+requests fast or holds them until a probe request shows Discord has recovered.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+MAX_COOLDOWN = 120.0
+GLOBAL = '*'
+
+# Never held back: interaction replies have a hard deadline and moderation must not wait on a breaker
+PASS_ROUTES = {
+    ('DELETE', '/channels/{channel_id}/messages/{message_id}'),
+    ('POST', '/channels/{channel_id}/messages/bulk-delete'),
+    ('PUT', '/channels/{channel_id}/permissions/{target}'),
+    ('DELETE', '/channels/{channel_id}/permissions/{target}'),
+    ('PUT', '/guilds/{guild_id}/bans/{user_id}'),
+    ('DELETE', '/guilds/{guild_id}/bans/{user_id}'),
+    ('PATCH', '/guilds/{guild_id}/members/{user_id}'),
+    ('DELETE', '/guilds/{guild_id}/members/{user_id}'),
+    ('PATCH', '/guilds/{guild_id}'),
+}
+PASS_PREFIXES = ('/interactions/', '/webhooks/')
+
+
+def route_policy(route):
+    """'pass' (always sent), 'fail' (fails fast while open) or 'queue' (waits for recovery)"""
+    if (route.method, route.path) in PASS_ROUTES or route.path.startswith(PASS_PREFIXES):
+        return 'pass'
+    # Reads and typing indicators are worthless once late
+    if route.method == 'GET' or route.path.endswith('/typing'):
+        return 'fail'
+    return 'queue'
+
+
+class CircuitOpen(discord.HTTPException):
+    """Raised instead of sending a request while its circuit is open.
+
+    Subclasses HTTPException (as a 503) so existing `except discord.HTTPException`
+    handlers treat it like any other failed request.
+    """
+
+    def __init__(self, key, retry_after):
+        self.response = None
+        self.status = 503
+        self.code = 0
+        self.key = key
+        self.retry_after = retry_after
+        self.text = f"REST circuit open for {key}, next probe in {retry_after:.0f}s"
+        Exception.__init__(self, self.text)
+
+
+def is_outage(error):
+    """Whether a REST error says Discord (or the network) is in trouble, rather than the request"""
+    if isinstance(error, (discord.DiscordServerError, discord.RateLimited, aiohttp.ClientError, OSError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, discord.HTTPException) and error.status == 429
+
+
+class Breaker:
+    """One circuit: closed, open for a cooldown, then half-open until one probe succeeds.
+
+    Outcomes from the last `window` seconds are kept; the circuit opens once
+    it has seen `min_failures` failures making up at least `threshold` of the
+    requests. Each consecutive trip doubles the cooldown (up to MAX_COOLDOWN),
+    and a 429's Retry-After is honoured when it is longer.
+    """
+
+    def __init__(self, key, threshold=0.5, min_failures=5, window=30.0, cooldown=5.0):
+        self.key = key
+        self.threshold = threshold
+        self.min_failures = min_failures
+        self.window = window
+        self.base_cooldown = cooldown
+        self.outcomes = deque()  # (monotonic time, failed)
+        self.failures = 0
+        self.opened_at = None
+        self.cooldown = 0.0
+        self.trips = 0
+        self.probing = False
+
+    def _prune(self, now):
+        outcomes = self.outcomes
+        while outcomes and now - outcomes[0][0] > self.window:
+            if outcomes.popleft()[1]:
+                self.failures -= 1
+
+    def state(self, now=None):
+        if self.opened_at is None:
+            return 'closed'
+        now = time.monotonic() if now is None else now
+        return 'half_open' if now >= self.opened_at + self.cooldown else 'open'
+
+    def retry_in(self, now=None):
+        if self.opened_at is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.opened_at + self.cooldown - now)
+
+    def record(self, failed, retry_after=None, now=None):
+        """Fold in one outcome; returns True if this outcome opened the circuit"""
+        now = time.monotonic() if now is None else now
+        self.outcomes.append((now, failed))
+        self.failures += failed
+        self._prune(now)
+        if self.opened_at is not None or not failed:
+            return False
+        if self.failures >= self.min_failures and self.failures >= self.threshold * len(self.outcomes):
+            self.trip(retry_after, now)
+            return True
+        return False
+
+    def trip(self, retry_after=None, now=None):
+        self.trips += 1
+        self.cooldown = min(MAX_COOLDOWN, self.base_cooldown * 2 ** (self.trips - 1))
+        if retry_after:
+            self.cooldown = max(self.cooldown, retry_after)
+        self.opened_at = time.monotonic() if now is None else now
+        self.probing = False
+
+    def close(self):
+        self.opened_at = None
+        self.trips = 0
+        self.probing = False
+        self.outcomes.clear()
+        self.failures = 0
+
+
+class RestCircuitBreaker:
+    """Wraps an HTTPClient's request() with a global circuit and one circuit per route template.
+
+    A request is sent when every circuit it belongs to is closed. When one is
+    half-open the request becomes that circuit's probe; its outcome closes the
+    circuit or re-opens it with a longer cooldown. Otherwise the route's
+    policy applies: 'pass' routes go out anyway, 'fail' routes raise
+    CircuitOpen at once, and 'queue' routes wait (at most `queue_timeout`
+    seconds, `max_waiting` at a time) for the circuit to recover.
+    """
+
+    def __init__(self, threshold=0.5, min_failures=5, window=30.0, cooldown=5.0, queue_timeout=30.0, max_waiting=200):
+        self.settings = {'threshold': threshold, 'min_failures': min_failures, 'window': window, 'cooldown': cooldown}
+        self.queue_timeout = queue_timeout
+        self.max_waiting = max_waiting
+        # The whole API failing is a bigger sample than one route failing
+        self.global_breaker = Breaker(GLOBAL, **{**self.settings, 'min_failures': min_failures * 2})
+        self.routes = {}
+        self.waiting = 0
+        self.counts = Counter()
+        self._changed = asyncio.Event()
+        self._http = None
+        self._original = None
+
+    def install(self, http):
+        """Route every request of a discord.py HTTPClient through the breaker"""
+        if self._http is not None:
+            return
+        self._http = http
+        self._original = http.request
+
+        async def request(route, **kwargs):
+            return await self.call(route, self._original, route, **kwargs)
+
+        request.__wrapped__ = self._original
+        http.request = request
+
+    def uninstall(self):
+        if self._http is None:
+            return
+        self._http.request = self._original
+        self._http = None
+
+    def _breaker(self, key):
+        breaker = self.routes.get(key)
+        if breaker is None:
+            breaker = self.routes[key] = Breaker(key, **self.settings)
+        return breaker
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _admit(self, breakers, now):
+        """The breakers this request probes, or the one blocking it"""
+        probes = []
+        for breaker in breakers:
+            state = breaker.state(now)
+            if state == 'open' or (state == 'half_open' and breaker.probing):
+                return None, breaker
+            if state == 'half_open':
+                probes.append(breaker)
+        for breaker in probes:
+            breaker.probing = True
+        return probes, None
+
+    async def call(self, route, func, *args, **kwargs):
+        breakers = (self.global_breaker, self._breaker(route.key))
+        policy = route_policy(route)
+        probes = []
+        deadline = None
+        while policy != 'pass':
+            now = time.monotonic()
+            probes, blocking = self._admit(breakers, now)
+            if blocking is None:
+                break
+            retry_in = blocking.retry_in(now)
+            if policy == 'fail' or self.waiting >= self.max_waiting:
+                self.counts['rejected'] += 1
+                raise CircuitOpen(blocking.key, retry_in)
+            if deadline is None:
+                deadline = now + self.queue_timeout
+                self.counts['queued'] += 1
+            if now >= deadline:
+                self.counts['expired'] += 1
+                raise CircuitOpen(blocking.key, retry_in)
+            # Wake when a circuit changes state or this one is due a probe, whichever is first
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._changed.wait(), max(0.05, min(retry_in or 0.5, deadline - now)))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self.waiting -= 1
+
+        self.counts['requests'] += 1
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._outcome(breakers, probes, e)
+            raise
+        except BaseException:
+            # Cancelled: says nothing about Discord, so just hand the probe back
+            for breaker in probes:
+                breaker.probing = False
+            raise
+        self._outcome(breakers, probes, None)
+        return result
+
+    def _outcome(self, breakers, probes, error):
+        failed = error is not None and is_outage(error)
+        if not failed:
+            for breaker in probes:
+                breaker.close()
+                logger.info(f"🔌 REST circuit {breaker.key} closed again")
+            if probes:
+                self._notify()
+            for breaker in breakers:
+                breaker.record(False)
+            return
+
+        self.counts['failures'] += 1
+        retry_after = getattr(error, 'retry_after', None)
+        if isinstance(error, discord.HTTPException) and error.response is not None:
+            retry_after = float(error.response.headers.get('Retry-After', 0)) or None
+        for breaker in breakers:
+            if breaker in probes:
+                breaker.trip(retry_after)
+                logger.warning(f"🔌 REST probe for {breaker.key} failed ({error}); next try in {breaker.cooldown:.0f}s")
+            elif breaker.record(True, retry_after):
+                self.counts['trips'] += 1
+                logger.warning(
+                    f"🔌 REST circuit {breaker.key} opened after {breaker.failures} failures "
+                    f"in {breaker.window:.0f}s ({error}); retrying in {breaker.cooldown:.0f}s"
+                )
+
+    def open_circuits(self):
+        """{key: seconds until the next probe} for every circuit that isn't closed.
+
+        Called from the health server thread while the bot loop may be adding
+        routes, so it walks a snapshot (list() copies the dict in one step).
+        """
+        now = time.monotonic()
+        breakers = [self.global_breaker, *list(self.routes.values())]
+        return {
+            breaker.key: round(breaker.retry_in(now), 1)
+            for breaker in breakers if breaker.state(now) != 'closed'
+        }
+
+    def global_rate_limited(self):
+        """Whether discord.py is currently waiting out a global 429"""
+        event = getattr(self._http, '_global_over', None)
+        return isinstance(event, asyncio.Event) and not event.is_set()
+
+    def health(self):
+        open_circuits = self.open_circuits()
+        return {
+            'state': self.global_breaker.state() if GLOBAL in open_circuits else 'degraded' if open_circuits else 'closed',
+            'open': open_circuits,
+            'global_rate_limited': self.global_rate_limited(),
+            'waiting': self.waiting,
+        }
+
+    def metrics(self):
+        return {
+            **self.health(),
+            **{name: self.counts[name] for name in ('requests', 'failures', 'trips', 'queued', 'rejected', 'expired')},
+            'routes': len(self.routes),
+        }
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Command Admission Queue
+Sits between argument parsing and the command callback: caps how many commands run
+at once overall, per guild and per command, and queues the rest by priority class.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first when commands are queued
+PRIORITIES = {'moderation': 0, 'info': 1, 'fun': 2}
+DEFAULT_PRIORITY = 'info'
+
+# How long a command may wait for a slot before it is dropped, per class
+DEADLINES = {'moderation': 30.0, 'info': 10.0, 'fun': 5.0}
+
+LAG_PROBE_INTERVAL = 0.25
+WAIT_SAMPLES = 256
+
+
+class CommandRejected(commands.CommandError):
+    """Raised from the before-invoke hook when a command is not admitted.
+
+    `reason` is 'shed' (dropped while the event loop was lagging), 'deadline'
+    (waited longer than its class allows) or 'full' (the queue is full).
+    """
+
+    def __init__(self, command, reason):
+        self.command = command
+        self.reason = reason
+        super().__init__(f"{command} not run: {reason}")
+
+
+def command_priority(command):
+    """The priority class from `extras={'priority': ...}` on the command or its parent group"""
+    while command is not None:
+        priority = command.extras.get('priority')
+        if priority in PRIORITIES:
+            return priority
+        command = command.parent
+    return DEFAULT_PRIORITY
+
+
+class _Waiter:
+    __slots__ = ('token', 'key', 'guild_id', 'limit', 'future', 'queued_at')
+
+    def __init__(self, token, key, guild_id, limit):
+        self.token = token
+        self.key = key
+        self.guild_id = guild_id
+        self.limit = limit
+        self.future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class CommandQueue:
+    """Admission control for command invocations.
+
+    A command starts at once when the global, per-guild and per-command caps
+    allow it and nothing of the same or a higher class is waiting. Otherwise
+    it joins its class's FIFO; each release grants waiters in class order,
+    skipping ones still blocked by their own command or guild cap, so one
+    saturated command doesn't hold up the rest. A background probe measures
+    event loop lag, and while it is over `shed_lag` queued fun commands are
+    dropped and new ones that would have to wait are refused.
+    """
+
+    def __init__(self, max_running=50, guild_limit=5, max_queued=500, shed_lag=0.25, deadlines=DEADLINES):
+        self.max_running = max_running
+        self.guild_limit = guild_limit
+        self.max_queued = max_queued
+        self.shed_lag = shed_lag
+        self.deadlines = deadlines
+        self.holders = {}          # token -> (command key, guild id) for running commands
+        self.by_command = Counter()
+        self.by_guild = Counter()
+        self.queues = {name: deque() for name in PRIORITIES}
+        self.lag = 0.0
+        self.admitted = Counter()  # per class
+        self.queued = Counter()    # per class, commands that had to wait
+        self.rejected = Counter()  # per reason
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self._task = None
+
+    @property
+    def lagging(self):
+        return self.lag > self.shed_lag
+
+    def queue_length(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def _allowed(self, key, guild_id, limit):
+        return (
+            len(self.holders) < self.max_running
+            and (limit is None or self.by_command[key] < limit)
+            and (guild_id is None or self.by_guild[guild_id] < self.guild_limit)
+        )
+
+    def _hold(self, token, key, guild_id):
+        self.holders[token] = (key, guild_id)
+        self.by_command[key] += 1
+        if guild_id is not None:
+            self.by_guild[guild_id] += 1
+
+    async def acquire(self, token, key, guild_id=None, priority=DEFAULT_PRIORITY, limit=None, on_wait=None):
+        """Wait for a slot for `token` (released with release(token)).
+
+        `on_wait` is awaited once if the command has to queue; hybrid
+        commands use it to defer the interaction before Discord's 3s window
+        closes. Raises CommandRejected when the command won't run.
+        """
+        ahead = any(self.queues[name] for name in PRIORITIES if PRIORITIES[name] <= PRIORITIES[priority])
+        if not ahead and self._allowed(key, guild_id, limit):
+            self._hold(token, key, guild_id)
+            self.admitted[priority] += 1
+            return
+
+        # Whatever is queued ahead may be blocked by its own caps, so let dispatch decide
+        waiter = _Waiter(token, key, guild_id, limit)
+        self.queues[priority].append(waiter)
+        self._dispatch()
+        if self._granted(waiter):
+            self.admitted[priority] += 1
+            return
+
+        reason = 'shed' if priority == 'fun' and self.lagging else 'full' if self.queue_length() > self.max_queued else None
+        if reason:
+            self._discard(priority, waiter)
+            self.rejected[reason] += 1
+            raise CommandRejected(key, reason)
+
+        self.queued[priority] += 1
+        try:
+            if on_wait is not None:
+                await on_wait()
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.deadlines[priority])
+        except asyncio.TimeoutError:
+            if not self._granted(waiter):
+                self._discard(priority, waiter)
+                self.rejected['deadline'] += 1
+                raise CommandRejected(key, 'deadline')
+        except BaseException:
+            # Cancelled (or on_wait failed) while queued: give back a slot we may have just been handed
+            self._discard(priority, waiter)
+            if self._granted(waiter):
+                self.release(token)
+            raise
+        self.waits.append(time.monotonic() - waiter.queued_at)
+        self.admitted[priority] += 1
+
+    @staticmethod
+    def _granted(waiter):
+        return waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None
+
+    def _discard(self, priority, waiter):
+        try:
+            self.queues[priority].remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, token):
+        """Free the slot held by `token`; a no-op if it holds none"""
+        held = self.holders.pop(token, None)
+        if held is None:
+            return
+        key, guild_id = held
+        self.by_command[key] -= 1
+        if not self.by_command[key]:
+            del self.by_command[key]
+        if guild_id is not None:
+            self.by_guild[guild_id] -= 1
+            if not self.by_guild[guild_id]:
+                del self.by_guild[guild_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to waiters, highest class first"""
+        for name in PRIORITIES:
+            queue = self.queues[name]
+            for waiter in list(queue):
+                if len(self.holders) >= self.max_running:
+                    return
+                if waiter.future.done():
+                    queue.remove(waiter)
+                elif self._allowed(waiter.key, waiter.guild_id, waiter.limit):
+                    queue.remove(waiter)
+                    self._hold(waiter.token, waiter.key, waiter.guild_id)
+                    waiter.future.set_result(None)
+
+    def shed(self, priority='fun'):
+        """Drop every queued command of one class"""
+        queue = self.queues[priority]
+        while queue:
+            waiter = queue.popleft()
+            if not waiter.future.done():
+                waiter.future.set_exception(CommandRejected(waiter.key, 'shed'))
+                self.rejected['shed'] += 1
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self):
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            lag = time.monotonic() - before - LAG_PROBE_INTERVAL
+            # Rise at once, decay by half each probe, so one slow callback doesn't shed for long
+            self.lag = max(lag, self.lag / 2)
+            if self.lagging and self.queues['fun']:
+                logger.warning(f"🚦 Event loop {self.lag * 1000:.0f}ms behind, dropping {len(self.queues['fun'])} queued fun commands")
+                self.shed('fun')
+
+    def metrics(self):
+        waits = sorted(self.waits)
+        return {
+            'running': len(self.holders),
+            'max_running': self.max_running,
+            'queued': {name: len(queue) for name, queue in self.queues.items()},
+            'admitted': dict(self.admitted),
+            'waited': dict(self.queued),
+            'rejected': dict(self.rejected),
+            'wait_ms': {
+                'p50': round(waits[len(waits) // 2] * 1000, 1),
+                'p95': round(waits[int(len(waits) * 0.95)] * 1000, 1),
+                'max': round(waits[-1] * 1000, 1),
+            } if waits else None,
+            'busiest_commands': dict(self.by_command.most_common(5)),
+            'loop_lag_ms': round(self.lag * 1000, 1),
+            'shedding': self.lagging,
+        }
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Dice Expression Engine
+Parses and rolls standard dice notation (4d6kh3+2, 1000d20, 2d10!, (1d8+3)*2)
+and computes outcome distributions for !roll stats.
+
+Hard limits on expression length, dice count, sides and explosions bound the
+CPU a single expression can use; stats fall back to bounded sampling when an
+exact distribution would be too expensive.
+"""
+
+import math
+import random
+import re
+from collections import Counter
+from functools import lru_cache
+from heapq import nlargest, nsmallest
+from itertools import combinations_with_replacement
+
+MAX_EXPRESSION_LENGTH = 100
+MAX_TERMS = 20
+MAX_DICE = 10000          # Dice rolled per expression, before explosions
+MAX_SIDES = 1000
+MAX_EXPLOSIONS = 1000     # Extra dice added by exploding, per expression
+MAX_SHOWN_ROLLS = 30      # Individual rolls listed per term in the breakdown
+
+# Work budgets for !roll stats
+MAX_EXACT_OUTCOMES = 250000   # Enumerated outcomes times per-outcome work, for exact distributions
+MAX_SAMPLE_ROLLS = 2000000    # Die rolls spent on sampling when exact is too expensive
+MAX_SAMPLES = 20000
+
+TOKEN = re.compile(r"\s*(?:(\d+)|(kh|kl|dh|dl|k|d|!|%|[-+*/()]))")
+
+
+class DiceError(ValueError):
+    """Raised for invalid or over-limit dice expressions"""
+
+
+# -- Parsing -----------------------------------------------------------------
+
+def _tokenize(text):
+    text = text.strip().lower()
+    if not text:
+        raise DiceError("Empty dice expression")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise DiceError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if not match:
+            if text[position:].strip():
+                raise DiceError(f"Unexpected '{text[position:].strip()[0]}' in dice expression")
+            break
+        number, symbol = match.groups()
+        tokens.append(int(number) if number is not None else symbol)
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a small tuple-based AST.
+
+    Nodes: ('num', n), ('dice', count, sides, keep, explode), ('neg', node),
+    ('op', symbol, left, right). keep is None or (mode, n) with mode in kh/kl/dh/dl.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+        self.terms = 0
+        self.dice = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def parse(self):
+        node = self.expression()
+        if self.peek() is not None:
+            raise DiceError(f"Unexpected '{self.peek()}' in dice expression")
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in ('+', '-'):
+            node = ('op', self.take(), node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in ('*', '/'):
+            node = ('op', self.take(), node, self.factor())
+        return node
+
+    def factor(self):
+        if self.peek() == '-':
+            self.take()
+            return ('neg', self.factor())
+        if self.peek() == '(':
+            self.take()
+            node = self.expression()
+            if self.take() != ')':
+                raise DiceError("Missing closing parenthesis")
+            return node
+        return self.atom()
+
+    def atom(self):
+        self.terms += 1
+        if self.terms > MAX_TERMS:
+            raise DiceError(f"More than {MAX_TERMS} terms in one expression")
+
+        count = self.take() if isinstance(self.peek(), int) else None
+        if self.peek() != 'd':
+            if count is None:
+                raise DiceError(f"Expected a number or dice, got '{self.peek() or 'end of input'}'")
+            return ('num', count)
+
+        self.take()
+        count = 1 if count is None else count
+        if self.peek() == '%':
+            self.take()
+            sides = 100
+        elif isinstance(self.peek(), int):
+            sides = self.take()
+        else:
+            raise DiceError("Dice need a number of sides, e.g. d20")
+
+        if not 1 <= count <= MAX_DICE:
+            raise DiceError(f"Dice count must be between 1 and {MAX_DICE}")
+        if not 2 <= sides <= MAX_SIDES:
+            raise DiceError(f"Dice must have between 2 and {MAX_SIDES} sides")
+        self.dice += count
+        if self.dice > MAX_DICE:
+            raise DiceError(f"At most {MAX_DICE} dice per expression")
+
+        keep = None
+        explode = False
+        while self.peek() in ('kh', 'kl', 'k', 'dh', 'dl', '!'):
+            modifier = self.take()
+            if modifier == '!':
+                explode = True
+                continue
+            amount = self.take() if isinstance(self.peek(), int) else 1
+            mode = 'kh' if modifier == 'k' else modifier
+            if keep is not None:
+                raise DiceError("Only one keep/drop modifier per dice term")
+            if not 0 < amount <= count:
+                raise DiceError(f"Can't {'keep' if mode[0] == 'k' else 'drop'} {amount} of {count} dice")
+            keep = (mode, amount)
+        return ('dice', count, sides, keep, explode)
+
+
+@lru_cache(maxsize=512)
+def parse(expression):
+    """Parse a dice expression into an AST (cached per expression string)"""
+    return _Parser(_tokenize(expression)).parse()
+
+
+def normalize(expression):
+    """Canonical spelling of an expression, for display and cache keys"""
+    return describe(parse(expression))
+
+
+def describe(node, precedence=0):
+    kind = node[0]
+    if kind == 'num':
+        return str(node[1])
+    if kind == 'neg':
+        return f"-{describe(node[1], 3)}"
+    if kind == 'op':
+        _, symbol, left, right = node
+        own = 1 if symbol in '+-' else 2
+        # Right operands of - and / need brackets at equal precedence: a-(b-c)
+        text = f"{describe(left, own)}{symbol}{describe(right, own + 1)}"
+        return f"({text})" if own < precedence else text
+    _, count, sides, keep, explode = node
+    text = f"{count}d{sides}{'!' if explode else ''}"
+    if keep:
+        text += f"{keep[0]}{keep[1]}"
+    return text
+
+
+# -- Rolling -----------------------------------------------------------------
+
+def _kept_indices(rolls, keep):
+    """Indices of the rolls that count toward the total"""
+    if keep is None:
+        return range(len(rolls))
+    mode, amount = keep
+    indexed = range(len(rolls))
+    key = rolls.__getitem__
+    if mode == 'kh':
+        return nlargest(amount, indexed, key=key)
+    if mode == 'kl':
+        return nsmallest(amount, indexed, key=key)
+    if mode == 'dh':
+        return nsmallest(len(rolls) - amount, indexed, key=key)
+    return nlargest(len(rolls) - amount, indexed, key=key)
+
+
+class Roller:
+    """Evaluates parsed expressions, enforcing the per-expression explosion budget"""
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.explosions = 0
+        self.details = []
+
+    def roll_dice(self, count, sides, explode):
+        # One C-level call rolls the whole batch
+        rolls = self.rng.choices(range(1, sides + 1), k=count)
+        if explode:
+            pending = rolls.count(sides)
+            while pending:
+                self.explosions += pending
+                if self.explosions > MAX_EXPLOSIONS:
+                    raise DiceError(f"More than {MAX_EXPLOSIONS} exploding dice in one expression")
+                extra = self.rng.choices(range(1, sides + 1), k=pending)
+                rolls.extend(extra)
+                pending = extra.count(sides)
+        return rolls
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == 'num':
+            return node[1]
+        if kind == 'neg':
+            return -self.evaluate(node[1])
+        if kind == 'op':
+            _, symbol, left, right = node
+            a, b = self.evaluate(left), self.evaluate(right)
+            if symbol == '+':
+                return a + b
+            if symbol == '-':
+                return a - b
+            if symbol == '*':
+                return a * b
+            if b == 0:
+                raise DiceError("Division by zero")
+            return a // b
+
+        _, count, sides, keep, explode = node
+        rolls = self.roll_dice(count, sides, explode)
+        kept = _kept_indices(rolls, keep)
+        total = sum(rolls[i] for i in kept)
+        self.details.append((describe(node), rolls, set(kept) if keep else None, total))
+        return total
+
+
+def roll(expression, rng=None):
+    """Roll an expression; returns (total, [(term, rolls, kept_indices_or_None, subtotal), ...])"""
+    roller = Roller(rng)
+    total = roller.evaluate(parse(expression))
+    return total, roller.details
+
+
+def format_rolls(rolls, kept):
+    """'[6, 4, ~~1~~]' style listing, abbreviated for large batches"""
+    shown = [
+        str(value) if kept is None or index in kept else f"~~{value}~~"
+        for index, value in enumerate(rolls[:MAX_SHOWN_ROLLS])
+    ]
+    if len(rolls) > MAX_SHOWN_ROLLS:
+        shown.append(f"… {len(rolls) - MAX_SHOWN_ROLLS} more")
+    return "[" + ", ".join(shown) + "]"
+
+
+# -- Distributions -----------------------------------------------------------
+
+def _convolve(a, b, combine):
+    result = Counter()
+    for x, px in a.items():
+        for y, py in b.items():
+            result[combine(x, y)] += px * py
+    return result
+
+
+def _multinomial(counts):
+    total = math.factorial(sum(counts))
+    for count in counts:
+        total //= math.factorial(count)
+    return total
+
+
+def _dice_distribution(count, sides, keep):
+    """Exact outcome probabilities for one dice term without explosions"""
+    if keep is None:
+        # Repeated squaring of the single-die distribution
+        single = {face: 1 / sides for face in range(1, sides + 1)}
+        result, power, remaining = {0: 1.0}, single, count
+        while remaining:
+            if remaining & 1:
+                result = _convolve(result, power, int.__add__)
+            remaining >>= 1
+            if remaining:
+                power = _convolve(power, power, int.__add__)
+        return dict(result)
+
+    # Keep/drop: enumerate sorted outcomes (multisets) weighted by their multinomial count
+    mode, amount = keep
+    kept = amount if mode in ('kh', 'kl') else count - amount
+    highest = mode in ('kh', 'dl')
+    result = Counter()
+    total = sides ** count
+    for outcome in combinations_with_replacement(range(1, sides + 1), count):
+        chosen = outcome[-kept:] if highest else outcome[:kept]
+        result[sum(chosen)] += _multinomial(Counter(outcome).values()) / total
+    return dict(result)
+
+
+def _exact_cost(node):
+    """Rough work an exact computation would take (outcomes times per-outcome cost), or None if unsupported"""
+    kind = node[0]
+    if kind == 'num':
+        return 1
+    if kind == 'neg':
+        return _exact_cost(node[1])
+    if kind == 'op':
+        left, right = _exact_cost(node[2]), _exact_cost(node[3])
+        if left is None or right is None:
+            return None
+        return left * right + left + right
+    _, count, sides, keep, explode = node
+    if explode:
+        return None
+    if keep is None:
+        support = count * (sides - 1) + 1
+        return support * support
+    # Each multiset costs O(count) to sort, slice and weight with factorials
+    return math.comb(count + sides - 1, count) * count
+
+
+def _exact(node):
+    kind = node[0]
+    if kind == 'num':
+        return {node[1]: 1.0}
+    if kind == 'neg':
+        return {-value: p for value, p in _exact(node[1]).items()}
+    if kind == 'op':
+        _, symbol, left, right = node
+        a, b = _exact(left), _exact(right)
+        if symbol == '/' and 0 in b:
+            raise DiceError("Division by zero")
+        combine = {'+': int.__add__, '-': int.__sub__, '*': int.__mul__, '/': int.__floordiv__}[symbol]
+        return dict(_convolve(a, b, combine))
+    _, count, sides, keep, _ = node
+    return _dice_distribution(count, sides, keep)
+
+
+def _dice_count(node):
+    kind = node[0]
+    if kind == 'dice':
+        return node[1] * (2 if node[4] else 1)
+    if kind == 'neg':
+        return _dice_count(node[1])
+    if kind == 'op':
+        return _dice_count(node[2]) + _dice_count(node[3])
+    return 0
+
+
+@lru_cache(maxsize=256)
+def distribution_stats(expression, seed=None):
+    """Mean, spread and percentiles of an expression's outcomes.
+
+    Exact when the number of enumerated outcomes fits MAX_EXACT_OUTCOMES,
+    otherwise estimated from at most MAX_SAMPLE_ROLLS die rolls. Pure and
+    picklable, so it can run in a worker process; results are cached.
+    """
+    node = parse(expression)
+    cost = _exact_cost(node)
+
+    if cost is not None and cost <= MAX_EXACT_OUTCOMES:
+        probabilities = sorted(_exact(node).items())
+        method = "exact"
+    else:
+        samples = max(100, min(MAX_SAMPLES, MAX_SAMPLE_ROLLS // max(_dice_count(node), 1)))
+        rng = random.Random(seed)
+        counts = Counter()
+        for _ in range(samples):
+            counts[Roller(rng).evaluate(node)] += 1
+        probabilities = sorted((value, count / samples) for value, count in counts.items())
+        method = f"sampled ({samples:,} rolls)"
+
+    mean = sum(value * p for value, p in probabilities)
+    variance = sum((value - mean) ** 2 * p for value, p in probabilities)
+
+    points = {}
+    cumulative = 0.0
+    targets = iter((5, 25, 50, 75, 95))
+    target = next(targets)
+    for value, p in probabilities:
+        cumulative += p
+        while target is not None and cumulative >= target / 100 - 1e-12:
+            points[f"p{target}"] = value
+            target = next(targets, None)
+
+    return {
+        'expression': describe(node),
+        'method': method,
+        'min': probabilities[0][0],
+        'max': probabilities[-1][0],
+        'mean': round(mean, 3),
+        'stdev': round(math.sqrt(variance), 3),
+        'percentiles': points,
+        'histogram': _histogram(probabilities),
+    }
+
+
+def _histogram(probabilities, buckets=16):
+    """Probability mass in equal-width buckets, for a text sparkline"""
+    low, high = probabilities[0][0], probabilities[-1][0]
+    width = max(1, math.ceil((high - low + 1) / buckets))
+    mass = [0.0] * math.ceil((high - low + 1) / width)
+    for value, p in probabilities:
+        mass[min((value - low) // width, len(mass) - 1)] += p
+    return mass
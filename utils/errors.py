@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Error Aggregation
+Fingerprints command errors by type and stack, limits user-facing replies to one per
+fingerprint, channel and window, and reports counts in batches to the log and to
+optional Sentry-compatible sinks (sentry-sdk, or JSONL event files on disk).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 8           # Innermost frames that make up a fingerprint
+MAX_FINGERPRINTS = 1000   # Least recently seen are forgotten beyond this
+
+_sentry = None
+
+
+def root_cause(error):
+    """Unwrap CommandInvokeError / HybridCommandError down to what was actually raised"""
+    while getattr(error, 'original', None) is not None:
+        error = error.original
+    return error
+
+
+def fingerprint(error):
+    """Stable id for 'the same bug': exception type plus the innermost frames.
+
+    Line numbers are left out so an unrelated edit above doesn't split a
+    group; the source text of each frame stands in for them.
+    """
+    frames = traceback.extract_tb(error.__traceback__)[-STACK_DEPTH:]
+    parts = [f"{type(error).__module__}.{type(error).__qualname__}"]
+    parts += [f"{os.path.basename(frame.filename)}:{frame.name}:{(frame.line or '').strip()}" for frame in frames]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def init_sentry(dsn, environment=None):
+    """Set up sentry-sdk once per process; None when it isn't installed"""
+    global _sentry
+    if _sentry is None:
+        try:
+            import sentry_sdk
+            from sentry_sdk.integrations.logging import LoggingIntegration
+        except ImportError:
+            logger.warning("⚠️ SENTRY_DSN is set but sentry-sdk is not installed; error reports stay in the log")
+            return None
+        # Our own batched reports are the events; don't also turn every ERROR log line into one
+        sentry_sdk.init(dsn=dsn, environment=environment, integrations=[LoggingIntegration(level=None, event_level=None)])
+        _sentry = sentry_sdk
+    return _sentry
+
+
+def sentry_event(report, window, environment=None, tags=None):
+    """A Sentry event payload for one fingerprint's occurrences in a window"""
+    error = report.error
+    return {
+        'event_id': uuid.uuid4().hex,
+        'timestamp': datetime.fromtimestamp(report.last_seen, timezone.utc).isoformat(),
+        'platform': 'python',
+        'level': 'error',
+        'environment': environment,
+        'fingerprint': [report.fingerprint],
+        'tags': {**(tags or {}), 'command': report.command},
+        'extra': {'occurrences': report.count, 'channels': len(report.channels), 'window_seconds': window},
+        'exception': {'values': [{
+            'type': type(error).__name__,
+            'module': type(error).__module__,
+            'value': str(error),
+            'stacktrace': {'frames': [
+                {'filename': frame.filename, 'function': frame.name, 'lineno': frame.lineno, 'context_line': frame.line}
+                for frame in traceback.extract_tb(error.__traceback__)
+            ]},
+        }]},
+    }
+
+
+class ErrorReport:
+    """One fingerprint: totals since it was first seen, plus the current window"""
+
+    __slots__ = ('fingerprint', 'error', 'command', 'first_seen', 'last_seen', 'total', 'count', 'channels', 'logged')
+
+    def __init__(self, key, error, command, now):
+        self.fingerprint = key
+        self.error = error
+        self.command = command
+        self.first_seen = self.last_seen = now
+        self.total = 0
+        self.count = 0
+        self.channels = set()
+        self.logged = 0  # Occurrences of this window already written to the log
+
+
+class ErrorAggregator:
+    """Counts errors per fingerprint in fixed windows and reports them once per window.
+
+    record() is cheap and never awaits. The first time a fingerprint is seen
+    it is logged right away with its traceback; after that, occurrences are
+    only counted, and every `window` seconds one summary line per active
+    fingerprint goes to the log and one event to each configured sink.
+    """
+
+    def __init__(self, window=60.0, sentry_dsn=None, report_dir=None, environment=None, tags=None):
+        self.window = window
+        self.environment = environment
+        self.tags = tags or {}
+        self.report_dir = report_dir
+        self.sentry = init_sentry(sentry_dsn, environment) if sentry_dsn else None
+        self.reports = {}  # fingerprint -> ErrorReport, least recently seen first
+        self.replied = {}  # (fingerprint, channel id) -> window number of the last reply
+        self.recorded = 0
+        self.replies = 0
+        self.suppressed = 0
+        self.flushed = 0
+        self._task = None
+
+    def _window_number(self, now):
+        return int(now // self.window)
+
+    def record(self, error, command=None, channel_id=None):
+        """Count one error; returns (fingerprint, whether to reply in this channel)"""
+        error = root_cause(error)
+        now = time.time()
+        key = fingerprint(error)
+        report = self.reports.pop(key, None)
+        if report is None:
+            report = ErrorReport(key, error, command, now)
+            if len(self.reports) >= MAX_FINGERPRINTS:
+                self.reports.pop(next(iter(self.reports)))
+            logger.error(
+                f"❌ Command error in {command or 'event'} [{key}]: {type(error).__name__}: {error}",
+                exc_info=(type(error), error, error.__traceback__)
+            )
+            report.logged = 1
+        self.reports[key] = report
+        report.error = error
+        report.last_seen = now
+        report.total += 1
+        report.count += 1
+        if channel_id is not None:
+            report.channels.add(channel_id)
+        self.recorded += 1
+
+        if channel_id is None:
+            return key, False
+        window = self._window_number(now)
+        if self.replied.get((key, channel_id)) == window:
+            self.suppressed += 1
+            return key, False
+        self.replied[(key, channel_id)] = window
+        self.replies += 1
+        return key, True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and report whatever the current window holds"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window - time.time() % self.window)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("⚠️ Error report flush failed")
+
+    async def flush(self):
+        """Report every fingerprint seen in this window, then start a new window"""
+        active = [report for report in self.reports.values() if report.count]
+        current = self._window_number(time.time())
+        self.replied = {key: window for key, window in self.replied.items() if window >= current}
+        if not active:
+            return
+
+        events = []
+        for report in active:
+            if report.count > report.logged:
+                error = report.error
+                logger.warning(
+                    f"⚠️ {type(error).__name__} in {report.command or 'event'} [{report.fingerprint}] "
+                    f"×{report.count} within {self.window:.0f}s across {len(report.channels)} channels "
+                    f"({report.total} since first seen): {error}"
+                )
+            if self.sentry is not None:
+                self._capture(report)
+            if self.report_dir:
+                events.append(sentry_event(report, self.window, self.environment, self.tags))
+            report.count = report.logged = 0
+            report.channels = set()
+            # The traceback pins every frame's locals (contexts, messages); it has been reported now
+            report.error.__traceback__ = None
+            self.flushed += 1
+        if events:
+            await asyncio.to_thread(self._write_events, events)
+
+    def _capture(self, report):
+        with self.sentry.push_scope() as scope:
+            scope.fingerprint = [report.fingerprint]
+            for name, value in {**self.tags, 'command': report.command}.items():
+                scope.set_tag(name, value)
+            scope.set_extra('occurrences', report.count)
+            scope.set_extra('channels', len(report.channels))
+            self.sentry.capture_exception(report.error)
+
+    def _write_events(self, events):
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.jsonl")
+        with open(path, 'a') as f:
+            f.write("\n".join(json.dumps(event, default=str, separators=(',', ':')) for event in events) + "\n")
+
+    def metrics(self):
+        top = sorted((report for report in self.reports.values() if report.count), key=lambda report: -report.count)[:5]
+        return {
+            'recorded': self.recorded,
+            'fingerprints': len(self.reports),
+            'replies': self.replies,
+            'replies_suppressed': self.suppressed,
+            'reports': self.flushed,
+            'sinks': [name for name, on in (('sentry', self.sentry), ('local', self.report_dir)) if on],
+            'current_window': {
+                report.fingerprint: {'error': type(report.error).__name__, 'command': report.command, 'count': report.count}
+                for report in top
+            },
+        }
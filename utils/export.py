@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Channel History Export
+Streams channel history to gzip-compressed JSONL, one page at a time, with a
+checkpoint per channel so an interrupted export resumes where it stopped.
+
+Each page is written as its own gzip member, so files stay readable with
+gzip.open() (or zcat) and can be cut back to the last checkpoint after a crash.
+
+Usage:
+    python3 -m utils.export --guild 123456789012345678 --out data/exports
+    python3 -m utils.export --channel 234567890123456789 --channel 345678901234567890
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+
+import discord
+
+from utils.ratelimit import RouteLimiter
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100  # Discord's maximum for GET /channels/{id}/messages
+TEXT_CHANNEL_TYPES = (0, 5)  # Text and announcement channels
+
+
+def _append(path, blob):
+    """Append bytes durably; returns the new file size"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def _truncate(path, size):
+    """Drop anything written after the last checkpoint"""
+    try:
+        if os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+    except FileNotFoundError:
+        pass
+
+
+class ExportCheckpoint:
+    """Last exported message id, file size and count per channel, saved atomically"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = asyncio.Lock()
+        try:
+            with open(path) as f:
+                self.channels = json.load(f)
+        except (OSError, ValueError):
+            self.channels = {}
+
+    def get(self, channel_id):
+        return self.channels.get(str(channel_id), {})
+
+    def update(self, channel_id, **fields):
+        self.channels.setdefault(str(channel_id), {}).update(fields)
+
+    def _write(self, blob):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    async def save(self):
+        async with self._lock:
+            await asyncio.to_thread(self._write, json.dumps(self.channels, indent=1))
+
+
+class HistoryExporter:
+    """Exports many channels concurrently, paced by a RouteLimiter.
+
+    Only one page per channel is in memory at a time. `http` is a
+    discord.py HTTPClient (client.http); messages are written as the raw
+    API payloads.
+    """
+
+    def __init__(self, http, out_dir, limiter=None, on_progress=None):
+        self.http = http
+        self.out_dir = out_dir
+        self.limiter = limiter or RouteLimiter()
+        self.on_progress = on_progress
+        self.checkpoint = ExportCheckpoint(os.path.join(out_dir, 'checkpoint.json'))
+        self.exported = 0
+
+    def path_for(self, guild_id, channel_id):
+        return os.path.join(self.out_dir, str(guild_id), f"{channel_id}.jsonl.gz")
+
+    async def export_channel(self, guild_id, channel_id, name=None):
+        """Export everything after the channel's checkpoint; returns a summary dict"""
+        path = self.path_for(guild_id, channel_id)
+        state = self.checkpoint.get(channel_id)
+        after = state.get('last_id', 0)
+        size = state.get('bytes', 0)
+        total = state.get('count', 0)
+        result = {'channel_id': channel_id, 'name': name, 'exported': 0, 'error': None}
+
+        try:
+            await asyncio.to_thread(_truncate, path, size)
+            while True:
+                page = await self.limiter.call(
+                    ('messages', channel_id), self.http.logs_from, channel_id, PAGE_SIZE, after=after
+                )
+                if not page:
+                    break
+
+                page.sort(key=lambda message: int(message['id']))
+                lines = b"".join(json.dumps(message, separators=(',', ':')).encode() + b"\n" for message in page)
+                size = await asyncio.to_thread(_append, path, gzip.compress(lines))
+
+                after = int(page[-1]['id'])
+                total += len(page)
+                result['exported'] += len(page)
+                self.exported += len(page)
+                self.checkpoint.update(
+                    channel_id, guild_id=guild_id, name=name, last_id=after, bytes=size, count=total
+                )
+                await self.checkpoint.save()
+
+                if self.on_progress:
+                    await self.on_progress(self)
+                if len(page) < PAGE_SIZE:
+                    break
+
+            self.checkpoint.update(channel_id, completed_at=time.time())
+            await self.checkpoint.save()
+        except discord.HTTPException as e:
+            result['error'] = f"{e.status} {e.text or type(e).__name__}"
+            logger.warning(f"📦 Export of channel {channel_id} stopped: {result['error']}")
+        except Exception as e:
+            # Disk full, network errors, timeouts: end this channel, not every export running beside it
+            result['error'] = f"{type(e).__name__}: {e}"
+            logger.warning(f"📦 Export of channel {channel_id} stopped: {result['error']}", exc_info=True)
+
+        result.update(total=total, bytes=size, path=path)
+        return result
+
+    async def export(self, channels):
+        """Export (guild_id, channel_id, name) entries concurrently"""
+        return await asyncio.gather(*(
+            self.export_channel(guild_id, channel_id, name) for guild_id, channel_id, name in channels
+        ))
+
+
+def read_export(path):
+    """Iterate the messages of one exported channel file"""
+    with gzip.open(path, 'rt') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+async def run_cli(args):
+    client = discord.Client(intents=discord.Intents.none())
+    await client.login(args.token)
+    try:
+        channels = [(args.guild, channel_id, None) for channel_id in args.channel]
+        if args.guild and not args.channel:
+            channels = [
+                (args.guild, int(channel['id']), channel['name'])
+                for channel in await client.http.get_all_guild_channels(args.guild)
+                if channel['type'] in TEXT_CHANNEL_TYPES
+            ]
+        elif not args.guild:
+            resolved = []
+            for channel_id in args.channel:
+                channel = await client.http.get_channel(channel_id)
+                resolved.append((int(channel.get('guild_id') or 0), channel_id, channel.get('name')))
+            channels = resolved
+
+        reported = [0]
+
+        async def progress(exporter):
+            if exporter.exported - reported[0] >= 1000:
+                reported[0] = exporter.exported
+                print(f"📦 {exporter.exported} messages exported...")
+
+        limiter = RouteLimiter(rate=args.rate, concurrency=args.concurrency)
+        exporter = HistoryExporter(client.http, args.out, limiter, on_progress=progress)
+        started = time.perf_counter()
+        results = await exporter.export(channels)
+    finally:
+        await client.close()
+
+    print("\n" + "="*50)
+    print("📦 EXPORT REPORT")
+    print("="*50)
+    for result in results:
+        icon = "❌" if result['error'] else "✅"
+        print(f"{icon} #{result['name'] or result['channel_id']}: +{result['exported']} "
+              f"({result['total']} total, {result['bytes'] / 1024:.0f}KB)"
+              + (f" - {result['error']}" if result['error'] else ""))
+    print(f"⏱️ {sum(r['exported'] for r in results)} messages in {time.perf_counter() - started:.1f}s "
+          f"• {limiter.rate_limited} rate limits hit")
+    print("="*50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export channel history to gzip JSONL (resumable)")
+    parser.add_argument('--guild', type=int, help="export every text channel of this guild")
+    parser.add_argument('--channel', type=int, action='append', default=[], help="channel id (repeatable)")
+    parser.add_argument('--out', default=os.path.join(os.getenv('BOT_DATA_DIR', 'data'), 'exports'))
+    parser.add_argument('--concurrency', type=int, default=4, help="requests in flight at once")
+    parser.add_argument('--rate', type=float, default=10, help="requests per second across all channels")
+    parser.add_argument('--token', default=os.getenv('DISCORD_TOKEN'))
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("set DISCORD_TOKEN or pass --token")
+    if not args.guild and not args.channel:
+        parser.error("pass --guild and/or --channel")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(run_cli(args))
+
+
+if __name__ == "__main__":
+    main()
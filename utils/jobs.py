@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Worker Pool Jobs
+Pure-Python, CPU-heavy functions meant to be run through utils.workers.WorkerPool.
+
+Everything here takes and returns plain data (ints, strings, tuples, dicts) so it
+can cross the process boundary; use the snapshot helpers to reduce Discord objects.
+"""
+
+ADMINISTRATOR = 1 << 3
+VIEW_CHANNEL = 1 << 10
+SEND_MESSAGES = 1 << 11
+ALL_PERMISSIONS = (1 << 53) - 1
+
+# Permissions worth flagging when granted broadly
+DANGEROUS_PERMISSIONS = {
+    'administrator': 1 << 3,
+    'ban_members': 1 << 2,
+    'kick_members': 1 << 1,
+    'manage_channels': 1 << 4,
+    'manage_guild': 1 << 5,
+    'manage_messages': 1 << 13,
+    'mention_everyone': 1 << 17,
+    'manage_roles': 1 << 28,
+    'manage_webhooks': 1 << 29,
+    'moderate_members': 1 << 40,
+}
+
+
+def snapshot_guild_permissions(guild):
+    """Reduce a discord.Guild to the plain data permission_audit() needs"""
+    import discord  # Only needed on the bot side; workers never import discord
+
+    roles = [(role.id, role.name, role.permissions.value, role.managed) for role in guild.roles]
+    channels = []
+    for channel in guild.channels:
+        overwrites = []
+        for target, overwrite in channel.overwrites.items():
+            allow, deny = overwrite.pair()
+            overwrites.append((target.id, isinstance(target, discord.Role), allow.value, deny.value))
+        channels.append((channel.id, channel.name, overwrites))
+    return guild.id, roles, channels
+
+
+def effective_role_permissions(guild_id, role_permissions, role_id, overwrites):
+    """Channel permissions for one role (plus @everyone), per Discord's overwrite order"""
+    everyone = role_permissions.get(guild_id, 0)
+    base = everyone | role_permissions.get(role_id, 0)
+    if base & ADMINISTRATOR:
+        return ALL_PERMISSIONS
+
+    by_target = {target_id: (allow, deny) for target_id, is_role, allow, deny in overwrites if is_role}
+    if guild_id in by_target:
+        allow, deny = by_target[guild_id]
+        base = (base & ~deny) | allow
+    if role_id != guild_id and role_id in by_target:
+        allow, deny = by_target[role_id]
+        base = (base & ~deny) | allow
+    return base
+
+
+def permission_audit(guild_id, roles, channels):
+    """Audit role permissions across every channel of a guild.
+
+    Returns the roles holding dangerous guild-wide permissions and, for each
+    hidden channel (@everyone cannot view it), the roles that can still see it.
+    """
+    role_permissions = {role_id: permissions for role_id, _, permissions, _ in roles}
+    role_names = {role_id: name for role_id, name, _, _ in roles}
+
+    dangerous_roles = []
+    for role_id, name, permissions, managed in roles:
+        flagged = [flag for flag, bit in DANGEROUS_PERMISSIONS.items() if permissions & bit]
+        if flagged:
+            dangerous_roles.append({'role': name, 'managed': managed, 'permissions': flagged})
+
+    hidden_channels = []
+    for channel_id, channel_name, overwrites in channels:
+        everyone = effective_role_permissions(guild_id, role_permissions, guild_id, overwrites)
+        if everyone & VIEW_CHANNEL:
+            continue
+        viewers = [
+            role_names[role_id] for role_id in role_permissions
+            if role_id != guild_id
+            and effective_role_permissions(guild_id, role_permissions, role_id, overwrites) & VIEW_CHANNEL
+        ]
+        members = sum(1 for target_id, is_role, allow, _ in overwrites if not is_role and allow & VIEW_CHANNEL)
+        hidden_channels.append({
+            'channel': channel_name,
+            'id': channel_id,
+            'roles': viewers,
+            'member_overwrites': members,
+        })
+
+    return {'dangerous_roles': dangerous_roles, 'hidden_channels': hidden_channels}
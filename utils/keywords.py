@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Keyword Triggers
+Per-guild autoresponses and banned phrases, compiled into one Aho-Corasick
+automaton per guild so each message is scanned once however many patterns exist.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+import discord
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('respond', 'block')
+MAX_PATTERN_LENGTH = 100
+RESPONSE_COOLDOWN = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triggers (
+    guild_id INTEGER NOT NULL,
+    pattern TEXT NOT NULL,
+    action TEXT NOT NULL,
+    response TEXT,
+    created_by INTEGER,
+    created REAL NOT NULL,
+    PRIMARY KEY (guild_id, pattern)
+);
+"""
+
+
+def normalize(text):
+    """Casefold and collapse whitespace, so patterns and messages compare alike"""
+    return " ".join(text.casefold().split())
+
+
+class Trigger:
+    __slots__ = ('pattern', 'action', 'response')
+
+    def __init__(self, pattern, action, response=None):
+        self.pattern = pattern
+        self.action = action
+        self.response = response
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over normalized patterns, matched on word boundaries.
+
+    Adding a pattern only extends the trie and forgets the failure links;
+    they are then recomputed lazily, node by node, as messages walk the trie,
+    so an edit never stalls the event loop with a full rebuild. Removed
+    patterns are left in the trie as dead ids and dropped by a full rebuild
+    once they outnumber the live ones.
+    """
+
+    def __init__(self, triggers=()):
+        self._reset()
+        for trigger in triggers:
+            self.add(trigger)
+
+    def _reset(self):
+        self.goto = [{}]         # node -> {char: child node}
+        self.parent = [0]
+        self.char = ['']         # node -> char on the edge from its parent
+        self.ends = [()]         # node -> ids of patterns ending exactly here
+        self.fail = [0]          # node -> longest proper suffix node, None until linked
+        self.out = [()]          # node -> ids ending here or at any suffix, None until linked
+        self.triggers = []       # id -> Trigger, or None once removed
+        self.ids = {}            # pattern -> id
+        self.dead = 0
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, trigger):
+        """Insert or replace a trigger; its pattern must already be normalized"""
+        existing = self.ids.get(trigger.pattern)
+        if existing is not None:
+            self.triggers[existing] = trigger
+            return
+
+        node = 0
+        goto = self.goto
+        for char in trigger.pattern:
+            child = goto[node].get(char)
+            if child is None:
+                child = goto[node][char] = len(goto)
+                goto.append({})
+                self.parent.append(node)
+                self.char.append(char)
+                self.ends.append(())
+            node = child
+
+        pattern_id = len(self.triggers)
+        self.triggers.append(trigger)
+        self.ids[trigger.pattern] = pattern_id
+        self.ends[node] += (pattern_id,)
+        self.dirty = True
+
+    def remove(self, pattern):
+        pattern_id = self.ids.pop(pattern, None)
+        if pattern_id is None:
+            return False
+        self.triggers[pattern_id] = None
+        self.dead += 1
+        if self.dead > len(self.ids):
+            live = [trigger for trigger in self.triggers if trigger is not None]
+            self._reset()
+            for trigger in live:
+                self.add(trigger)
+        return True
+
+    def _unlink(self):
+        """Forget every failure link; new nodes can change the links of old ones"""
+        count = len(self.goto)
+        self.fail = [None] * count
+        self.out = [None] * count
+        self.fail[0], self.out[0] = 0, ()
+        self.dirty = False
+
+    def _link(self, node):
+        """Compute one node's failure link and outputs; returns the link"""
+        parent, char = self.parent[node], self.char[node]
+        target = 0
+        if parent:
+            goto, fail = self.goto, self.fail
+            state = fail[parent]
+            if state is None:
+                state = self._link(parent)
+            while state and char not in goto[state]:
+                state = fail[state] if fail[state] is not None else self._link(state)
+            target = goto[state].get(char, 0)
+        # Every node consulted above is shallower than this one, so recursion depth is bounded by the pattern length
+        outputs = self.out[target]
+        if outputs is None:
+            self._link(target)
+            outputs = self.out[target]
+        self.fail[node] = target
+        self.out[node] = self.ends[node] + outputs if outputs else self.ends[node]
+        return target
+
+    def build(self):
+        """Link every node now instead of on demand"""
+        self._unlink()
+        for node in range(1, len(self.goto)):
+            if self.fail[node] is None:
+                self._link(node)
+
+    def search(self, text):
+        """Triggers whose pattern appears in `text` as whole words, in order of appearance"""
+        if self.dirty:
+            self._unlink()
+        text = normalize(text)
+        goto, fail, out, triggers, link = self.goto, self.fail, self.out, self.triggers, self._link
+        found = []
+        seen = set()
+        node = 0
+
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node] if fail[node] is not None else link(node)
+            node = goto[node].get(char, 0)
+            matches = out[node]
+            if matches is None:
+                link(node)
+                matches = out[node]
+            if not matches:
+                continue
+
+            after = position + 1
+            for pattern_id in matches:
+                trigger = triggers[pattern_id]
+                if trigger is None or pattern_id in seen:
+                    continue
+                start = after - len(trigger.pattern)
+                # Whole words only, so "ass" never fires inside "class"
+                if (start and text[start - 1].isalnum()) or (after < len(text) and text[after].isalnum()):
+                    continue
+                seen.add(pattern_id)
+                found.append(trigger)
+        return found
+
+    def size(self):
+        return {
+            'patterns': len(self.ids),
+            'nodes': len(self.goto),
+            'dead': self.dead,
+            'linked': len(self.fail) - self.fail.count(None),
+        }
+
+
+class KeywordEngine:
+    """Triggers for every guild, stored in SQLite and compiled per guild on first use"""
+
+    def __init__(self, path, max_triggers=10000):
+        self.path = path
+        self.max_triggers = max_triggers
+        self.automata = {}
+        self.matched = 0
+        self.scanned = 0
+        self.scan_seconds = 0.0
+        self._last_response = {}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        # Guilds without triggers are skipped without touching the cache
+        self.guilds = {row[0] for row in self.db.execute("SELECT DISTINCT guild_id FROM triggers")}
+
+    def close(self):
+        self.db.close()
+
+    def automaton(self, guild_id):
+        automaton = self.automata.get(guild_id)
+        if automaton is None:
+            rows = self.db.execute(
+                "SELECT pattern, action, response FROM triggers WHERE guild_id = ?", (guild_id,)
+            ).fetchall()
+            automaton = self.automata[guild_id] = KeywordAutomaton(Trigger(*row) for row in rows)
+        return automaton
+
+    def count(self, guild_id):
+        return len(self.automaton(guild_id)) if guild_id in self.guilds else 0
+
+    def add(self, guild_id, pattern, action, response=None, created_by=None):
+        """Store a trigger and add it to the guild's automaton; returns the normalized pattern"""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}")
+        pattern = normalize(pattern)
+        if not pattern or len(pattern) > MAX_PATTERN_LENGTH:
+            raise ValueError(f"Patterns must be 1-{MAX_PATTERN_LENGTH} characters")
+        automaton = self.automaton(guild_id)
+        if pattern not in automaton.ids and len(automaton) >= self.max_triggers:
+            raise ValueError(f"This server already has {self.max_triggers} triggers")
+
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO triggers (guild_id, pattern, action, response, created_by, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, pattern, action, response, created_by, time.time())
+            )
+        automaton.add(Trigger(pattern, action, response))
+        self.guilds.add(guild_id)
+        return pattern
+
+    def remove(self, guild_id, pattern):
+        pattern = normalize(pattern)
+        with self.db:
+            removed = self.db.execute(
+                "DELETE FROM triggers WHERE guild_id = ? AND pattern = ?", (guild_id, pattern)
+            ).rowcount > 0
+        if removed:
+            automaton = self.automaton(guild_id)
+            automaton.remove(pattern)
+            if not len(automaton):
+                self.guilds.discard(guild_id)
+                self.automata.pop(guild_id, None)
+        return removed
+
+    def triggers(self, guild_id):
+        """Every trigger of a guild, alphabetically"""
+        rows = self.db.execute(
+            "SELECT pattern, action, response FROM triggers WHERE guild_id = ? ORDER BY pattern", (guild_id,)
+        )
+        return [Trigger(*row) for row in rows]
+
+    def match(self, guild_id, text):
+        if guild_id not in self.guilds or not text:
+            return []
+        started = time.perf_counter()
+        found = self.automaton(guild_id).search(text)
+        self.scan_seconds += time.perf_counter() - started
+        self.scanned += 1
+        self.matched += bool(found)
+        return found
+
+    async def dispatch(self, message):
+        """Act on a guild message's triggers; returns True if the message was blocked"""
+        found = self.match(message.guild.id, message.content)
+        if not found:
+            return False
+
+        blocked = next((trigger for trigger in found if trigger.action == 'block'), None)
+        if blocked is not None:
+            exempt = getattr(message.author, 'guild_permissions', discord.Permissions.none()).manage_messages
+            if not exempt and message.channel.permissions_for(message.guild.me).manage_messages:
+                try:
+                    await message.delete()
+                except discord.NotFound:
+                    pass
+                await message.channel.send(
+                    f"🚫 {message.author.mention}, that message contained a blocked phrase.",
+                    delete_after=5, allowed_mentions=discord.AllowedMentions(users=True)
+                )
+                logger.info(f"🚫 Blocked \"{blocked.pattern}\" from {message.author} in {message.guild.name} #{message.channel}")
+                return True
+
+        respond = next((trigger for trigger in found if trigger.action == 'respond'), None)
+        if respond is not None:
+            key = (message.channel.id, respond.pattern)
+            now = time.monotonic()
+            if now - self._last_response.get(key, 0) >= RESPONSE_COOLDOWN:
+                self._last_response[key] = now
+                if len(self._last_response) > 10000:
+                    self._last_response = {k: v for k, v in self._last_response.items() if now - v < RESPONSE_COOLDOWN}
+                await message.channel.send(respond.response, allowed_mentions=discord.AllowedMentions.none())
+        return False
+
+    def metrics(self):
+        return {
+            'guilds': len(self.guilds),
+            'compiled': len(self.automata),
+            'scanned': self.scanned,
+            'matched': self.matched,
+            'avg_scan_us': round(self.scan_seconds / self.scanned * 1e6, 1) if self.scanned else 0,
+        }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Latency Tracking
+Keeps heartbeat, REST round-trip and command end-to-end samples in fixed-size
+ring buffers and reports rolling percentiles over several windows.
+"""
+
+import logging
+import math
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Rolling windows reported by ping, status and /health
+WINDOWS = {'1m': 60, '15m': 15 * 60, '1h': 60 * 60}
+
+SERIES = ('heartbeat', 'rest', 'command')
+
+# Same threshold the health checks use for "High latency"
+DEFAULT_WARNING_MS = 500
+
+
+class RingBuffer:
+    """Fixed-size (timestamp, value) samples stored in flat arrays"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+
+    def add(self, value, now=None):
+        self.timestamps[self.head] = time.time() if now is None else now
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self.head - 1) % self.capacity]
+
+    def since(self, cutoff):
+        """Values recorded at or after `cutoff`, newest first"""
+        index = self.head
+        for _ in range(self.count):
+            index = (index - 1) % self.capacity
+            if self.timestamps[index] < cutoff:
+                break
+            yield self.values[index]
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Nearest-rank percentiles of a list of values"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {f"p{point}": ordered[min(last, math.ceil(point / 100 * len(ordered)) - 1)] for point in points}
+
+
+def format_latency(seconds):
+    """'42.1ms' for a latency in seconds; 'n/a' before the first heartbeat ACK (when discord.py reports inf)"""
+    if seconds is None or not math.isfinite(seconds):
+        return "n/a"
+    return f"{round(seconds * 1000, 1)}ms"
+
+
+class LatencyTracker:
+    """Rolling latency history for the bot.
+
+    Each series keeps at most `capacity` samples, so a busy series reports
+    over the samples it still holds when a window is longer than the buffer.
+    """
+
+    def __init__(self, capacity=4096, warning_ms=DEFAULT_WARNING_MS, warn_interval=60.0):
+        self.series = {name: RingBuffer(capacity) for name in SERIES}
+        self.warning_ms = warning_ms
+        self.warn_interval = warn_interval
+        self._last_warning = {}
+
+    def record(self, series, seconds, now=None):
+        """Record one latency sample, in seconds"""
+        if seconds is None or not math.isfinite(seconds) or seconds < 0:
+            return
+        milliseconds = seconds * 1000
+        self.series[series].add(milliseconds, now)
+        self._check_threshold(series, milliseconds, now)
+
+    def latest(self, series):
+        return self.series[series].latest()
+
+    def window(self, series, seconds, now=None):
+        """count and p50/p95/p99 (in ms) for the last `seconds` of a series"""
+        now = time.time() if now is None else now
+        values = list(self.series[series].since(now - seconds))
+        stats = {'count': len(values)}
+        stats.update({key: round(value, 1) for key, value in percentiles(values).items()})
+        return stats
+
+    def report(self, now=None):
+        """Percentiles for every series over every window"""
+        now = time.time() if now is None else now
+        return {
+            series: {label: self.window(series, seconds, now) for label, seconds in WINDOWS.items()}
+            for series in self.series
+        }
+
+    def summary(self, series, now=None):
+        """One line like 'p50 42ms • p95 80ms • p99 120ms' over each window"""
+        lines = []
+        for label, seconds in WINDOWS.items():
+            stats = self.window(series, seconds, now)
+            if stats['count']:
+                lines.append(f"{label}: {stats['p50']:.0f}/{stats['p95']:.0f}/{stats['p99']:.0f}ms")
+        return "\n".join(lines) or "No samples yet"
+
+    def _check_threshold(self, series, milliseconds, now):
+        if milliseconds < self.warning_ms:
+            return
+        now = time.time() if now is None else now
+        if now - self._last_warning.get(series, 0) < self.warn_interval:
+            return
+        self._last_warning[series] = now
+        stats = self.window(series, WINDOWS['1m'], now)
+        logger.warning(
+            f"⚠️ High {series} latency: {milliseconds:.0f}ms "
+            f"(threshold {self.warning_ms}ms, 1m p95 {stats.get('p95', 0):.0f}ms over {stats['count']} samples)"
+        )
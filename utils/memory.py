@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Memory Introspection
+Reports process RSS, tracemalloc top allocators and the sizes of discord.py's
+internal caches, and diffs snapshots taken over time.
+"""
+
+import os
+import time
+import tracemalloc
+from collections import Counter, deque
+
+CACHE_KEYS = ('members', 'channels', 'roles', 'emojis', 'messages')
+
+
+def rss_bytes():
+    """Resident set size of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cache_sizes(client):
+    """Entry counts of the client's caches, in total and per guild"""
+    messages = Counter(
+        message.guild.id if message.guild else None
+        for message in client._connection._messages or ()
+    )
+
+    guilds = {}
+    for guild in client.guilds:
+        guilds[guild.id] = {
+            'name': guild.name,
+            'members': len(guild._members),
+            'channels': len(guild._channels),
+            'roles': len(guild._roles),
+            'emojis': len(guild.emojis),
+            'messages': messages.get(guild.id, 0),
+        }
+
+    totals = {key: sum(entry[key] for entry in guilds.values()) for key in CACHE_KEYS}
+    totals.update({
+        'guilds': len(guilds),
+        'users': len(client._connection._users),
+        'messages': sum(messages.values()),
+        'private_channels': len(client._connection._private_channels),
+    })
+    return {'totals': totals, 'guilds': guilds}
+
+
+def start_tracing(frames=10):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def top_allocators(snapshot, limit=10):
+    """Source lines holding the most memory in a tracemalloc snapshot"""
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count,
+        }
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def _filtered(snapshot):
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+class MemoryProfiler:
+    """Takes memory snapshots and diffs them against the previous one"""
+
+    def __init__(self, client, history=5):
+        self.client = client
+        self.snapshots = deque(maxlen=history)
+
+    def report(self, top=10):
+        """Current RSS, cache sizes and (when tracing) top allocators"""
+        report = {
+            'rss_mb': round(rss_bytes() / 1024 / 1024, 1),
+            'tracing': tracemalloc.is_tracing(),
+            'caches': cache_sizes(self.client),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report['traced_mb'] = round(current / 1024 / 1024, 1)
+            report['traced_peak_mb'] = round(peak / 1024 / 1024, 1)
+            report['top_allocators'] = top_allocators(_filtered(tracemalloc.take_snapshot()), top)
+        return report
+
+    def snapshot(self):
+        """Record a snapshot and return its diff against the previous one (if any)"""
+        entry = {
+            'time': time.time(),
+            'rss': rss_bytes(),
+            'caches': cache_sizes(self.client),
+            'traces': _filtered(tracemalloc.take_snapshot()) if tracemalloc.is_tracing() else None,
+        }
+        previous = self.snapshots[-1] if self.snapshots else None
+        self.snapshots.append(entry)
+        return diff_snapshots(previous, entry) if previous else None
+
+
+def diff_snapshots(old, new, top=10):
+    """What grew between two MemoryProfiler snapshots"""
+    old_totals, new_totals = old['caches']['totals'], new['caches']['totals']
+    diff = {
+        'seconds': round(new['time'] - old['time'], 1),
+        'rss_mb': round((new['rss'] - old['rss']) / 1024 / 1024, 1),
+        'totals': {key: new_totals.get(key, 0) - old_totals.get(key, 0) for key in new_totals},
+    }
+
+    old_guilds = old['caches']['guilds']
+    growth = []
+    for guild_id, entry in new['caches']['guilds'].items():
+        before = old_guilds.get(guild_id, {})
+        changes = {key: entry[key] - before.get(key, 0) for key in CACHE_KEYS}
+        if any(changes.values()):
+            growth.append((sum(abs(value) for value in changes.values()), entry['name'], changes))
+    growth.sort(key=lambda item: item[0], reverse=True)
+    diff['guilds'] = [{'name': name, **changes} for _, name, changes in growth[:top]]
+
+    if old['traces'] is not None and new['traces'] is not None:
+        diff['top_growth'] = [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff_kb': round(stat.size_diff / 1024, 1),
+                'count_diff': stat.count_diff,
+            }
+            for stat in new['traces'].compare_to(old['traces'], 'lineno')[:top]
+        ]
+    return diff
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Multi-Bot Runner Support
+Reads the BOTS_CONFIG file describing several bot applications and provides the
+HTTP connector they share when running on one event loop.
+"""
+
+import json
+import logging
+import os
+import re
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+class SharedConnector(aiohttp.TCPConnector):
+    """One connection pool for every bot in the process.
+
+    discord.py closes its HTTP session, and with it the session's connector,
+    whenever a client closes. Here that would cut the other bots off, so
+    close() does nothing until the runner calls shutdown() at the very end.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._released = False
+
+    async def close(self, *, abort_ssl=False):
+        if self._released:
+            await super().close(abort_ssl=abort_ssl)
+
+    async def shutdown(self):
+        self._released = True
+        await self.close()
+
+
+def load_bots_config(path, defaults):
+    """Parse the config file into one settings dict per bot, with `defaults` filled in.
+
+    The file is {"bots": [{"name": ..., "token_env": ... or "token": ..., ...}]};
+    optional keys are prefix, data_dir, extensions, sync_guild_id and slash_only.
+    Raises ValueError for anything that would only fail later at login.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    entries = config.get('bots') if isinstance(config, dict) else None
+    if not entries:
+        raise ValueError(f"{path} has no bots")
+
+    bots = []
+    for index, entry in enumerate(entries):
+        name = entry.get('name')
+        if not isinstance(name, str) or not NAME_PATTERN.match(name):
+            raise ValueError(f"Bot #{index + 1} needs a name of letters, digits, '-' or '_' (got {name!r})")
+        if any(bot['name'] == name for bot in bots):
+            raise ValueError(f"Bot name {name!r} is used twice")
+
+        token = entry.get('token') or os.getenv(entry.get('token_env', ''))
+        if not token:
+            raise ValueError(f"Bot {name!r} has no token (set 'token_env' to a variable that is set, or 'token')")
+
+        unknown = set(entry) - {'name', 'token', 'token_env', *defaults}
+        if unknown:
+            raise ValueError(f"Bot {name!r} has unknown settings: {', '.join(sorted(unknown))}")
+
+        settings = {**defaults, **entry, 'name': name, 'token': token}
+        settings.pop('token_env', None)
+        if 'data_dir' not in entry:
+            # Each bot keeps its own SQLite files, ring files and job checkpoints
+            settings['data_dir'] = os.path.join(defaults['data_dir'], name)
+        bots.append(settings)
+    return bots
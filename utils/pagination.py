@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Paginated Embed Views
+Builds embed pages lazily from an iterator and navigates them with buttons.
+"""
+
+from itertools import islice
+
+import discord
+
+# Discord embed limits (https://discord.com/developers/docs/resources/message#embed-object-embed-limits)
+EMBED_TOTAL_LIMIT = 6000
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_LIMIT = 2048
+
+# Room kept free on every page for the title and "Page N" footer
+PAGE_OVERHEAD = EMBED_TITLE_LIMIT + 64
+
+
+def truncate(text, limit):
+    """Cut text to at most `limit` characters, marking the cut with an ellipsis"""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+
+def join_within(items, limit=FIELD_VALUE_LIMIT, separator=", ", total=None):
+    """Join items until the next one would pass `limit` characters.
+
+    Items are consumed one at a time, so only the part that fits is ever
+    built. When `total` is known, a "(+N more)" suffix reports what was left out.
+    """
+    parts = []
+    length = 0
+    for item in items:
+        item = str(item)
+        extra = len(item) + (len(separator) if parts else 0)
+        # Keep room for the "+N more" suffix in case this is not the last item
+        reserve = len(f" (+{total} more)") if total is not None else 1
+        if length + extra + reserve > limit:
+            break
+        parts.append(item)
+        length += extra
+    else:
+        return separator.join(parts)
+
+    text = separator.join(parts)
+    if total is not None:
+        return f"{text} (+{total - len(parts)} more)"
+    return text + "…"
+
+
+def sparkline(values):
+    """One block character per value, scaled to the largest, e.g. '▁▃▇█▅'"""
+    bars = "▁▂▃▄▅▆▇█"
+    peak = max(values, default=0) or 1
+    return "".join(bars[min(int(value / peak * (len(bars) - 1) + 0.5), len(bars) - 1)] for value in values)
+
+
+def pack_fields(fields, max_fields=EMBED_FIELD_LIMIT, max_chars=EMBED_TOTAL_LIMIT - PAGE_OVERHEAD):
+    """Group (name, value, inline) tuples into pages that fit one embed.
+
+    Yields one list of fields per page, pulling from `fields` only as far as
+    the current page needs, so an iterator over thousands of entries costs
+    one page of work per page actually requested.
+    """
+    max_fields = min(max_fields, EMBED_FIELD_LIMIT)
+    page = []
+    chars = 0
+
+    for field in fields:
+        name, value, inline = (tuple(field) + (True,))[:3]
+        name = truncate(name, FIELD_NAME_LIMIT) or "\u200b"
+        value = truncate(value, FIELD_VALUE_LIMIT) or "\u200b"
+        size = len(name) + len(value)
+
+        if page and (len(page) >= max_fields or chars + size > max_chars):
+            yield page
+            page = []
+            chars = 0
+
+        page.append((name, value, inline))
+        chars += size
+
+    if page:
+        yield page
+
+
+def field_pages(fields, title, color=None, per_page=EMBED_FIELD_LIMIT, description=None):
+    """Turn an iterator of fields into a lazy iterator of embeds"""
+    if description:
+        description = truncate(description, EMBED_DESCRIPTION_LIMIT)
+    # The description repeats on every page, so it comes out of each page's character budget
+    max_chars = EMBED_TOTAL_LIMIT - PAGE_OVERHEAD - len(description or "")
+    for number, page in enumerate(pack_fields(fields, max_fields=per_page, max_chars=max_chars), start=1):
+        embed = discord.Embed(
+            title=truncate(title, EMBED_TITLE_LIMIT),
+            description=description,
+            color=color or discord.Color.blue()
+        )
+        for name, value, inline in page:
+            embed.add_field(name=name, value=value, inline=inline)
+        embed.set_footer(text=f"Page {number}")
+        yield embed
+
+
+class LazyPages:
+    """Random access over a page iterator, generating pages only on demand"""
+
+    def __init__(self, pages):
+        self._source = iter(pages)
+        self._pages = []
+        self.exhausted = False
+
+    def get(self, index):
+        """Return page `index`, or None if the iterator ends before it"""
+        if index >= len(self._pages) and not self.exhausted:
+            needed = index + 1 - len(self._pages)
+            self._pages.extend(islice(self._source, needed))
+            if len(self._pages) <= index:
+                self.exhausted = True
+        return self._pages[index] if index < len(self._pages) else None
+
+    def has_next(self, index):
+        return self.get(index + 1) is not None
+
+    @property
+    def known_count(self):
+        return len(self._pages)
+
+
+class Paginator(discord.ui.View):
+    """Button navigation over lazily generated embed pages"""
+
+    def __init__(self, pages, author_id=None, timeout=120.0):
+        super().__init__(timeout=timeout)
+        self.pages = pages if isinstance(pages, LazyPages) else LazyPages(pages)
+        self.author_id = author_id
+        self.index = 0
+        self.message = None
+
+    async def start(self, ctx, empty_message="❌ Nothing to show."):
+        """Send the first page; navigation is only attached when there is a second one"""
+        first = self.pages.get(0)
+        if first is None:
+            await ctx.send(empty_message)
+            return None
+
+        if not self.pages.has_next(0):
+            self.stop()
+            self.message = await ctx.send(embed=first)
+            return self.message
+
+        self._update_buttons()
+        self.message = await ctx.send(embed=first, view=self)
+        return self.message
+
+    async def interaction_check(self, interaction):
+        if self.author_id is not None and interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Only the person who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = not self.pages.has_next(self.index)
+
+    async def _show(self, interaction):
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages.get(self.index), view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        self.index = max(self.index - 1, 0)
+        await self._show(interaction)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        if self.pages.has_next(self.index):
+            self.index += 1
+        await self._show(interaction)
+
+    @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.danger)
+    async def close(self, interaction, button):
+        self.stop()
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.edit_message(view=self)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Raid Detection
+Sliding windows of recent joins per guild that flag join bursts and waves of
+new accounts, plus batched lockdown responses that can be lifted afterwards.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('timeout', 'kick', 'verification', 'lock', 'alert')
+BATCH_DELAY = 0.5      # Seconds to gather joins before acting on them
+BATCH_SIZE = 100
+
+# Denied on every non-moderator overwrite of a hidden channel while locked
+LOCK_PERMISSIONS = discord.Permissions(
+    send_messages=True, send_messages_in_threads=True, create_public_threads=True,
+    create_private_threads=True, add_reactions=True, connect=True
+)
+
+
+class RaidState:
+    __slots__ = ('reason', 'started', 'last_join', 'members')
+
+    def __init__(self, reason, started):
+        self.reason = reason
+        self.started = started
+        self.last_join = started
+        self.members = 0
+
+
+class JoinWindow:
+    """Joins within the last `window` seconds, with a running count of new accounts"""
+
+    __slots__ = ('joins', 'new_accounts')
+
+    def __init__(self):
+        self.joins = deque()  # (time, member id, is new account)
+        self.new_accounts = 0
+
+    def expire(self, cutoff):
+        joins = self.joins
+        while joins and joins[0][0] < cutoff:
+            if joins.popleft()[2]:
+                self.new_accounts -= 1
+
+    def append(self, entry, max_joins):
+        if len(self.joins) >= max_joins:
+            if self.joins.popleft()[2]:
+                self.new_accounts -= 1
+        self.joins.append(entry)
+        self.new_accounts += entry[2]
+
+
+class RaidDetector:
+    """Flags a raid when either threshold is crossed within `window` seconds.
+
+    Each join appends to its guild's window and pops whatever expired, so
+    the work per join is O(1) amortized. Windows keep at most `max_joins`
+    entries and at most `max_guilds` guilds are tracked (least recently
+    joined evicted first), so memory stays bounded during any burst.
+    """
+
+    def __init__(self, join_limit=20, new_account_limit=10, window=60.0, account_age=7 * 86400,
+                 max_joins=1000, max_guilds=10000):
+        self.join_limit = join_limit
+        self.new_account_limit = new_account_limit
+        self.window = window
+        self.account_age = account_age
+        self.max_joins = max(max_joins, join_limit, new_account_limit)
+        self.max_guilds = max_guilds
+        self.windows = OrderedDict()  # guild -> JoinWindow
+        self.raids = {}               # guild -> RaidState while a raid is active
+        self.joins = 0
+        self.triggered = 0
+
+    def record(self, guild_id, member_id, created_at, now=None):
+        """Record one join (created_at: account creation, epoch seconds).
+
+        Returns None for an ordinary join, or (state, member ids, started)
+        when the join starts a raid (every join in the window) or arrives
+        during one.
+        """
+        now = time.time() if now is None else now
+        self.joins += 1
+        is_new = now - created_at < self.account_age
+
+        raid = self.raids.get(guild_id)
+        if raid is not None:
+            raid.last_join = now
+            raid.members += 1
+            return raid, [member_id], False
+
+        joins = self.windows.get(guild_id)
+        if joins is None:
+            joins = self.windows[guild_id] = JoinWindow()
+            if len(self.windows) > self.max_guilds:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(guild_id)
+        joins.expire(now - self.window)
+        joins.append((now, member_id, is_new), self.max_joins)
+
+        if len(joins.joins) >= self.join_limit:
+            reason = f"{len(joins.joins)} joins in {self.window:.0f}s"
+        elif self.new_account_limit and joins.new_accounts >= self.new_account_limit:
+            reason = f"{joins.new_accounts} accounts younger than {self.account_age // 86400:.0f}d joined in {self.window:.0f}s"
+        else:
+            return None
+
+        self.triggered += 1
+        raid = self.start(guild_id, reason, now)
+        members = [joined for _, joined, _ in joins.joins]
+        raid.members = len(members)
+        joins.joins.clear()
+        joins.new_accounts = 0
+        return raid, members, True
+
+    def start(self, guild_id, reason, now=None):
+        """Put a guild in raid mode (also used for manual lockdowns)"""
+        raid = self.raids[guild_id] = RaidState(reason, time.time() if now is None else now)
+        return raid
+
+    def end(self, guild_id):
+        return self.raids.pop(guild_id, None)
+
+    def stats(self):
+        return {
+            'joins': self.joins,
+            'triggered': self.triggered,
+            'active_raids': len(self.raids),
+            'tracked_guilds': len(self.windows),
+        }
+
+
+class RaidResponder:
+    """Carries out raid actions in batches and remembers what a lockdown changed.
+
+    Joins flagged during a raid are queued per guild and handled every
+    BATCH_DELAY seconds, BATCH_SIZE at a time, through a RouteLimiter so
+    concurrency stays bounded. Lockdowns (verification level and hidden
+    channel overwrites) are saved to `state_path` so lifting them restores
+    the previous settings even after a restart.
+    """
+
+    def __init__(self, client, limiter, state_path, actions=('timeout', 'verification', 'lock', 'alert'),
+                 timeout_seconds=3600, alert_channel='mod-log'):
+        self.client = client
+        self.limiter = limiter
+        self.state_path = state_path
+        self.actions = set(actions)
+        self.timeout_seconds = timeout_seconds
+        self.alert_channel = alert_channel
+        self.pending = {}   # guild -> set of member ids waiting for the next batch
+        self.drains = {}    # guild -> running drain task
+        self.actioned = 0
+        self.failed = 0
+        try:
+            with open(state_path) as f:
+                self.lockdowns = json.load(f)
+        except (OSError, ValueError):
+            self.lockdowns = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(self.lockdowns, f)
+        os.replace(temporary, self.state_path)
+
+    def is_locked(self, guild_id):
+        return str(guild_id) in self.lockdowns
+
+    def queue(self, guild, member_ids):
+        """Queue members for the timeout/kick action; returns immediately"""
+        if not self.actions & {'timeout', 'kick'}:
+            return
+        self.pending.setdefault(guild.id, set()).update(member_ids)
+        task = self.drains.get(guild.id)
+        if task is None or task.done():
+            self.drains[guild.id] = asyncio.create_task(self._drain(guild))
+
+    async def _drain(self, guild):
+        pending = self.pending[guild.id]
+        reason = "Raid protection"
+        while pending:
+            await asyncio.sleep(BATCH_DELAY)
+            batch = [pending.pop() for _ in range(min(BATCH_SIZE, len(pending)))]
+            if 'kick' in self.actions:
+                calls = [(self.client.http.kick, (member_id, guild.id), {'reason': reason}) for member_id in batch]
+            else:
+                until = (datetime.now(timezone.utc) + timedelta(seconds=self.timeout_seconds)).isoformat()
+                calls = [
+                    (self.client.http.edit_member, (guild.id, member_id), {'reason': reason, 'communication_disabled_until': until})
+                    for member_id in batch
+                ]
+            results = await asyncio.gather(
+                *(self.limiter.call(('raid', guild.id), func, *args, **kwargs) for func, args, kwargs in calls),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, discord.NotFound):
+                    continue  # Already gone
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    logger.warning(f"🚨 Raid action failed in {guild.name}: {result}")
+                else:
+                    self.actioned += 1
+        self.drains.pop(guild.id, None)
+
+    async def lockdown(self, guild, raid):
+        """Raise verification and lock hidden channels; returns a list of what was done"""
+        done = []
+        if self.is_locked(guild.id):
+            return done
+        snapshot = {'started': raid.started, 'reason': raid.reason, 'verification_level': None, 'channels': {}}
+        me = guild.me
+
+        if 'verification' in self.actions and me.guild_permissions.manage_guild:
+            # Read before the PATCH: its GUILD_UPDATE can land while we await and report HIGH already
+            previous = guild.verification_level
+            if previous < discord.VerificationLevel.high:
+                try:
+                    await self.limiter.call(
+                        ('guild', guild.id), self.client.http.edit_guild, guild.id,
+                        verification_level=discord.VerificationLevel.high.value, reason="Raid protection"
+                    )
+                    snapshot['verification_level'] = previous.value
+                    done.append(f"verification raised from {previous} to high")
+                except discord.HTTPException as e:
+                    logger.warning(f"🚨 Could not raise verification in {guild.name}: {e}")
+
+        if 'lock' in self.actions:
+            hidden = [
+                channel for channel in guild.channels
+                if not isinstance(channel, discord.CategoryChannel)
+                and not channel.permissions_for(guild.default_role).view_channel
+                and channel.permissions_for(me).manage_roles
+            ]
+            results = await asyncio.gather(*(self._lock_channel(channel) for channel in hidden), return_exceptions=True)
+            for channel, result in zip(hidden, results):
+                if isinstance(result, dict) and result:
+                    snapshot['channels'][str(channel.id)] = result
+                elif isinstance(result, Exception):
+                    logger.warning(f"🚨 Could not lock #{channel} in {guild.name}: {result}")
+            if snapshot['channels']:
+                done.append(f"{len(snapshot['channels'])} hidden channels locked")
+
+        self.lockdowns[str(guild.id)] = snapshot
+        await asyncio.to_thread(self._save)
+        return done
+
+    async def _lock_channel(self, channel):
+        """Deny sending on every overwrite that grants access; returns the changed overwrites' old values"""
+        payload, previous = [], {}
+        for target, overwrite in channel.overwrites.items():
+            allow, deny = overwrite.pair()
+            is_role = isinstance(target, discord.Role)
+            moderator = is_role and (target.permissions.administrator or target.permissions.manage_channels)
+            if allow.view_channel and not moderator:
+                previous[str(target.id)] = [allow.value, deny.value, int(not is_role)]
+                allow = discord.Permissions(allow.value & ~LOCK_PERMISSIONS.value)
+                deny = discord.Permissions(deny.value | LOCK_PERMISSIONS.value)
+            payload.append({'id': target.id, 'type': int(not is_role), 'allow': str(allow.value), 'deny': str(deny.value)})
+        if previous:
+            await self.limiter.call(
+                ('channel', channel.id), self.client.http.edit_channel, channel.id,
+                permission_overwrites=payload, reason="Raid protection: channel locked"
+            )
+        return previous
+
+    async def lift(self, guild):
+        """Undo a lockdown: restore verification and the overwrites it changed"""
+        snapshot = self.lockdowns.get(str(guild.id))
+        if snapshot is None:
+            return []
+        done = []
+        if snapshot['verification_level'] is not None:
+            try:
+                await self.limiter.call(
+                    ('guild', guild.id), self.client.http.edit_guild, guild.id,
+                    verification_level=snapshot['verification_level'], reason="Raid over"
+                )
+                done.append(f"verification restored to {discord.VerificationLevel(snapshot['verification_level'])}")
+            except discord.HTTPException as e:
+                logger.warning(f"🚨 Could not restore verification in {guild.name}: {e}")
+
+        unlocked = 0
+        for channel_id, previous in snapshot['channels'].items():
+            channel = guild.get_channel(int(channel_id))
+            if channel is None:
+                continue
+            payload = []
+            for target, overwrite in channel.overwrites.items():
+                allow, deny = overwrite.pair()
+                is_role = isinstance(target, discord.Role)
+                allow_value, deny_value = previous.get(str(target.id), (allow.value, deny.value))[:2]
+                payload.append({'id': target.id, 'type': int(not is_role), 'allow': str(allow_value), 'deny': str(deny_value)})
+            try:
+                await self.limiter.call(
+                    ('channel', channel.id), self.client.http.edit_channel, channel.id,
+                    permission_overwrites=payload, reason="Raid over: channel unlocked"
+                )
+                unlocked += 1
+            except discord.HTTPException as e:
+                logger.warning(f"🚨 Could not unlock #{channel} in {guild.name}: {e}")
+        if unlocked:
+            done.append(f"{unlocked} channels unlocked")
+
+        del self.lockdowns[str(guild.id)]
+        await asyncio.to_thread(self._save)
+        return done
+
+    async def alert(self, guild, title, description, color=None):
+        if 'alert' not in self.actions:
+            return
+        logger.warning(f"🚨 {title} in {guild.name}: {description}")
+        channel = discord.utils.get(guild.text_channels, name=self.alert_channel)
+        if channel is None or not channel.permissions_for(guild.me).send_messages:
+            return
+        embed = discord.Embed(
+            title=title, description=description, color=color or discord.Color.red(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning(f"🚨 Could not post raid alert in {guild.name}: {e}")
+
+    def metrics(self):
+        return {
+            'actioned': self.actioned,
+            'failed': self.failed,
+            'queued': sum(len(pending) for pending in self.pending.values()),
+            'lockdowns': len(self.lockdowns),
+        }
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+REST Rate Limiting
+Token buckets and a route-aware limiter that paces bulk REST work (exports,
+bulk edits) so it stays under Discord's limits and leaves room for commands.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import discord
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, bursting up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now=None):
+        """Seconds until one token is available (0 if one is available now)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    async def acquire(self):
+        while True:
+            wait = self.delay()
+            if wait <= 0:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every acquisition for `seconds` (after a 429, for instance)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class RouteLimiter:
+    """Caps concurrent requests and paces them globally and per route.
+
+    Routes are caller-chosen keys such as ("messages", channel_id), matching
+    how Discord buckets most limits per channel or guild. discord.py still
+    enforces the real limits underneath; this keeps bulk jobs from draining
+    them and delaying interactive commands.
+    """
+
+    def __init__(self, rate=20.0, route_rate=4.0, concurrency=4):
+        self.global_bucket = TokenBucket(rate)
+        self.route_rate = route_rate
+        self.routes = {}
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.requests = 0
+        self.waited = 0.0
+        self.rate_limited = 0
+
+    def _route(self, route):
+        bucket = self.routes.get(route)
+        if bucket is None:
+            bucket = self.routes[route] = TokenBucket(self.route_rate)
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, route):
+        """Hold one request slot for `route` for the duration of the block"""
+        started = time.monotonic()
+        async with self.semaphore:
+            await self._route(route).acquire()
+            await self.global_bucket.acquire()
+            self.waited += time.monotonic() - started
+            self.in_flight += 1
+            self.requests += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def penalize(self, route, retry_after, is_global=False):
+        """Back off a route (or everything) after Discord answered 429"""
+        self.rate_limited += 1
+        (self.global_bucket if is_global else self._route(route)).pause(retry_after)
+
+    async def call(self, route, func, *args, retries=3, **kwargs):
+        """Run one REST coroutine under a slot, backing off and retrying on 429"""
+        for attempt in range(retries + 1):
+            async with self.slot(route):
+                try:
+                    return await func(*args, **kwargs)
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == retries:
+                        raise
+                    retry_after = float(getattr(e.response, 'headers', {}).get('Retry-After', 1))
+            self.penalize(route, retry_after)
+
+    def metrics(self):
+        return {
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'rate_limited': self.rate_limited,
+            'avg_wait_ms': round(self.waited / self.requests * 1000, 1) if self.requests else 0,
+            'routes': len(self.routes),
+        }
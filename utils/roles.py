@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk Role Jobs
+Adds or removes roles for thousands of members through the shared RouteLimiter,
+with progress checkpointed to disk so a restart picks each job back up.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+
+import discord
+
+from utils.scheduler import parse_duration
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('add', 'remove')
+CHUNK_SIZE = 50              # Members in flight between checkpoints
+FINISHED_RETENTION = 7 * 86400
+
+MEMBER_ID_PATTERN = re.compile(r"\b\d{15,20}\b")
+JOINED_PATTERN = re.compile(r"joined([<>])(\S+)", re.IGNORECASE)
+HAS_PATTERN = re.compile(r"has:(\S+)", re.IGNORECASE)
+
+
+def parse_member_ids(text):
+    """Every snowflake in an uploaded list (one per line, CSV, mentions...), deduplicated"""
+    return sorted({int(match) for match in MEMBER_ID_PATTERN.findall(text)})
+
+
+def parse_member_filter(text):
+    """'has:@Role joined<7d joined>30d' -> (role names/mentions, joined within, joined before, error)
+
+    Durations are in seconds; joined<7d means "joined in the last 7 days",
+    joined>30d means "has been here for more than 30 days".
+    """
+    text = text or ""
+    roles = HAS_PATTERN.findall(text)
+    within = before = None
+    for direction, value in JOINED_PATTERN.findall(text):
+        seconds = parse_duration(value)
+        if not seconds:
+            return None, None, None, f"`{value}` is not a duration like `7d` or `12h`"
+        if direction == '<':
+            within = seconds
+        else:
+            before = seconds
+    leftover = JOINED_PATTERN.sub('', HAS_PATTERN.sub('', text)).strip()
+    if leftover and leftover.lower() not in ('all', 'everyone'):
+        return None, None, None, f"don't understand `{leftover}`"
+    return roles, within, before, None
+
+
+def select_members(guild, has_roles=(), joined_within=None, joined_before=None, member_ids=None):
+    """Ids of cached members matching every filter, sorted so checkpoints are positions"""
+    now = discord.utils.utcnow()
+    members = guild.members if member_ids is None else filter(None, map(guild.get_member, member_ids))
+    selected = []
+    for member in members:
+        if member.bot:
+            continue
+        if any(member.get_role(role.id) is None for role in has_roles):
+            continue
+        if member.joined_at is not None:
+            age = (now - member.joined_at).total_seconds()
+            if joined_within is not None and age > joined_within:
+                continue
+            if joined_before is not None and age < joined_before:
+                continue
+        selected.append(member.id)
+    return sorted(selected)
+
+
+class RoleJob:
+    """One bulk add/remove over a fixed, sorted member list"""
+
+    FIELDS = (
+        'id', 'guild_id', 'action', 'role_ids', 'member_ids', 'position', 'changed', 'skipped',
+        'failed', 'status', 'error', 'channel_id', 'message_id', 'created_by', 'created', 'finished',
+    )
+
+    def __init__(self, **fields):
+        self.position = self.changed = self.skipped = self.failed = 0
+        self.status = 'running'
+        self.error = self.channel_id = self.message_id = self.created_by = self.finished = None
+        self.created = time.time()
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @property
+    def total(self):
+        return len(self.member_ids)
+
+    @property
+    def done(self):
+        return self.status != 'running'
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class RoleJobStore:
+    """One small JSON file per job, replaced atomically on every checkpoint.
+
+    The member list never changes, so it goes in a separate `<id>.members.json`
+    written once; checkpoints then stay a few hundred bytes and can be taken
+    after every chunk.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def members_path_for(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.members.json")
+
+    def load_all(self):
+        """Every stored job, oldest first; finished jobs past their retention are deleted"""
+        jobs = []
+        cutoff = time.time() - FINISHED_RETENTION
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json') or name.endswith('.members.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+                if 'member_ids' not in state:
+                    with open(self.members_path_for(state['id'])) as f:
+                        state['member_ids'] = json.load(f)
+                job = RoleJob(**state)
+            except (OSError, ValueError, TypeError, KeyError):
+                logger.warning(f"👥 Skipping unreadable role job file {path}")
+                continue
+            if job.done and (job.finished or 0) < cutoff:
+                os.remove(path)
+                continue
+            jobs.append(job)
+        return sorted(jobs, key=lambda job: job.id)
+
+    def next_id(self):
+        ids = [int(name[:-5]) for name in os.listdir(self.directory) if name[:-5].isdigit()]
+        return max(ids, default=0) + 1
+
+    @staticmethod
+    def _write(path, blob):
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def _save(self, job, state):
+        members_path = self.members_path_for(job.id)
+        if job.done:
+            # Finished jobs only need their counts
+            state['member_ids'] = []
+            self._write(self.path_for(job.id), json.dumps(state))
+            if os.path.exists(members_path):
+                os.remove(members_path)
+            return
+        if not os.path.exists(members_path):
+            self._write(members_path, json.dumps(job.member_ids))
+        del state['member_ids']
+        self._write(self.path_for(job.id), json.dumps(state))
+
+    async def save(self, job):
+        await asyncio.to_thread(self._save, job, job.to_dict())
+
+
+class BulkRoleRunner:
+    """Runs RoleJobs chunk by chunk under a RouteLimiter.
+
+    Every request of a job shares one route per guild, which is how Discord
+    buckets member role edits. A checkpoint (position and counts together)
+    is saved after every chunk, so after a crash at most one chunk is
+    repeated; role PUT/DELETE calls are idempotent, and only that chunk's
+    members can be recounted.
+    """
+
+    def __init__(self, http, store, limiter, on_progress=None):
+        self.http = http
+        self.store = store
+        self.limiter = limiter
+        self.on_progress = on_progress
+
+    async def _apply(self, job, guild, member_id, reason):
+        member = guild.get_member(member_id) if guild else None
+        if guild is not None and member is None:
+            job.skipped += 1  # Left the server
+            return
+
+        request = self.http.add_role if job.action == 'add' else self.http.remove_role
+        changed = False
+        for role_id in job.role_ids:
+            if member is not None and (member.get_role(role_id) is not None) == (job.action == 'add'):
+                continue  # Already in the wanted state; no request needed
+            try:
+                await self.limiter.call(('member_roles', job.guild_id), request, job.guild_id, member_id, role_id, reason=reason)
+                changed = True
+            except discord.NotFound:
+                job.skipped += 1
+                return
+            except discord.Forbidden as e:
+                # Missing Manage Roles or the role moved above ours: every other member would fail too
+                job.status, job.error = 'failed', f"{e.status} {e.text or 'Forbidden'}"
+                return
+            except discord.HTTPException as e:
+                job.failed += 1
+                logger.warning(f"👥 Role job {job.id}: member {member_id} failed: {e.status} {e.text}")
+                return
+        if changed:
+            job.changed += 1
+        else:
+            job.skipped += 1
+
+    async def run(self, job, guild=None):
+        """Work through the job from its checkpoint until it finishes, fails or is cancelled"""
+        reason = f"Bulk role job #{job.id}"
+        while job.status == 'running' and job.position < job.total:
+            chunk = job.member_ids[job.position:job.position + CHUNK_SIZE]
+            await asyncio.gather(*(self._apply(job, guild, member_id, reason) for member_id in chunk))
+            job.position += len(chunk)
+
+            await self.store.save(job)
+            if self.on_progress:
+                await self.on_progress(job)
+
+        if job.status == 'running':
+            job.status = 'done'
+        job.finished = time.time()
+        await self.store.save(job)
+        if self.on_progress:
+            await self.on_progress(job)
+        return job
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Scheduled Jobs
+A single timer loop over a min-heap of due times, backed by SQLite so jobs
+survive restarts. Due jobs are fired in batches by kind-specific handlers.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r"(\d+)\s*(w|d|h|m|s)", re.IGNORECASE)
+DURATION_UNITS = {'w': 7 * 86400, 'd': 86400, 'h': 3600, 'm': 60, 's': 1}
+
+# Longest sleep between checks, so wall-clock jumps are noticed
+MAX_SLEEP = 60.0
+# Jobs whose handler isn't loaded (e.g. during an extension reload) are retried after this
+UNHANDLED_RETRY = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    due REAL NOT NULL,
+    kind TEXT NOT NULL,
+    owner_id INTEGER,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (kind, owner_id, due);
+"""
+
+
+def parse_duration(text):
+    """'1h30m' / '2d' / '45s' -> seconds, or None if the text isn't a duration"""
+    text = text.strip().replace(' ', '')
+    if not text or DURATION_PATTERN.sub('', text):
+        return None
+    return sum(int(amount) * DURATION_UNITS[unit.lower()] for amount, unit in DURATION_PATTERN.findall(text))
+
+
+def format_duration(seconds):
+    """3725 -> '1h 2m 5s'"""
+    seconds = int(seconds)
+    parts = []
+    for unit in ('d', 'h', 'm', 's'):
+        amount, seconds = divmod(seconds, DURATION_UNITS[unit])
+        if amount:
+            parts.append(f"{amount}{unit}")
+    return " ".join(parts) or "0s"
+
+
+class Scheduler:
+    """Persistent delayed jobs fired by one timer task.
+
+    Only (due, id) pairs live in the heap; payloads stay in SQLite and are
+    read once per batch, so hundreds of thousands of pending jobs cost a few
+    megabytes. Cancelling just deletes the row; the stale heap entry is
+    skipped when it comes due. Jobs run at least once: rows are deleted after
+    their handler finishes, so a crash mid-batch fires them again on restart.
+    """
+
+    def __init__(self, path, batch_size=500, concurrency=50):
+        self.path = path
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.handlers = {}
+        self.heap = []
+        self.fired = 0
+        self.failed = 0
+        self._wake = asyncio.Event()
+        self._task = None
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+        self.heap = self.db.execute("SELECT due, id FROM jobs").fetchall()
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def register(self, kind, handler):
+        """Route jobs of `kind` to `async handler(payload)`"""
+        self.handlers[kind] = handler
+
+    def unregister(self, kind):
+        self.handlers.pop(kind, None)
+
+    def schedule(self, kind, delay, payload, owner_id=None):
+        """Schedule one job `delay` seconds from now; returns its id"""
+        return self.schedule_many(kind, [(delay, payload, owner_id)])[0]
+
+    def schedule_many(self, kind, jobs):
+        """Schedule (delay, payload, owner_id) jobs in one transaction; returns their ids"""
+        now = time.time()
+        ids = []
+        with self.db:
+            for delay, payload, owner_id in jobs:
+                due = now + delay
+                cursor = self.db.execute(
+                    "INSERT INTO jobs (due, kind, owner_id, payload, created) VALUES (?, ?, ?, ?, ?)",
+                    (due, kind, owner_id, json.dumps(payload), now)
+                )
+                ids.append(cursor.lastrowid)
+                heapq.heappush(self.heap, (due, cursor.lastrowid))
+        if self.heap and self.heap[0][1] in ids:
+            self._wake.set()
+        return ids
+
+    def cancel(self, job_id, kind=None, owner_id=None):
+        """Delete a pending job (optionally only if it matches kind/owner); returns True if it existed"""
+        query, args = "DELETE FROM jobs WHERE id = ?", [job_id]
+        if kind is not None:
+            query += " AND kind = ?"
+            args.append(kind)
+        if owner_id is not None:
+            query += " AND owner_id = ?"
+            args.append(owner_id)
+        with self.db:
+            return self.db.execute(query, args).rowcount > 0
+
+    def find_where(self, kind, owner_id, **payload_fields):
+        """[(id, payload)] of an owner's pending jobs of `kind` whose payload matches every given field, oldest first"""
+        rows = self.db.execute(
+            "SELECT id, payload FROM jobs WHERE kind = ? AND owner_id = ? ORDER BY id", (kind, owner_id)
+        ).fetchall()
+        found = [(job_id, json.loads(payload)) for job_id, payload in rows]
+        return [
+            (job_id, payload) for job_id, payload in found
+            if all(payload.get(key) == value for key, value in payload_fields.items())
+        ]
+
+    def cancel_where(self, kind, owner_id, **payload_fields):
+        """Delete an owner's pending jobs of `kind` whose payload matches every given field"""
+        matching = self.find_where(kind, owner_id, **payload_fields)
+        with self.db:
+            self.db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id, _ in matching])
+        return len(matching)
+
+    def pending(self, kind, owner_id, limit=10):
+        """[(id, due, payload)] for one owner, soonest first"""
+        rows = self.db.execute(
+            "SELECT id, due, payload FROM jobs WHERE kind = ? AND owner_id = ? ORDER BY due LIMIT ?",
+            (kind, owner_id, limit)
+        ).fetchall()
+        return [(job_id, due, json.loads(payload)) for job_id, due, payload in rows]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.db.close()
+
+    def metrics(self):
+        return {
+            'pending': len(self),
+            'heap': len(self.heap),
+            'next_due_in': round(self.heap[0][0] - time.time(), 1) if self.heap else None,
+            'fired': self.fired,
+            'failed': self.failed,
+        }
+
+    async def _run(self):
+        while True:
+            delay = self.heap[0][0] - time.time() if self.heap else MAX_SLEEP
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._fire_due()
+            except Exception:
+                logger.exception("⏰ Scheduler batch failed")
+                await asyncio.sleep(1)
+
+    async def _fire_due(self):
+        now = time.time()
+        batch = []
+        while self.heap and self.heap[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self.heap)[1])
+
+        placeholders = ",".join("?" * len(batch))
+        rows = self.db.execute(
+            f"SELECT id, kind, payload FROM jobs WHERE id IN ({placeholders})", batch
+        ).fetchall()  # Cancelled jobs are simply missing here
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deferred = set()
+
+        async def fire(job_id, kind, payload):
+            handler = self.handlers.get(kind)
+            if handler is None:
+                deferred.add(job_id)
+                return
+            async with semaphore:
+                try:
+                    await handler(json.loads(payload))
+                    self.fired += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception(f"⏰ {kind} job {job_id} failed")
+
+        await asyncio.gather(*(fire(*row) for row in rows))
+
+        retry_at = time.time() + UNHANDLED_RETRY
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM jobs WHERE id = ?", [(row[0],) for row in rows if row[0] not in deferred]
+            )
+            self.db.executemany("UPDATE jobs SET due = ? WHERE id = ?", [(retry_at, job_id) for job_id in deferred])
+        for job_id in deferred:
+            heapq.heappush(self.heap, (retry_at, job_id))
+        if deferred:
+            logger.warning(f"⏰ {len(deferred)} jobs have no handler loaded, retrying in {UNHANDLED_RETRY:.0f}s")
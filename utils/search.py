@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Message Search Index
+Bounded in-memory inverted index of recent messages, with term, phrase,
+author and channel queries answered without any API calls.
+"""
+
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+TOKEN_PATTERN = re.compile(r"\w+")
+QUERY_PATTERN = re.compile(r'(from|in):(\S+)|"([^"]*)"|(\S+)', re.IGNORECASE)
+
+# Text kept per message for phrase checks and result snippets
+MAX_STORED_TEXT = 400
+
+
+def tokenize(text):
+    """Lowercased word tokens, interned so postings and documents share them"""
+    return tuple(sys.intern(token) for token in TOKEN_PATTERN.findall(text.casefold()))
+
+
+def _contains(postings, message_id):
+    index = bisect_left(postings, message_id)
+    return index < len(postings) and postings[index] == message_id
+
+
+class Query:
+    """A parsed search: plain terms, quoted phrases and from:/in: filters"""
+
+    def __init__(self, terms=(), phrases=(), authors=(), channels=()):
+        self.terms = list(terms)
+        self.phrases = list(phrases)
+        self.authors = list(authors)    # Raw from: values, resolved by the caller
+        self.channels = list(channels)  # Raw in: values, resolved by the caller
+
+    @classmethod
+    def parse(cls, text):
+        """'deploy "rolled back" from:@alice in:#ops' -> Query"""
+        query = cls()
+        for match in QUERY_PATTERN.finditer(text):
+            key, value, phrase, word = match.groups()
+            if key:
+                (query.authors if key.lower() == 'from' else query.channels).append(value)
+            elif phrase is not None:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    query.phrases.append(tokens)
+                else:
+                    query.terms.extend(tokens)
+            else:
+                query.terms.extend(tokenize(word))
+        return query
+
+    def required_tokens(self):
+        tokens = set(self.terms)
+        for phrase in self.phrases:
+            tokens.update(phrase)
+        return tokens
+
+
+class IndexedMessage:
+    __slots__ = ('id', 'guild_id', 'channel_id', 'author_id', 'tokens', 'text')
+
+    def __init__(self, message_id, guild_id, channel_id, author_id, tokens, text):
+        self.id = message_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.tokens = tokens
+        self.text = text
+
+    def contains_phrase(self, phrase):
+        length = len(phrase)
+        tokens = self.tokens
+        first = phrase[0]
+        for start in range(len(tokens) - length + 1):
+            if tokens[start] is first and tokens[start:start + length] == phrase:
+                return True
+        return False
+
+
+class SearchIndex:
+    """Inverted index over the last `per_channel` messages of each channel.
+
+    At most `max_messages` are held in total; the oldest message (of its
+    channel, or overall) is evicted along with all of its postings. Message
+    ids are snowflakes, so postings are kept as sorted arrays of ids (8 bytes
+    each, against ~70 for a set entry) and newest-first needs no timestamps.
+    """
+
+    def __init__(self, per_channel=500, max_messages=50000):
+        self.per_channel = per_channel
+        self.max_messages = max_messages
+        self.messages = OrderedDict()  # id -> IndexedMessage, oldest first
+        self.channels = {}             # channel id -> deque of message ids, oldest first
+        self.postings = {}             # token -> array of message ids, ascending
+
+    def __len__(self):
+        return len(self.messages)
+
+    def add(self, message_id, guild_id, channel_id, author_id, content):
+        # An edit replaces the old text even when nothing searchable is left
+        if message_id in self.messages:
+            self.remove(message_id)
+        tokens = tokenize(content)
+        if not tokens:
+            return
+
+        entry = IndexedMessage(message_id, guild_id, channel_id, author_id, tokens, content[:MAX_STORED_TEXT])
+        self.messages[message_id] = entry
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if postings is None:
+                self.postings[token] = array('Q', (message_id,))
+            elif postings[-1] < message_id:
+                postings.append(message_id)
+            else:
+                postings.insert(bisect_left(postings, message_id), message_id)
+
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = deque()
+        channel.append(message_id)
+
+        if len(channel) > self.per_channel:
+            self.remove(channel[0])
+        while len(self.messages) > self.max_messages:
+            self.remove(next(iter(self.messages)))
+
+    def add_message(self, message):
+        self.add(message.id, message.guild.id if message.guild else None, message.channel.id,
+                 message.author.id, message.content)
+
+    def remove(self, message_id):
+        entry = self.messages.pop(message_id, None)
+        if entry is None:
+            return
+        for token in set(entry.tokens):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            index = bisect_left(postings, message_id)
+            if index < len(postings) and postings[index] == message_id:
+                del postings[index]
+                if not postings:
+                    del self.postings[token]
+
+        channel = self.channels[entry.channel_id]
+        if channel[0] == message_id:
+            channel.popleft()
+        else:
+            channel.remove(message_id)
+        if not channel:
+            del self.channels[entry.channel_id]
+
+    def remove_channel(self, channel_id):
+        for message_id in list(self.channels.get(channel_id, ())):
+            self.remove(message_id)
+
+    def _candidates(self, query, guild_id, channel_ids):
+        tokens = query.required_tokens()
+        if tokens:
+            lists = sorted((self.postings.get(token, ()) for token in tokens), key=len)
+            # Walk the rarest token's postings newest first, probing the others by binary search
+            return (
+                message_id for message_id in reversed(lists[0])
+                if all(_contains(postings, message_id) for postings in lists[1:])
+            )
+        if channel_ids:
+            return sorted(
+                (message_id for channel_id in channel_ids for message_id in self.channels.get(channel_id, ())),
+                reverse=True
+            )
+        # Insertion order is arrival order, close enough to newest first for a filter-only search
+        return (message_id for message_id, entry in reversed(self.messages.items()) if entry.guild_id == guild_id)
+
+    def search(self, query, guild_id, author_ids=(), channel_ids=(), visible=None):
+        """Matching messages in a guild, newest first.
+
+        A generator, so callers only pay for the results they take; consume it
+        before yielding to the event loop, since the index may change meanwhile.
+        `visible(channel_id)` can hide channels the searcher cannot read.
+        """
+        author_ids, channel_ids = set(author_ids), set(channel_ids)
+        for message_id in self._candidates(query, guild_id, channel_ids):
+            entry = self.messages.get(message_id)
+            if entry is None or entry.guild_id != guild_id:
+                continue
+            if author_ids and entry.author_id not in author_ids:
+                continue
+            if channel_ids and entry.channel_id not in channel_ids:
+                continue
+            if visible is not None and not visible(entry.channel_id):
+                continue
+            if all(entry.contains_phrase(phrase) for phrase in query.phrases):
+                yield entry
+
+    def stats(self):
+        return {
+            'messages': len(self.messages),
+            'channels': len(self.channels),
+            'terms': len(self.postings),
+            'postings': sum(len(postings) for postings in self.postings.values()),
+        }
+
+
+def timed_search(index, query, guild_id, limit=100, **filters):
+    """First `limit` results and the milliseconds spent finding them"""
+    started = time.perf_counter()
+    results = []
+    for entry in index.search(query, guild_id, **filters):
+        results.append(entry)
+        if len(results) >= limit:
+            break
+    return results, (time.perf_counter() - started) * 1000
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Gateway/Worker Event Stream
+Split mode: the gateway process forwards stateless command events to a Redis stream
+and worker processes consume it with a consumer group, replying over REST.
+
+Stream protocol: each entry has one field, 'e', holding a JSON event
+{'t': gateway event name, 'd': raw gateway payload, 'g': guild id, 'v': guild
+snapshot version, 'ts': time the gateway received it}. Guild snapshots (roles,
+channels, the bot's and the owner's member) live in a hash next to the stream,
+so events stay small and any worker can rebuild the guild it needs.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 5.0
+WORKER_TIMEOUT = 15.0          # A worker without a heartbeat for this long is considered gone
+CLAIM_IDLE = 60.0              # Entries pending this long on a dead consumer are claimed by another
+MONITOR_INTERVAL = 2.0
+INTERACTION_DEADLINE = 3.0     # Discord drops interactions not answered within 3s
+RAW_MESSAGES = 1024            # Raw MESSAGE_CREATE payloads kept until on_message decides
+SNAPSHOT_MAX_AGE = 600.0       # Republish snapshots this often even without a change event
+
+# Gateway events that change what a guild snapshot holds, and where their guild id is
+SNAPSHOT_EVENTS = {
+    'GUILD_UPDATE': 'id',
+    'GUILD_ROLE_CREATE': 'guild_id',
+    'GUILD_ROLE_UPDATE': 'guild_id',
+    'GUILD_ROLE_DELETE': 'guild_id',
+    'CHANNEL_CREATE': 'guild_id',
+    'CHANNEL_UPDATE': 'guild_id',
+    'CHANNEL_DELETE': 'guild_id',
+}
+
+
+def is_stateless(command):
+    """Commands opt in to running on a worker with extras={'stateless': True}"""
+    command = getattr(command, 'wrapped', command)  # Hybrid app commands point back at the prefix command
+    return bool(command is not None and getattr(command, 'extras', {}).get('stateless'))
+
+
+def encode(event):
+    return json.dumps(event, separators=(',', ':'))
+
+
+# Guild snapshots
+
+def _member_payload(member):
+    return {
+        'user': member._user._to_minimal_user_json(),
+        'roles': [str(role_id) for role_id in member._roles],
+        'joined_at': member.joined_at.isoformat() if member.joined_at else None,
+        'nick': member.nick,
+        'flags': member._flags,
+    }
+
+
+def _channel_payload(channel):
+    payload = {
+        'id': str(channel.id),
+        'type': channel.type.value,
+        'name': channel.name,
+        'position': channel.position,
+        'parent_id': str(channel.category_id) if getattr(channel, 'category_id', None) else None,
+        'permission_overwrites': [overwrite._asdict() for overwrite in channel._overwrites],
+        'nsfw': getattr(channel, 'nsfw', False),
+    }
+    for key in ('topic', 'bitrate', 'user_limit'):
+        if hasattr(channel, key):
+            payload[key] = getattr(channel, key)
+    return payload
+
+
+def guild_snapshot(guild):
+    """What a worker needs to run a command in `guild`, shaped like a GUILD_CREATE payload"""
+    members = [member for member in {guild.me, guild.owner} if member is not None]
+    return {
+        'id': str(guild.id),
+        'name': guild.name,
+        'icon': guild._icon,
+        'owner_id': str(guild.owner_id),
+        'member_count': guild.member_count,
+        'features': list(guild.features),
+        'verification_level': guild.verification_level.value,
+        'preferred_locale': str(guild.preferred_locale),
+        'roles': [
+            {
+                'id': str(role.id), 'name': role.name, 'permissions': str(role.permissions.value),
+                'position': role.position, 'color': role.colour.value, 'hoist': role.hoist,
+                'managed': role.managed, 'mentionable': role.mentionable,
+            }
+            for role in guild.roles
+        ],
+        'channels': [_channel_payload(channel) for channel in guild.channels],
+        'members': [_member_payload(member) for member in members],
+        'emojis': [],
+        'stickers': [],
+    }
+
+
+# Transports
+
+class MemoryStream:
+    """In-process stand-in for RedisStream with the same consumer-group semantics.
+
+    Only consumers in the same process can see it, so it is meant for tests,
+    the load generator and running a gateway with in-process workers.
+    """
+
+    def __init__(self, name, max_length=10000):
+        self.name = name
+        self.max_length = max_length
+        self.entries = OrderedDict()   # entry id -> event
+        self.groups = {}               # group -> {'last': last delivered id, 'pending': {id: [consumer, delivered_at]}}
+        self.snapshots = {}
+        self.heartbeats = {}
+        self._next_id = 0
+        self._added = asyncio.Event()
+
+    async def add(self, event):
+        self._next_id += 1
+        self.entries[self._next_id] = event
+        while len(self.entries) > self.max_length:
+            self.entries.popitem(last=False)
+        self._added.set()
+        return self._next_id
+
+    async def ensure_group(self, group):
+        self.groups.setdefault(group, {'last': self._next_id, 'pending': {}})
+
+    def _undelivered(self, group):
+        last = self.groups[group]['last']
+        # Ids only grow, so the undelivered entries are a suffix of the stream
+        entry_ids = []
+        for entry_id in reversed(self.entries):
+            if entry_id <= last:
+                break
+            entry_ids.append(entry_id)
+        entry_ids.reverse()
+        return entry_ids
+
+    async def read(self, group, consumer, count, block=5.0):
+        """Up to `count` new (id, event) entries for this consumer, waiting up to `block` seconds"""
+        state = self.groups[group]
+        if not self._undelivered(group):
+            self._added.clear()
+            try:
+                await asyncio.wait_for(self._added.wait(), timeout=block)
+            except asyncio.TimeoutError:
+                return []
+        now = time.time()
+        entries = []
+        for entry_id in self._undelivered(group)[:count]:
+            state['last'] = entry_id
+            state['pending'][entry_id] = [consumer, now]
+            entries.append((entry_id, self.entries[entry_id]))
+        return entries
+
+    async def ack(self, group, *entry_ids):
+        pending = self.groups[group]['pending']
+        for entry_id in entry_ids:
+            pending.pop(entry_id, None)
+
+    async def claim(self, group, consumer, min_idle, count):
+        """Take over entries another consumer received but never acknowledged"""
+        pending = self.groups[group]['pending']
+        now = time.time()
+        entries = []
+        for entry_id, (owner, delivered_at) in list(pending.items()):
+            if len(entries) >= count:
+                break
+            if owner == consumer or now - delivered_at < min_idle:
+                continue
+            if entry_id not in self.entries:
+                del pending[entry_id]   # Trimmed from the stream before anyone handled it
+                continue
+            pending[entry_id] = [consumer, now]
+            entries.append((entry_id, self.entries[entry_id]))
+        return entries
+
+    async def backlog(self, group):
+        """Entries not yet acknowledged: pending plus never delivered"""
+        if group not in self.groups:
+            return 0
+        return len(self.groups[group]['pending']) + len(self._undelivered(group))
+
+    async def length(self):
+        return len(self.entries)
+
+    async def set_snapshot(self, guild_id, data):
+        self.snapshots[str(guild_id)] = data
+
+    async def get_snapshot(self, guild_id):
+        return self.snapshots.get(str(guild_id))
+
+    async def heartbeat(self, consumer):
+        self.heartbeats[consumer] = time.time()
+
+    async def workers(self, max_age=WORKER_TIMEOUT):
+        cutoff = time.time() - max_age
+        return sorted(consumer for consumer, seen in self.heartbeats.items() if seen >= cutoff)
+
+    async def close(self):
+        pass
+
+
+class RedisStream:
+    """Redis stream (XADD / XREADGROUP / XACK / XAUTOCLAIM) plus hashes for snapshots and heartbeats"""
+
+    def __init__(self, url, name, max_length=10000):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("STREAM_URL points at Redis but the redis package is not installed (pip install redis)")
+        self._errors = redis
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.name = name
+        self.max_length = max_length
+        self.snapshot_key = f"{name}:guilds"
+        self.heartbeat_key = f"{name}:workers"
+
+    async def add(self, event):
+        # Approximate trimming keeps XADD O(1)
+        return await self.redis.xadd(self.name, {'e': event}, maxlen=self.max_length, approximate=True)
+
+    async def ensure_group(self, group):
+        try:
+            await self.redis.xgroup_create(self.name, group, id='$', mkstream=True)
+        except self._errors.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    async def read(self, group, consumer, count, block=5.0):
+        response = await self.redis.xreadgroup(group, consumer, {self.name: '>'}, count=count, block=int(block * 1000))
+        return [(entry_id, fields.get('e')) for _, entries in response or [] for entry_id, fields in entries]
+
+    async def ack(self, group, *entry_ids):
+        if entry_ids:
+            await self.redis.xack(self.name, group, *entry_ids)
+
+    async def claim(self, group, consumer, min_idle, count):
+        response = await self.redis.xautoclaim(
+            self.name, group, consumer, min_idle_time=int(min_idle * 1000), start_id='0-0', count=count
+        )
+        # Entries trimmed from the stream come back as None and are dropped from the pending list
+        return [(entry_id, fields.get('e')) for entry_id, fields in response[1] if fields]
+
+    async def backlog(self, group):
+        try:
+            groups = await self.redis.xinfo_groups(self.name)
+        except self._errors.ResponseError:
+            return 0  # Stream not created yet
+        for info in groups:
+            if info['name'] == group:
+                # 'lag' (undelivered entries) needs Redis 7; older servers only report pending
+                return info['pending'] + (info.get('lag') or 0)
+        return 0
+
+    async def length(self):
+        return await self.redis.xlen(self.name)
+
+    async def set_snapshot(self, guild_id, data):
+        await self.redis.hset(self.snapshot_key, str(guild_id), data)
+
+    async def get_snapshot(self, guild_id):
+        return await self.redis.hget(self.snapshot_key, str(guild_id))
+
+    async def heartbeat(self, consumer):
+        await self.redis.hset(self.heartbeat_key, consumer, time.time())
+
+    async def workers(self, max_age=WORKER_TIMEOUT):
+        cutoff = time.time() - max_age
+        seen = await self.redis.hgetall(self.heartbeat_key)
+        stale = [consumer for consumer, at in seen.items() if float(at) < cutoff - 3600]
+        if stale:
+            await self.redis.hdel(self.heartbeat_key, *stale)
+        return sorted(consumer for consumer, at in seen.items() if float(at) >= cutoff)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def open_stream(url, name, max_length=10000):
+    """'memory://' for the in-process stand-in, anything else is a Redis URL"""
+    if url.startswith('memory://'):
+        return MemoryStream(name, max_length)
+    return RedisStream(url, name, max_length)
+
+
+# Gateway side
+
+class StreamGateway:
+    """Decides per command whether to run it here or forward it to the workers.
+
+    Stateless commands (and slash commands backed by them) are forwarded;
+    everything else, and every command while no worker is alive or the
+    backlog is over `backlog_limit`, runs in this process as before.
+    """
+
+    def __init__(self, client, stream, group='workers', backlog_limit=200):
+        self.client = client
+        self.stream = stream
+        self.group = group
+        self.backlog_limit = backlog_limit
+        self.raw = OrderedDict()       # message id -> raw MESSAGE_CREATE payload
+        self.published = {}            # guild id -> (snapshot version, published at)
+        self.dirty = set()
+        self.workers = []
+        self.backlog = 0
+        self.stats = {'forwarded': 0, 'local': 0, 'fallback': 0, 'snapshots': 0, 'errors': 0}
+        self._state = None
+        self._parsers = {}
+        self._task = None
+
+    @property
+    def available(self):
+        return bool(self.workers) and self.backlog < self.backlog_limit
+
+    def install(self, state):
+        """Wrap the parsers that feed forwarding: raw messages, interactions and snapshot changes"""
+        if self._state is not None:
+            return
+        self._state = state
+        wrappers = {'MESSAGE_CREATE': self._wrap_message, 'INTERACTION_CREATE': self._wrap_interaction}
+        wrappers.update({event: self._wrap_snapshot_event for event in SNAPSHOT_EVENTS})
+        for event, wrap in wrappers.items():
+            self._parsers[event] = state.parsers[event]
+            state.parsers[event] = wrap(event, state.parsers[event])
+
+    def uninstall(self):
+        if self._state is not None:
+            self._state.parsers.update(self._parsers)
+            self._state = None
+
+    async def start(self):
+        await self.stream.ensure_group(self.group)
+        self.install(self.client._connection)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.uninstall()
+
+    def remember(self, data):
+        """Keep a raw message payload until on_message has decided where the command runs"""
+        if data.get('author', {}).get('bot'):
+            return
+        self.raw[int(data['id'])] = data
+        if len(self.raw) > RAW_MESSAGES:
+            self.raw.popitem(last=False)
+
+    def _wrap_message(self, event, parser):
+        def remembering(data):
+            self.remember(data)
+            return parser(data)
+        return remembering
+
+    def _wrap_interaction(self, event, parser):
+        def routing(data):
+            # Components and modals belong to views held by whichever process sent them: always local
+            if data.get('type') in (2, 4) and self.available and is_stateless(self._app_command(data)):
+                asyncio.create_task(self._forward_interaction(data, parser))
+                return
+            return parser(data)
+        return routing
+
+    def _wrap_snapshot_event(self, event, parser):
+        key = SNAPSHOT_EVENTS[event]
+
+        def marking(data):
+            if data.get(key):
+                self.dirty.add(int(data[key]))
+            return parser(data)
+        return marking
+
+    def _app_command(self, data):
+        command = data.get('data', {})
+        guild_id = command.get('guild_id')
+        return self.client.tree.get_command(
+            command.get('name', ''),
+            guild=discord.Object(int(guild_id)) if guild_id else None,
+            type=discord.AppCommandType(command.get('type', 1))
+        )
+
+    async def _snapshot_version(self, guild):
+        """Publish the guild's snapshot if workers may have an outdated one; returns its version"""
+        if guild is None:
+            return None
+        published = self.published.get(guild.id)
+        if published and guild.id not in self.dirty and time.time() - published[1] < SNAPSHOT_MAX_AGE:
+            return published[0]
+        self.dirty.discard(guild.id)
+        # Nanosecond versions stay unique across gateway restarts
+        version = time.time_ns()
+        await self.stream.set_snapshot(guild.id, encode({'v': version, 'guild': guild_snapshot(guild)}))
+        self.published[guild.id] = (version, time.time())
+        self.stats['snapshots'] += 1
+        return version
+
+    async def _publish(self, event, data, guild):
+        version = await self._snapshot_version(guild)
+        await self.stream.add(encode({
+            't': event, 'd': data, 'g': guild.id if guild else None, 'v': version, 'ts': time.time()
+        }))
+        self.stats['forwarded'] += 1
+
+    async def forward_message(self, ctx):
+        """Forward a resolved prefix command; False means it should run in this process"""
+        data = self.raw.pop(ctx.message.id, None)
+        if data is None or ctx.command is None or not is_stateless(ctx.command):
+            self.stats['local'] += 1
+            return False
+        if not self.available:
+            self.stats['fallback'] += 1
+            return False
+        try:
+            await self._publish('MESSAGE_CREATE', data, ctx.guild)
+        except Exception as e:
+            logger.warning(f"🔀 Could not forward command, running it here: {e}")
+            self.stats['errors'] += 1
+            return False
+        return True
+
+    async def _forward_interaction(self, data, parser):
+        guild = self.client.get_guild(int(data['guild_id'])) if data.get('guild_id') else None
+        try:
+            await self._publish('INTERACTION_CREATE', data, guild)
+        except Exception as e:
+            logger.warning(f"🔀 Could not forward interaction, handling it here: {e}")
+            self.stats['errors'] += 1
+            parser(data)
+
+    async def _monitor(self):
+        """Track live workers and the backlog so forwarding stops when nobody can keep up"""
+        while True:
+            try:
+                self.workers = await self.stream.workers()
+                self.backlog = await self.stream.backlog(self.group)
+            except Exception as e:
+                logger.warning(f"🔀 Stream unavailable, running commands locally: {e}")
+                self.workers, self.backlog = [], 0
+            await asyncio.sleep(MONITOR_INTERVAL)
+
+    def metrics(self):
+        return {
+            'mode': 'gateway',
+            'workers': self.workers,
+            'backlog': self.backlog,
+            'forwarding': self.available,
+            'snapshots_cached': len(self.published),
+            **self.stats,
+        }
+
+
+# Worker side
+
+class StreamWorker:
+    """Consumes forwarded events and runs their commands with a REST-only client.
+
+    Up to `concurrency` events run at once. Each is acknowledged once its
+    command has finished, failed or expired, so an entry is only redelivered
+    (to another worker, after CLAIM_IDLE) when its worker died mid-command.
+    Guilds are rebuilt from the gateway's snapshots and the `max_guilds`
+    most recently used are kept.
+    """
+
+    def __init__(self, client, stream, consumer, group='workers', concurrency=16, max_age=30.0, max_guilds=1000):
+        self.client = client
+        self.stream = stream
+        self.consumer = consumer
+        self.group = group
+        self.concurrency = concurrency
+        self.max_age = max_age
+        self.max_guilds = max_guilds
+        self.versions = OrderedDict()   # guild id -> snapshot version applied here
+        self.inflight = set()
+        self.running = False
+        self.stats = {'handled': 0, 'failed': 0, 'expired': 0, 'claimed': 0, 'snapshot_loads': 0}
+
+    async def run(self):
+        await self.stream.ensure_group(self.group)
+        self.running = True
+        heartbeat = asyncio.create_task(self._heartbeat())
+        last_claim = time.monotonic()
+        logger.info(f"🔀 Worker {self.consumer} consuming {self.stream.name} (concurrency {self.concurrency})")
+        try:
+            while True:
+                if len(self.inflight) >= self.concurrency:
+                    await asyncio.wait(self.inflight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                free = self.concurrency - len(self.inflight)
+                if time.monotonic() - last_claim >= CLAIM_IDLE:
+                    last_claim = time.monotonic()
+                    entries = await self.stream.claim(self.group, self.consumer, CLAIM_IDLE, free)
+                    self.stats['claimed'] += len(entries)
+                else:
+                    entries = await self.stream.read(self.group, self.consumer, free)
+                for entry_id, event in entries:
+                    task = asyncio.create_task(self._handle(entry_id, event))
+                    self.inflight.add(task)
+                    task.add_done_callback(self.inflight.discard)
+        finally:
+            self.running = False
+            heartbeat.cancel()
+            if self.inflight:
+                await asyncio.wait(self.inflight, timeout=10)
+
+    async def _heartbeat(self):
+        while True:
+            try:
+                await self.stream.heartbeat(self.consumer)
+            except Exception as e:
+                logger.warning(f"🔀 Worker heartbeat failed: {e}")
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def _handle(self, entry_id, raw):
+        try:
+            event = json.loads(raw)
+            age = time.time() - event['ts']
+            if age > (INTERACTION_DEADLINE if event['t'] == 'INTERACTION_CREATE' else self.max_age):
+                self.stats['expired'] += 1
+                return
+            if event['g'] is not None:
+                await self._ensure_guild(event['g'], event['v'])
+            if event['t'] == 'MESSAGE_CREATE':
+                await self._run_message(event['d'])
+            elif event['t'] == 'INTERACTION_CREATE':
+                await self._run_interaction(event['d'])
+            self.stats['handled'] += 1
+        except Exception:
+            self.stats['failed'] += 1
+            logger.exception(f"🔀 Failed to handle stream entry {entry_id}")
+        finally:
+            # Acknowledge failures too: a payload that crashes once will crash every worker
+            await self.stream.ack(self.group, entry_id)
+
+    async def _ensure_guild(self, guild_id, version):
+        state = self.client._connection
+        if guild_id not in self.versions and state._get_guild(guild_id) is not None:
+            return  # A live gateway guild, when the worker shares a process with the gateway
+        if self.versions.get(guild_id) == version:
+            self.versions.move_to_end(guild_id)
+            return
+
+        raw = await self.stream.get_snapshot(guild_id)
+        if raw is None:
+            raise LookupError(f"No snapshot published for guild {guild_id}")
+        snapshot = json.loads(raw)
+        old = state._get_guild(guild_id)
+        if old is not None:
+            state._remove_guild(old)
+        guild = discord.Guild(data=snapshot['guild'], state=state)
+        # Keep the owner even when the member cache flags would only keep the bot itself
+        for member in snapshot['guild']['members']:
+            guild._add_member(discord.Member(data=member, guild=guild, state=state))
+        state._add_guild(guild)
+        self.versions[guild_id] = snapshot['v']
+        self.versions.move_to_end(guild_id)
+        self.stats['snapshot_loads'] += 1
+
+        while len(self.versions) > self.max_guilds:
+            evicted, _ = self.versions.popitem(last=False)
+            guild = state._get_guild(evicted)
+            if guild is not None:
+                state._remove_guild(guild)
+
+    async def _run_message(self, data):
+        state = self.client._connection
+        channel, _ = state._get_guild_channel(data)
+        message = discord.Message(state=state, channel=channel, data=data)
+        # The gateway already ran anti-spam, keyword triggers and indexing for this message
+        await self.client.invoke(await self.client.get_context(message))
+
+    async def _run_interaction(self, data):
+        tree = self.client.tree
+        interaction = discord.Interaction(data=data, state=self.client._connection)
+        try:
+            await tree._call(interaction)
+        except app_commands.AppCommandError as e:
+            await tree._dispatch_error(interaction, e)
+
+    def metrics(self):
+        return {
+            'mode': 'worker',
+            'consumer': self.consumer,
+            'running': self.running,
+            'inflight': len(self.inflight),
+            'concurrency': self.concurrency,
+            'guilds_cached': len(self.versions),
+            **self.stats,
+        }
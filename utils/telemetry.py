@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Gateway Event Telemetry
+Counts dispatched gateway events per type and per guild over a rolling window of
+one-second slots, to show which events (and which guilds) keep the bot busy.
+"""
+
+import time
+from array import array
+from collections import Counter
+
+# Intent that can be disabled to stop receiving an event type
+EVENT_INTENTS = {
+    'PRESENCE_UPDATE': 'presences',
+    'TYPING_START': 'typing',
+    'MESSAGE_CREATE': 'messages',
+    'MESSAGE_UPDATE': 'messages',
+    'MESSAGE_DELETE': 'messages',
+    'MESSAGE_REACTION_ADD': 'reactions',
+    'MESSAGE_REACTION_REMOVE': 'reactions',
+    'GUILD_MEMBER_ADD': 'members',
+    'GUILD_MEMBER_UPDATE': 'members',
+    'GUILD_MEMBER_REMOVE': 'members',
+    'VOICE_STATE_UPDATE': 'voice_states',
+    'GUILD_EMOJIS_UPDATE': 'emojis_and_stickers',
+    'INVITE_CREATE': 'invites',
+    'INTEGRATION_UPDATE': 'integrations',
+    'WEBHOOKS_UPDATE': 'webhooks',
+}
+
+
+class SecondRing:
+    """Event counts for each of the last `size` seconds"""
+
+    def __init__(self, size):
+        self.size = size
+        self.counts = array('Q', bytes(8 * size))
+        self.stamps = array('q', [-1]) * size
+
+    def add(self, second, count=1):
+        slot = second % self.size
+        if self.stamps[slot] != second:
+            self.stamps[slot] = second
+            self.counts[slot] = 0
+        self.counts[slot] += count
+
+    def total(self, second, seconds):
+        """Events in the `seconds` seconds up to and including `second`"""
+        total = 0
+        for stamp in range(second - min(seconds, self.size) + 1, second + 1):
+            slot = stamp % self.size
+            if self.stamps[slot] == stamp:
+                total += self.counts[slot]
+        return total
+
+
+class GatewayTelemetry:
+    """Per-event-type and per-guild gateway event rates.
+
+    Hooks in by wrapping the connection state's parsers, which the websocket
+    calls for every dispatched event, so only events discord.py handles are
+    counted. Guild counts are kept in one Counter per second of the window.
+    """
+
+    def __init__(self, window=60):
+        self.window = window
+        self.started = time.time()
+        self.events = {}
+        self.totals = Counter()
+        self.parse_seconds = Counter()
+        self._guild_slots = [Counter() for _ in range(window)]
+        self._guild_stamps = [-1] * window
+        self._state = None
+        self._original = {}
+
+    def install(self, state):
+        """Wrap every parser of a discord.py ConnectionState"""
+        if self._state is not None:
+            return
+        self._state = state
+        self._original = dict(state.parsers)
+        for event, parser in self._original.items():
+            state.parsers[event] = self._wrap(event, parser)
+
+    def uninstall(self):
+        if self._state is None:
+            return
+        self._state.parsers.update(self._original)
+        self._state = None
+
+    def _wrap(self, event, parser):
+        record = self.record
+        parse_seconds = self.parse_seconds
+
+        def counted(data):
+            record(event, data.get('guild_id') if isinstance(data, dict) else None)
+            started = time.perf_counter()
+            try:
+                return parser(data)
+            finally:
+                parse_seconds[event] += time.perf_counter() - started
+
+        counted.__wrapped__ = parser
+        return counted
+
+    def record(self, event, guild_id=None, now=None):
+        second = int(time.time() if now is None else now)
+        ring = self.events.get(event)
+        if ring is None:
+            ring = self.events[event] = SecondRing(self.window)
+        ring.add(second)
+        self.totals[event] += 1
+
+        if guild_id is not None:
+            slot = second % self.window
+            if self._guild_stamps[slot] != second:
+                self._guild_stamps[slot] = second
+                self._guild_slots[slot].clear()
+            self._guild_slots[slot][(int(guild_id), event)] += 1
+
+    def rates(self, seconds=None, now=None):
+        """Events per second for each event type over the last `seconds`, busiest first"""
+        seconds = min(seconds or self.window, self.window)
+        second = int(time.time() if now is None else now)
+        rates = []
+        for event, ring in self.events.items():
+            count = ring.total(second, seconds)
+            rates.append({
+                'event': event,
+                'per_second': round(count / seconds, 2),
+                'count': count,
+                'total': self.totals[event],
+                'parse_ms': round(self.parse_seconds[event] * 1000, 1),
+                'intent': EVENT_INTENTS.get(event),
+            })
+        rates.sort(key=lambda entry: (entry['count'], entry['total']), reverse=True)
+        return rates
+
+    def top_guilds(self, limit=10, names=None, now=None):
+        """Guilds sending the most events over the window, with their busiest event types"""
+        second = int(time.time() if now is None else now)
+        per_guild = {}
+        for stamp in range(second - self.window + 1, second + 1):
+            slot = stamp % self.window
+            if self._guild_stamps[slot] != stamp:
+                continue
+            for (guild_id, event), count in self._guild_slots[slot].items():
+                per_guild.setdefault(guild_id, Counter())[event] += count
+
+        busiest = sorted(per_guild.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        return [
+            {
+                'guild_id': guild_id,
+                'name': names(guild_id) if names else None,
+                'per_second': round(sum(events.values()) / self.window, 2),
+                'events': dict(events.most_common(3)),
+            }
+            for guild_id, events in busiest[:limit]
+        ]
+
+    def report(self, top=10, names=None, now=None):
+        """Everything /metrics exposes: rates over 10s and the full window, and noisy guilds"""
+        short = self.rates(10, now)
+        return {
+            'window_seconds': self.window,
+            'uptime_seconds': round(time.time() - self.started),
+            'per_second_10s': {entry['event']: entry['per_second'] for entry in short if entry['count']},
+            'events': self.rates(now=now),
+            'top_guilds': self.top_guilds(top, names, now),
+        }
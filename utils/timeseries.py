@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Metrics Time Series
+Fixed-size binary ring files (1s, 1m and 1h tiers), memory-mapped for reads and
+writes, that keep bot metrics history locally without an external database.
+"""
+
+import asyncio
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+SERIES = ('heartbeat_ms', 'command_ms', 'commands', 'guilds', 'loop_lag_ms', 'rss_mb')
+
+# name -> (seconds per slot, slots); each tier covers resolution * slots seconds
+TIERS = {
+    '1s': (1, 3600),       # 1 hour
+    '1m': (60, 1440),      # 1 day
+    '1h': (3600, 24 * 30), # 30 days
+}
+
+MAGIC = b'BTS1'
+HEADER_SIZE = 256
+NAN = float('nan')
+
+
+class Tier:
+    """One ring file: slot i holds the bucket whose start // resolution == i (mod slots).
+
+    Each slot is the bucket start (int64) followed by mean, max (float32)
+    and sample count (uint32) for every series. A slot whose stored start
+    doesn't match the bucket being read is stale and treated as missing.
+    """
+
+    def __init__(self, path, resolution, slots, series=SERIES):
+        self.path = path
+        self.resolution = resolution
+        self.slots = slots
+        self.series = series
+        self.record = struct.Struct('<q' + 'ffI' * len(series))
+        self.size = HEADER_SIZE + self.record.size * slots
+        self.header = struct.pack('<4sIII', MAGIC, resolution, slots, self.record.size) + ",".join(series).encode()
+        if len(self.header) > HEADER_SIZE:
+            raise ValueError("Too many series for the ring file header")
+
+        self._file = self._open()
+        self.map = mmap.mmap(self._file.fileno(), self.size)
+        self.bucket = None
+        self.sums = self.maxes = self.counts = None
+        self._resume()
+
+    def _open(self):
+        """Open the ring file, recreating it when its layout doesn't match"""
+        try:
+            f = open(self.path, 'r+b')
+            if f.read(len(self.header)) == self.header and os.fstat(f.fileno()).st_size == self.size:
+                return f
+            f.close()
+            logger.warning(f"📈 {self.path} has a different layout; starting a new history")
+        except FileNotFoundError:
+            pass
+        f = open(self.path, 'w+b')
+        f.truncate(self.size)
+        f.write(self.header)
+        f.flush()
+        return f
+
+    def _offset(self, bucket):
+        return HEADER_SIZE + (bucket // self.resolution % self.slots) * self.record.size
+
+    def _read(self, bucket):
+        values = self.record.unpack_from(self.map, self._offset(bucket))
+        return values[1:] if values[0] == bucket else None
+
+    def _resume(self):
+        """Pick up the current bucket's partial aggregate after a restart"""
+        now = int(time.time())
+        self._start(now - now % self.resolution)
+        stored = self._read(self.bucket)
+        if stored:
+            for index in range(len(self.series)):
+                mean, peak, count = stored[index * 3:index * 3 + 3]
+                if count:
+                    self.sums[index], self.maxes[index], self.counts[index] = mean * count, peak, count
+
+    def _start(self, bucket):
+        self.bucket = bucket
+        self.sums = [0.0] * len(self.series)
+        self.maxes = [-math.inf] * len(self.series)
+        self.counts = [0] * len(self.series)
+
+    def add(self, now, values):
+        """Fold one sample (a value or None per series) into its bucket and write the slot"""
+        bucket = int(now) - int(now) % self.resolution
+        if bucket != self.bucket:
+            self._start(bucket)
+        sums, maxes, counts = self.sums, self.maxes, self.counts
+        fields = [bucket]
+        for index, value in enumerate(values):
+            if value is not None and math.isfinite(value):
+                sums[index] += value
+                counts[index] += 1
+                if value > maxes[index]:
+                    maxes[index] = value
+            count = counts[index]
+            fields += (sums[index] / count, maxes[index], count) if count else (NAN, NAN, 0)
+        self.record.pack_into(self.map, self._offset(bucket), *fields)
+
+    def query(self, start, end):
+        """[(bucket start, {series: (mean, max)})] for buckets in [start, end], oldest first"""
+        last = int(end) - int(end) % self.resolution
+        first = max(int(start) - int(start) % self.resolution, last - self.resolution * (self.slots - 1))
+        rows = []
+        for bucket in range(first, last + 1, self.resolution):
+            stored = self._read(bucket)
+            if stored is None:
+                continue
+            rows.append((bucket, {
+                name: stored[index * 3:index * 3 + 2]
+                for index, name in enumerate(self.series) if stored[index * 3 + 2]
+            }))
+        return rows
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self._file.close()
+
+
+class TimeSeriesStore:
+    """All tiers for one set of series; every sample is written to each tier"""
+
+    def __init__(self, directory, series=SERIES, tiers=TIERS):
+        os.makedirs(directory, exist_ok=True)
+        self.series = series
+        self.tiers = {
+            name: Tier(os.path.join(directory, f"{name}.ring"), resolution, slots, series)
+            for name, (resolution, slots) in tiers.items()
+        }
+        self.samples = 0
+        self._task = None
+
+    def add(self, values, now=None):
+        """Record one sample: {series: value}, missing series are left out of the averages"""
+        now = time.time() if now is None else now
+        row = [values.get(name) for name in self.series]
+        for tier in self.tiers.values():
+            tier.add(now, row)
+        self.samples += 1
+
+    def tier_for(self, seconds):
+        """The finest tier whose ring covers `seconds` of history"""
+        for name, tier in sorted(self.tiers.items(), key=lambda item: item[1].resolution):
+            if tier.resolution * tier.slots >= seconds:
+                return name, tier
+        return max(self.tiers.items(), key=lambda item: item[1].resolution)
+
+    def query(self, seconds, series=None, points=None, now=None):
+        """History of the last `seconds`: {'tier', 'resolution', 'series': {name: [(t, mean, max)]}}
+
+        With `points`, consecutive buckets are merged so each series has at
+        most that many points (means averaged, maxima kept).
+        """
+        now = time.time() if now is None else now
+        name, tier = self.tier_for(seconds)
+        rows = tier.query(now - seconds, now)
+        wanted = series or self.series
+        history = {key: [(bucket, *values[key]) for bucket, values in rows if key in values] for key in wanted}
+        if points:
+            history = {key: downsample(values, points) for key, values in history.items()}
+        return {'tier': name, 'resolution': tier.resolution, 'series': history}
+
+    def start(self, collect, interval=1.0):
+        """Sample `collect()` every `interval` seconds, adding the event loop's lag as loop_lag_ms"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(collect, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for tier in self.tiers.values():
+            tier.close()
+
+    async def _run(self, collect, interval):
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(interval)
+            # How late the loop woke us up: time spent by callbacks that didn't yield
+            lag = time.monotonic() - before - interval
+            try:
+                values = collect()
+                values['loop_lag_ms'] = max(0.0, lag * 1000)
+                self.add(values)
+            except Exception:
+                logger.exception("📈 Metrics sample failed")
+
+    def metrics(self):
+        return {
+            'samples': self.samples,
+            'tiers': {
+                name: {'resolution': tier.resolution, 'slots': tier.slots, 'bytes': tier.size}
+                for name, tier in self.tiers.items()
+            },
+        }
+
+
+def downsample(values, points):
+    """Merge consecutive (t, mean, max) rows down to at most `points` rows"""
+    if len(values) <= points:
+        return values
+    step = math.ceil(len(values) / points)
+    merged = []
+    for index in range(0, len(values), step):
+        group = values[index:index + step]
+        merged.append((group[0][0], sum(row[1] for row in group) / len(group), max(row[2] for row in group)))
+    return merged
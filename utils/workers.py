@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Process Pool Worker Subsystem
+Runs CPU-heavy, pure-Python jobs in worker processes so the event loop only awaits results.
+
+Job protocol: a job is a module-level function (importable by name, so it can be
+pickled) called with picklable arguments, returning a picklable result. Discord
+objects must be reduced to plain data before submitting.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Number of recent job durations kept for percentile reporting
+DURATION_SAMPLES = 256
+
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+def _run_job(func, args, kwargs):
+    """Executed in the worker process; reports when the job actually started"""
+    started = time.time()
+    result = func(*args, **kwargs)
+    return result, started, time.time()
+
+
+def _check_picklable_job(func):
+    qualname = getattr(func, '__qualname__', '')
+    if not callable(func) or '<locals>' in qualname or '<lambda>' in qualname:
+        raise TypeError(f"Jobs must be module-level functions, got {func!r}")
+    if getattr(func, '__module__', None) == '__main__':
+        raise TypeError(f"Job {qualname} must live in an importable module, not __main__")
+
+
+class _Generation:
+    """One executor and the jobs submitted to it"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.inflight = set()
+        self.abandoned = set()
+        self.retired = False
+
+
+class WorkerPool:
+    """Asyncio front-end for a lazily started process pool"""
+
+    def __init__(self, max_workers=None, default_timeout=30.0, max_pending=100):
+        self.max_workers = max_workers or min(2, os.cpu_count() or 1)
+        self.default_timeout = default_timeout
+        self.max_pending = max_pending
+        self._generation = None
+        self._retired = []
+        self._durations = deque(maxlen=DURATION_SAMPLES)
+        self._waits = deque(maxlen=DURATION_SAMPLES)
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'recycled_pools': 0,
+        }
+
+    def _current(self):
+        if self._generation is None:
+            # forkserver avoids forking a process that already runs threads and an event loop
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                # Preload the job module instead of re-importing the bot's __main__
+                context.set_forkserver_preload(['utils.jobs'])
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            self._generation = _Generation(executor)
+            logger.info(f"⚙️ Worker pool started with {self.max_workers} processes ({method})")
+        return self._generation
+
+    @property
+    def inflight(self):
+        generation = self._generation
+        return len(generation.inflight) - len(generation.abandoned) if generation else 0
+
+    async def submit(self, func, *args, timeout=None, **kwargs):
+        """Run func(*args, **kwargs) in a worker process and await its result.
+
+        Raises JobTimeout if the job takes longer than `timeout` seconds and
+        re-raises any exception raised by the job itself. Cancelling the
+        awaiting task cancels the job if it has not started yet.
+        """
+        _check_picklable_job(func)
+        if self.inflight >= self.max_workers + self.max_pending:
+            self.stats['rejected'] += 1
+            raise RuntimeError("Worker pool queue is full, try again later")
+
+        timeout = self.default_timeout if timeout is None else timeout
+        generation = self._current()
+        submitted = time.time()
+        job = generation.executor.submit(_run_job, func, args, kwargs)
+        future = asyncio.wrap_future(job)
+        generation.inflight.add(job)
+        # Bookkeeping runs on the loop thread, not the executor's management thread
+        future.add_done_callback(lambda f: self._job_done(generation, job, f))
+        self.stats['submitted'] += 1
+
+        try:
+            result, started, finished = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            self._abandon(generation, job)
+            raise JobTimeout(f"{func.__qualname__} did not finish within {timeout}s") from None
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            self._abandon(generation, job)
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+
+        self.stats['completed'] += 1
+        self._waits.append(started - submitted)
+        self._durations.append(finished - started)
+        return result
+
+    def _abandon(self, generation, job):
+        """Give up on a job; if it is already running, retire its executor"""
+        if job.cancel():
+            return
+        generation.abandoned.add(job)
+        if not generation.retired:
+            # A running job cannot be cancelled: route new work to a fresh pool and
+            # terminate this one once only abandoned jobs remain in it
+            generation.retired = True
+            self._retired.append(generation)
+            self._generation = None
+            self.stats['recycled_pools'] += 1
+            logger.warning("⚙️ Worker pool recycled after a job overran its timeout")
+        self._reap(generation)
+
+    def _job_done(self, generation, job, future):
+        if job in generation.abandoned and not future.cancelled():
+            future.exception()  # Nobody awaits an abandoned job; mark its error as retrieved
+        generation.inflight.discard(job)
+        generation.abandoned.discard(job)
+        if generation.retired:
+            self._reap(generation)
+
+    def _reap(self, generation):
+        if generation.inflight - generation.abandoned:
+            return
+        self._terminate(generation.executor)
+        if generation in self._retired:
+            self._retired.remove(generation)
+
+    @staticmethod
+    def _terminate(executor):
+        processes = list(getattr(executor, '_processes', {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def metrics(self):
+        """Queue depth, throughput counters and job timing summaries"""
+        inflight = self.inflight
+        return {
+            'workers': self.max_workers,
+            'started': self._generation is not None,
+            'running': min(inflight, self.max_workers),
+            'queue_depth': max(inflight - self.max_workers, 0),
+            'retired_pools': len(self._retired),
+            **self.stats,
+            'job_duration_ms': _summary(self._durations),
+            'queue_wait_ms': _summary(self._waits),
+        }
+
+    def shutdown(self):
+        """Stop all worker processes without waiting for running jobs"""
+        for generation in [self._generation, *self._retired]:
+            if generation:
+                self._terminate(generation.executor)
+        self._generation = None
+        self._retired.clear()
+
+
+def _summary(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50': round(ordered[len(ordered) // 2] * 1000, 1),
+        'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 1),
+        'max': round(ordered[-1] * 1000, 1),
+    }